@@ -48,6 +48,7 @@ class AdvogadoPublicacao(db.Model):
     local = db.Column(db.String(255), nullable=True)
     mensagem = db.Column(db.Text, nullable=True)
     link = db.Column(db.Text, nullable=True)
+    notificado_em = db.Column(db.DateTime, nullable=True)  # envio do WhatsApp deste diário ao advogado
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -56,6 +57,32 @@ class AdvogadoPublicacao(db.Model):
     diario = db.relationship('DiarioOficial', backref=db.backref('publicacoes_advogados', lazy=True))
 
 
+class ExecucaoCaderno(db.Model):
+    """Estado de cada etapa do processamento de um caderno do DJERJ em uma data."""
+    __tablename__ = "execucao_caderno"
+    __table_args__ = (
+        db.UniqueConstraint("data_publicacao", "caderno", name="uq_execucao_caderno_data_caderno"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    data_publicacao = db.Column(db.Date, nullable=False, index=True)
+    caderno = db.Column(db.String(255), nullable=False)
+    etapa = db.Column(db.String(30), nullable=True)  # última etapa concluída
+    status = db.Column(db.String(20), default="pendente", nullable=False)
+    url_pdf = db.Column(db.Text, nullable=True)
+    arquivo_pdf = db.Column(db.Text, nullable=True)
+    diario_id = db.Column(db.Integer, db.ForeignKey('diario_oficial.id'), nullable=True)
+    total_mencoes = db.Column(db.Integer, default=0)
+    mensagens_enviadas = db.Column(db.Integer, default=0)
+    tentativas = db.Column(db.Integer, default=0)
+    tempos = db.Column(db.Text, nullable=True)  # JSON {etapa: segundos}
+    erro = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    diario = db.relationship('DiarioOficial', backref=db.backref('execucoes', lazy=True))
+
+
 # ✅ Mantenha a tabela Publicacao como legacy (se ainda precisar)
 class Publicacao(db.Model):
     __tablename__ = "publicacao"
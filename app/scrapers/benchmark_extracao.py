@@ -0,0 +1,344 @@
+# app/scrapers/benchmark_extracao.py
+# REGRESSÃO PRECISÃO x VELOCIDADE DOS BACKENDS DE EXTRAÇÃO
+#
+# Uso:
+#   python -m app.scrapers.benchmark_extracao --advogados advogados.csv --saida extracao.json
+#
+# Roda cada backend de extração sobre os PDFs do DJERJ guardados em CACHE_DIR,
+# casa as páginas com o matcher de produção e compara as menções com a linha de
+# base "original": o código de antes das otimizações (extract_text_from_page +
+# uma regex por advogado), congelado abaixo. Mostra quanto a série inteira
+# (extração + casamento) perdeu de recall e ganhou de velocidade. Cada extração
+# roda em um processo novo, para que o pico de RSS seja só dela. Sem --advogados
+# a lista vem do banco. A linha de base varre a página uma vez por advogado: com
+# a lista inteira, limite as páginas com --max-paginas.
+
+import os
+import re
+import csv
+import glob
+import json
+import time
+import logging
+import argparse
+import unicodedata
+import multiprocessing
+from io import StringIO
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import psutil
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+from pdfminer.converter import TextConverter
+from pdfminer.layout import LAParams
+
+from app.models import Advogado
+from app.scrapers.djerj.extracao import BACKENDS, BACKEND_LAYOUT, DocumentoPdf, contar_paginas, extrair_texto_pagina
+from app.scrapers.djerj.pipeline import casar_paginas
+
+logger = logging.getLogger(__name__)
+
+SUFIXO_FALLBACK = "+layout"
+VARIANTE_ORIGINAL = "original"
+
+
+# ===================== LINHA DE BASE CONGELADA =====================
+# Cópia do caminho de scraper_completo_djerj.py anterior às otimizações. Não
+# importar do scraper: ele já foi reescrito e a comparação deixaria de valer.
+def _original_normalizar_texto(texto: str) -> str:
+    if not texto: return ""
+    texto = texto.upper()
+    texto = unicodedata.normalize('NFKD', texto).encode('ASCII', 'ignore').decode('ASCII')
+    texto = re.sub(r'\s+', ' ', texto)
+    return texto.strip()
+
+_ORIGINAL_OAB_PATTERN = re.compile(r'[\s\-\/\.]*')
+def _original_regex_oab(numero_oab: str) -> re.Pattern:
+    if not numero_oab: return re.compile("")
+    oab_clean = _original_normalizar_texto(numero_oab)
+    partes = oab_clean.split()
+    regex_partes = [re.escape(parte) for parte in partes]
+    return re.compile(_ORIGINAL_OAB_PATTERN.pattern.join(regex_partes))
+
+def _original_regex_nome(nome_completo: str) -> re.Pattern:
+    nome_norm = _original_normalizar_texto(nome_completo)
+    partes = nome_norm.split()
+    regex_partes = []
+    for i, parte in enumerate(partes):
+        if i == 0: regex_partes.append(r'(\w*' + re.escape(parte) + r')')
+        else: regex_partes.append(re.escape(parte))
+    return re.compile(r'\s+'.join(regex_partes))
+
+def _original_regex_advogado(advogado: Advogado) -> re.Pattern:
+    """A regex que o ``buscar_mencoes_advogado`` original montava a cada chamada."""
+    nome = _original_regex_nome(advogado.nome_completo)
+    if not advogado.numero_oab:
+        return nome
+    oab = _original_regex_oab(advogado.numero_oab)
+    padrao_nome_oab = f"({nome.pattern})" + r".{0,150}?" + f"({oab.pattern})"
+    padrao_oab_nome = f"({oab.pattern})" + r".{0,150}?" + f"({nome.pattern})"
+    return re.compile(f"({padrao_nome_oab}|{padrao_oab_nome})", re.IGNORECASE)
+
+def _original_extract_text_from_page(page) -> str:
+    resource_manager = PDFResourceManager()
+    buf = StringIO()
+    converter = TextConverter(resource_manager, buf, laparams=LAParams())
+    interpreter = PDFPageInterpreter(resource_manager, converter)
+    try:
+        interpreter.process_page(page)
+        return buf.getvalue()
+    finally:
+        converter.close()
+        buf.close()
+
+
+def variantes_disponiveis() -> List[str]:
+    """A linha de base, cada backend puro e, para os rápidos, o modo de produção (com fallback para o layout)."""
+    variantes = [VARIANTE_ORIGINAL] + list(BACKENDS)
+    variantes += [f"{nome}{SUFIXO_FALLBACK}" for nome in BACKENDS if nome != BACKEND_LAYOUT]
+    return variantes
+
+
+def carregar_advogados_csv(caminho: str) -> List[Advogado]:
+    """
+    CSV de advogados com ``nome_completo`` e ``numero_oab``, separado por ";"
+    (como ``app/data/lista-adv-oab-geral.csv``) ou ",". Sem coluna ``id``, o id
+    é o número da linha.
+    """
+    with open(caminho, newline="", encoding="utf-8-sig") as f:
+        cabecalho = f.readline()
+        f.seek(0)
+        leitor = csv.DictReader(f, delimiter=";" if cabecalho.count(";") > cabecalho.count(",") else ",")
+        advogados = []
+        for numero, linha in enumerate(leitor, 1):
+            nome = (linha.get("nome_completo") or "").strip()
+            if not nome:
+                continue
+            advogado_id = int(linha["id"]) if (linha.get("id") or "").strip() else numero
+            advogados.append(Advogado(id=advogado_id, nome_completo=nome,
+                                      numero_oab=(linha.get("numero_oab") or "").strip() or None))
+        return advogados
+
+
+def carregar_advogados_banco() -> List[Advogado]:
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        advogados = Advogado.query.all()
+        return [Advogado(id=a.id, nome_completo=a.nome_completo, numero_oab=a.numero_oab) for a in advogados]
+
+
+def _textos_pdf(caminho_pdf: str, variante: str, total: int) -> Iterator[Tuple[Optional[str], str]]:
+    """``(texto, backend usado)`` de cada página até ``total``."""
+    if variante == VARIANTE_ORIGINAL:
+        with open(caminho_pdf, "rb") as fp:
+            for page_num, page in enumerate(PDFPage.get_pages(fp), 1):
+                if page_num > total:
+                    return
+                yield _original_extract_text_from_page(page), VARIANTE_ORIGINAL
+        return
+    backend = variante[:-len(SUFIXO_FALLBACK)] if variante.endswith(SUFIXO_FALLBACK) else variante
+    with DocumentoPdf(caminho_pdf) as documento:
+        for page_num in range(1, total + 1):
+            if variante == backend:
+                yield BACKENDS[backend](documento, page_num), backend
+            else:
+                yield extrair_texto_pagina(documento, page_num, backend)
+
+
+def extrair_com_variante(caminho_pdf: str, variante: str, max_paginas: int = 0) -> Dict:
+    """Roda em processo próprio: extrai o PDF com a variante e mede tempo e RSS."""
+    processo = psutil.Process()
+    total = contar_paginas(caminho_pdf)
+    if max_paginas:
+        total = min(total, max_paginas)
+
+    textos: List[Optional[str]] = []
+    usos = Counter()
+    falhas = 0
+    pico_rss = processo.memory_info().rss
+    inicio = time.perf_counter()
+    paginas = _textos_pdf(caminho_pdf, variante, total)
+    while len(textos) < total:
+        try:
+            texto, usado = next(paginas)
+        except StopIteration:
+            break
+        except Exception as e:
+            logger.error(f"Erro ao extrair página {len(textos) + 1} com {variante}: {e}")
+            texto, usado = None, "erro"
+            falhas += 1
+            if variante == VARIANTE_ORIGINAL:
+                break  # gerador do pdfminer encerrado pela exceção
+        textos.append(texto)
+        usos[usado] += 1
+        pico_rss = max(pico_rss, processo.memory_info().rss)
+    segundos = time.perf_counter() - inicio
+
+    return {
+        "textos": textos,
+        "segundos": segundos,
+        "pico_rss_mb": pico_rss / (1024 * 1024),
+        "paginas_por_backend": dict(usos),
+        "falhas": falhas,
+    }
+
+
+def mencoes_originais(textos: List[Optional[str]], regexes: Dict[int, re.Pattern]) -> Counter:
+    """``(advogado_id, página)`` pelo caminho original: cada página varrida com a regex de cada advogado."""
+    mencoes = Counter()
+    for page_num, texto in enumerate(textos, 1):
+        if not texto or len(texto.strip()) < 50:
+            continue
+        texto_norm = _original_normalizar_texto(texto)
+        for advogado_id, regex in regexes.items():
+            if regex.search(texto_norm):
+                mencoes[(advogado_id, page_num)] = 1
+    return mencoes
+
+
+def mencoes_producao(textos: List[Optional[str]], matcher) -> Counter:
+    """``(advogado_id, página)`` pelo casamento de produção (``casar_paginas``)."""
+    mencoes = Counter()
+    for _, hits in casar_paginas(enumerate(textos, 1), matcher, 1):
+        for advogado_id, _, pagina in hits:
+            mencoes[(advogado_id, pagina)] = 1
+    return mencoes
+
+
+def comparar(base: Counter, obtido: Counter) -> Dict:
+    encontradas = sum((base & obtido).values())
+    total_base = sum(base.values())
+    return {
+        "mencoes": sum(obtido.values()),
+        "recall": round(encontradas / total_base, 4) if total_base else 1.0,
+        "perdidas": total_base - encontradas,
+        "extras": sum((obtido - base).values()),
+        "exemplos_perdidas": sorted(base - obtido)[:20],
+    }
+
+
+def executar_benchmark(pdfs: List[str], advogados: List[Advogado], variantes: List[str], max_paginas: int) -> Dict:
+    from app.scrapers.djerj.scraper_completo_djerj import montar_matcher
+
+    matcher = montar_matcher(advogados)
+    regexes = {advogado.id: _original_regex_advogado(advogado) for advogado in advogados}
+    contexto_mp = multiprocessing.get_context("spawn")
+    totais = {v: {"paginas": 0, "segundos": 0.0, "segundos_casamento": 0.0, "pico_rss_mb": 0.0,
+                  "base": 0, "encontradas": 0, "extras": 0, "falhas": 0}
+              for v in variantes}
+    por_pdf = []
+
+    for caminho_pdf in pdfs:
+        logger.info(f"📄 {os.path.basename(caminho_pdf)}")
+        medicoes = {}
+        for variante in variantes:
+            # Um processo novo por variante: o RSS medido é só daquela extração
+            with ProcessPoolExecutor(max_workers=1, mp_context=contexto_mp) as executor:
+                medicoes[variante] = executor.submit(extrair_com_variante, caminho_pdf, variante, max_paginas).result()
+
+        mencoes = {}
+        for variante, medicao in medicoes.items():
+            inicio = time.perf_counter()
+            if variante == VARIANTE_ORIGINAL:
+                mencoes[variante] = mencoes_originais(medicao["textos"], regexes)
+            else:
+                mencoes[variante] = mencoes_producao(medicao["textos"], matcher)
+            medicao["segundos_casamento"] = time.perf_counter() - inicio
+
+        base = mencoes[VARIANTE_ORIGINAL]
+        paginas = len(medicoes[VARIANTE_ORIGINAL]["textos"])
+        resultado_pdf = {"pdf": os.path.basename(caminho_pdf), "paginas": paginas, "mencoes_base": sum(base.values()), "variantes": {}}
+        for variante, medicao in medicoes.items():
+            comparacao = comparar(base, mencoes[variante])
+            resultado_pdf["variantes"][variante] = {
+                "segundos_por_pagina": round(medicao["segundos"] / paginas, 4) if paginas else 0.0,
+                "segundos_casamento_por_pagina": round(medicao["segundos_casamento"] / paginas, 4) if paginas else 0.0,
+                "pico_rss_mb": round(medicao["pico_rss_mb"], 1),
+                "paginas_por_backend": medicao["paginas_por_backend"],
+                "falhas": medicao["falhas"],
+                **comparacao,
+            }
+            total = totais[variante]
+            total["paginas"] += paginas
+            total["segundos"] += medicao["segundos"]
+            total["segundos_casamento"] += medicao["segundos_casamento"]
+            total["pico_rss_mb"] = max(total["pico_rss_mb"], medicao["pico_rss_mb"])
+            total["base"] += sum(base.values())
+            total["encontradas"] += sum(base.values()) - comparacao["perdidas"]
+            total["extras"] += comparacao["extras"]
+            total["falhas"] += medicao["falhas"]
+            logger.info(f"   {variante}: {resultado_pdf['variantes'][variante]['segundos_por_pagina']}s/pág extração, "
+                        f"{resultado_pdf['variantes'][variante]['segundos_casamento_por_pagina']}s/pág casamento, "
+                        f"recall {comparacao['recall']}, perdidas {comparacao['perdidas']}, extras {comparacao['extras']}")
+        por_pdf.append(resultado_pdf)
+
+    return {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "linha_de_base": VARIANTE_ORIGINAL,
+        "advogados": len(advogados),
+        "pdfs": por_pdf,
+        "resumo": _resumir(totais),
+    }
+
+
+def _resumir(totais: Dict) -> Dict:
+    """Perda de recall x ganho de velocidade (extração + casamento) de cada variante sobre todos os PDFs."""
+    por_pagina = lambda t: (t["segundos"] + t["segundos_casamento"]) / t["paginas"] if t["paginas"] else 0.0
+    base = totais.get(VARIANTE_ORIGINAL)
+    seg_base = por_pagina(base) if base else 0.0
+    resumo = {}
+    for variante, total in totais.items():
+        seg_pagina = por_pagina(total)
+        recall = total["encontradas"] / total["base"] if total["base"] else 1.0
+        resumo[variante] = {
+            "segundos_por_pagina": round(seg_pagina, 4),
+            "aceleracao": round(seg_base / seg_pagina, 2) if seg_pagina else None,
+            "recall": round(recall, 4),
+            "perda_recall": round(1 - recall, 4),
+            "extras": total["extras"],
+            "falhas": total["falhas"],
+            "pico_rss_mb": round(total["pico_rss_mb"], 1),
+        }
+    return resumo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precisão x velocidade dos backends de extração do DJERJ")
+    parser.add_argument("--pdfs", nargs="*", help="PDFs a usar (padrão: diario_*.pdf em CACHE_DIR)")
+    parser.add_argument("--advogados", help="CSV com nome_completo;numero_oab, ex.: app/data/lista-adv-oab-geral.csv "
+                                            "(padrão: advogados do banco)")
+    parser.add_argument("--variantes", default=",".join(variantes_disponiveis()), help="Variantes a medir")
+    parser.add_argument("--max-paginas", type=int, default=0, help="Limite de páginas por PDF (0 = todas)")
+    parser.add_argument("--saida", default="benchmark_extracao.json", help="Arquivo JSON do relatório")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    pdfs = args.pdfs or sorted(glob.glob(os.path.join(os.getenv("CACHE_DIR", "/tmp"), "diario_*.pdf")))
+    if not pdfs:
+        parser.error("Nenhum PDF encontrado em CACHE_DIR")
+    variantes = [v.strip() for v in args.variantes.split(",") if v.strip()]
+    desconhecidas = set(variantes) - set(variantes_disponiveis())
+    if desconhecidas:
+        parser.error(f"Variantes desconhecidas: {', '.join(sorted(desconhecidas))}")
+    if VARIANTE_ORIGINAL not in variantes:
+        variantes.insert(0, VARIANTE_ORIGINAL)  # linha de base sempre roda
+
+    advogados = carregar_advogados_csv(args.advogados) if args.advogados else carregar_advogados_banco()
+    logger.info(f"👨‍💼 {len(advogados)} advogados, {len(pdfs)} PDFs, variantes: {', '.join(variantes)}")
+
+    relatorio = executar_benchmark(pdfs, advogados, variantes, args.max_paginas)
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+    for variante, linha in sorted(relatorio["resumo"].items(), key=lambda item: item[1]["segundos_por_pagina"]):
+        logger.info(f"📊 {variante:24} {linha['segundos_por_pagina']:.4f}s/pág  x{linha['aceleracao']}  "
+                    f"recall {linha['recall']:.4f}  extras {linha['extras']}  RSS {linha['pico_rss_mb']}MB")
+    logger.info(f"💾 Relatório salvo em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+# app/scrapers/benchmark_matching.py
+# BENCHMARK OFFLINE DOS MOTORES DE BUSCA DE ADVOGADOS
+#
+# Uso:
+#   python -m app.scrapers.benchmark_matching --tamanhos 1000,10000,100000,200000 --saida bench.json
+#
+# Gera páginas sintéticas no formato do DJERJ (já normalizadas) e listas de
+# advogados falsas, mede cada motor e grava um JSON estável (chaves ordenadas)
+# para comparar versões com diff. Não acessa rede nem banco.
+
+import gc
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List
+
+from app.models import Advogado
+from app.scrapers.utils import advogado_utils
+from app.scrapers.utils.matcher import MatcherAdvogados
+from app.scrapers.utils.indice_tokens import IndiceTokensRaros
+from app.scrapers.utils.text_utils import normalizar_texto
+from app.scrapers.djerj import scraper_completo_djerj
+
+logger = logging.getLogger(__name__)
+
+PRENOMES = [
+    "Ana", "Maria", "João", "José", "Paulo", "Carlos", "Lúcia", "Fernanda", "Rafael", "Bruno",
+    "Juliana", "Patrícia", "Marcelo", "Ricardo", "Camila", "Luiz", "Pedro", "Gustavo", "Renata", "Aline",
+    "Sérgio", "Cláudia", "Rodrigo", "Tatiana", "Eduardo", "Vanessa", "André", "Letícia", "Márcio", "Débora",
+    "Fábio", "Simone", "Thiago", "Priscila", "Leonardo", "Mônica", "Alexandre", "Adriana", "Felipe", "Cristina",
+]
+SOBRENOMES = [
+    "Silva", "Souza", "Costa", "Santos", "Oliveira", "Pereira", "Rodrigues", "Almeida", "Nascimento", "Lima",
+    "Araújo", "Fernandes", "Carvalho", "Gomes", "Martins", "Rocha", "Ribeiro", "Alves", "Monteiro", "Mendes",
+    "Barros", "Freitas", "Barbosa", "Pinto", "Moura", "Cavalcanti", "Dias", "Castro", "Campos", "Cardoso",
+    "Teixeira", "Vieira", "Correia", "Nunes", "Moreira", "Magalhães", "Batista", "Conceição", "Azevedo", "Brandão",
+    "Guimarães", "Siqueira", "Macedo", "Sampaio", "Quintanilha", "Figueiredo", "Tavares", "Peixoto", "Fontes", "Assunção",
+]
+# Sílabas para sobrenomes menos comuns: listas reais têm milhares de sobrenomes distintos
+SILABAS = ["al", "ba", "bu", "ca", "ce", "cor", "da", "di", "fa", "gu", "la", "len", "lo", "ma", "mar",
+           "ne", "no", "pa", "que", "ra", "ran", "ri", "sa", "tei", "ten", "to", "va", "vi", "xa", "zi"]
+CONECTORES = ["", "", "", "de ", "da ", "dos "]
+BOILERPLATE = [
+    "Intime-se a parte autora para se manifestar sobre o laudo pericial no prazo legal.",
+    "Defiro a gratuidade de justiça. Cite-se o réu para contestar no prazo de quinze dias.",
+    "Ante o exposto, JULGO PROCEDENTE o pedido, na forma do art. 487, I, do CPC.",
+    "Certifique o cartório o trânsito em julgado e, após, dê-se baixa e arquive-se.",
+    "Manifestem-se as partes em provas, justificando sua pertinência, sob pena de preclusão.",
+    "Ao Ministério Público. Após, voltem conclusos para sentença.",
+    "Recebo a apelação em seus regulares efeitos. Às contrarrazões.",
+]
+
+
+def _sobrenome(rng: random.Random) -> str:
+    """Sobrenome comum na maior parte das vezes; às vezes um raro, gerado por sílabas."""
+    if rng.random() < 0.6:
+        return rng.choice(SOBRENOMES)
+    return "".join(rng.choice(SILABAS) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def gerar_advogados(quantidade: int, semente: int = 42) -> List[Advogado]:
+    """Lista de ``Advogado`` (não persistidos) com nomes e OABs únicos."""
+    rng = random.Random(semente)
+    vistos = set()
+    advogados = []
+    while len(advogados) < quantidade:
+        nome = f"{rng.choice(PRENOMES)} {_sobrenome(rng)} {rng.choice(CONECTORES)}{_sobrenome(rng)}"
+        if rng.random() < 0.3:
+            nome = f"{nome} {_sobrenome(rng)}"
+        if nome in vistos:
+            continue
+        vistos.add(nome)
+        advogados.append(Advogado(id=len(advogados) + 1, nome_completo=nome, numero_oab=str(100000 + len(advogados))))
+    return advogados
+
+
+def _numero_cnj(rng: random.Random) -> str:
+    return f"{rng.randrange(10**7):07d}-{rng.randrange(100):02d}.{rng.choice((2022, 2023, 2024))}.8.19.{rng.randrange(1, 300):04d}"
+
+
+def gerar_paginas(advogados: List[Advogado], quantidade: int, semente: int = 7, citacoes_por_pagina: int = 12) -> List[str]:
+    """Páginas normalizadas com processos CNJ, linhas de advogado e texto jurídico."""
+    rng = random.Random(semente)
+    paginas = []
+    for _ in range(quantidade):
+        partes = []
+        for _ in range(citacoes_por_pagina):
+            partes.append(f"Proc. {_numero_cnj(rng)} - {rng.choice(('Intimação', 'Despacho', 'Sentença'))}")
+            partes.extend(rng.choice(BOILERPLATE) for _ in range(rng.randint(2, 5)))
+            if rng.random() < 0.8:
+                advogado = rng.choice(advogados)
+                partes.append(f"ADVOGADO: {advogado.nome_completo} - OAB/RJ {advogado.numero_oab}")
+            else:
+                # Nome fora da lista: mede o custo dos quase-acertos
+                partes.append(f"ADVOGADO: {rng.choice(PRENOMES)} {rng.choice(SOBRENOMES)} - OAB/RJ {rng.randrange(10**5, 10**6)}")
+        paginas.append(normalizar_texto(" ".join(partes)))
+    return paginas
+
+
+def _motor_regex_utils(advogados):
+    buscar = advogado_utils.buscar_mencoes_advogado
+    return lambda texto_norm: sum(len(buscar(texto_norm, advogado)) for advogado in advogados)
+
+
+def _motor_regex_djerj(advogados):
+    # Compila os padrões aqui (e não na primeira página), como o scraper faz na prática
+    scraper_completo_djerj.advogado_patterns.clear()
+    for advogado in advogados:
+        scraper_completo_djerj._padroes_advogado(advogado)
+    buscar = scraper_completo_djerj.buscar_mencoes_advogado
+    return lambda texto_norm: sum(len(buscar(texto_norm, advogado)) for advogado in advogados)
+
+
+def _motor_automato(advogados):
+    matcher = MatcherAdvogados(advogados)
+    return lambda texto_norm: len(matcher.buscar(texto_norm))
+
+
+def _motor_indice(advogados):
+    scraper_completo_djerj.advogado_patterns.clear()
+    indice = IndiceTokensRaros(advogados, verificar=scraper_completo_djerj.buscar_mencoes_advogado)
+    return lambda texto_norm: len(indice.buscar(texto_norm))
+
+
+# nome -> (fábrica que recebe os advogados e devolve buscar(texto_norm) -> nº de menções, varre a lista inteira?)
+# Novos motores entram aqui
+MOTORES: Dict[str, tuple] = {
+    "regex_djerj": (_motor_regex_djerj, True),
+    "regex_advogado_utils": (_motor_regex_utils, True),
+    "automato": (_motor_automato, False),
+    "indice": (_motor_indice, False),
+}
+
+
+def medir_motor(nome: str, advogados: List[Advogado], paginas: List[str], limite_varredura: int) -> Dict:
+    """
+    Mede um motor sobre as páginas. Motores que varrem a lista inteira por página
+    (regex por advogado) rodam sobre no máximo ``limite_varredura`` advogados e o
+    custo é reportado por advogado (``ns_por_pagina_por_advogado``).
+    """
+    fabrica, varre_lista = MOTORES[nome]
+    medidos = advogados[:limite_varredura] if varre_lista and limite_varredura else advogados
+
+    gc.collect()
+    inicio = time.perf_counter()
+    buscar = fabrica(medidos)
+    tempo_construcao = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    mencoes = sum(buscar(pagina) for pagina in paginas)
+    tempo_busca = time.perf_counter() - inicio
+    del buscar
+
+    # Memória em passada separada: o tracemalloc distorce os tempos
+    gc.collect()
+    tracemalloc.start()
+    buscar = fabrica(medidos)
+    buscar(paginas[0])
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del buscar
+
+    paginas_por_segundo = len(paginas) / tempo_busca if tempo_busca else 0.0
+    resultado = {
+        "motor": nome,
+        "advogados": len(advogados),
+        "advogados_medidos": len(medidos),
+        "paginas": len(paginas),
+        "mencoes": mencoes,
+        "tempo_construcao_s": round(tempo_construcao, 4),
+        "paginas_por_segundo": round(paginas_por_segundo, 2),
+        "ns_por_pagina_por_advogado": round(tempo_busca * 1e9 / (len(paginas) * len(medidos)), 2),
+        "pico_memoria_mb": round(pico / (1024 * 1024), 2),
+    }
+    if len(medidos) < len(advogados):
+        # Estimativa linear para a lista inteira
+        resultado["paginas_por_segundo_estimado"] = round(paginas_por_segundo * len(medidos) / len(advogados), 4)
+    logger.info(f"⏱️ {nome} [{len(advogados)} advogados]: {resultado['paginas_por_segundo']} pág/s, "
+                f"{resultado['ns_por_pagina_por_advogado']} ns/pág/adv, {resultado['pico_memoria_mb']} MB")
+    return resultado
+
+
+def executar_benchmark(tamanhos: List[int], motores: List[str], paginas: int, limite_varredura: int, semente: int) -> Dict:
+    resultados = []
+    todos = gerar_advogados(max(tamanhos), semente)
+    for tamanho in tamanhos:
+        advogados = todos[:tamanho]
+        textos = gerar_paginas(advogados, paginas, semente + tamanho)
+        for nome in motores:
+            resultados.append(medir_motor(nome, advogados, textos, limite_varredura))
+    return {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "parametros": {
+            "tamanhos": tamanhos,
+            "motores": motores,
+            "paginas": paginas,
+            "limite_varredura": limite_varredura,
+            "semente": semente,
+        },
+        "resultados": resultados,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline dos motores de busca de advogados")
+    parser.add_argument("--tamanhos", default="1000,10000,100000,200000", help="Tamanhos da lista de advogados")
+    parser.add_argument("--motores", default=",".join(MOTORES), help=f"Motores ({', '.join(MOTORES)})")
+    parser.add_argument("--paginas", type=int, default=20, help="Páginas sintéticas por tamanho")
+    parser.add_argument("--limite-varredura", type=int, default=1000,
+                        help="Máximo de advogados para motores que varrem a lista por página (0 = todos)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", default="benchmark_matching.json", help="Arquivo JSON de resultados")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    tamanhos = [int(t) for t in args.tamanhos.split(",") if t.strip()]
+    motores = [m.strip() for m in args.motores.split(",") if m.strip()]
+    desconhecidos = set(motores) - set(MOTORES)
+    if desconhecidos:
+        parser.error(f"Motores desconhecidos: {', '.join(sorted(desconhecidos))}")
+
+    relatorio = executar_benchmark(tamanhos, motores, args.paginas, args.limite_varredura, args.semente)
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2, sort_keys=True)
+    logger.info(f"💾 Resultados salvos em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,37 +3,16 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import time
 import logging
 from datetime import datetime
 import psutil
-from functools import wraps
-import retry
 
 # ✅ Importações da nova utils
-from app.scrapers.utils.chrome_driver import create_chrome_driver, cleanup_chrome_driver
+from app.scrapers.utils.chrome_driver import obter_pool_chrome
+from app.scrapers.utils.retry_policy import com_retry
 
 logger = logging.getLogger(__name__)
 
-def retry_on_failure(max_retries=3, delay=2, backoff=2):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            retries = 0
-            while retries < max_retries:
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    retries += 1
-                    if retries == max_retries:
-                        logger.error(f"❌ Falha após {max_retries} tentativas: {e}")
-                        raise
-                    logger.warning(f"⚠️ Tentativa {retries}/{max_retries} falhou: {e}")
-                    time.sleep(delay * (backoff ** (retries - 1)))
-            return func(*args, **kwargs)
-        return wrapper
-    return decorator
-
 class DJENClient:
     def __init__(self):
         self.driver = None
@@ -44,12 +23,12 @@ class DJENClient:
             logger.warning(f"🚨 Memória inicial alta: {self.memoria_inicial.percent}% - Continuando com cautela")
         
         try:
-            # ✅ USA A NOVA FUNÇÃO CENTRALIZADA
-            self.driver = create_chrome_driver()
+            # ✅ Chrome emprestado do pool aquecido do worker (sem cold start por tarefa)
+            self.driver = obter_pool_chrome().emprestar()
             self.driver.implicitly_wait(10)
             self.BASE_URL = "https://comunica.pje.jus.br"
             
-            logger.info(f"🚀 ChromeDriver iniciado | Memória: {self.memoria_inicial.percent}%")
+            logger.info(f"🚀 ChromeDriver emprestado do pool | Memória: {self.memoria_inicial.percent}%")
             
         except Exception as e:
             # ✅ GARANTE LIMPEZA MESMO EM CASO DE ERRO
@@ -70,7 +49,7 @@ class DJENClient:
             raise
     
     # ✅ RETRY AUTOMÁTICO PARA BUSCA DE ELEMENTOS
-    @retry_on_failure(max_retries=2, delay=1)
+    @com_retry("djen_elemento")
     def _find_element_with_retry(self, by, value):
         """Busca elemento com retry automático"""
         return self.driver.find_element(by, value)
@@ -155,8 +134,8 @@ class DJENClient:
         return publicacoes
     
     def close(self):
-        """Fecha o driver - SEMPRE chame este método no finally!"""
+        """Devolve o driver ao pool - SEMPRE chame este método no finally!"""
         if self.driver:
-            cleanup_chrome_driver(self.driver)
+            obter_pool_chrome().devolver(self.driver)
             self.driver = None
             logger.info("✅ DJENClient fechado com sucesso")
@@ -1,11 +1,13 @@
 # app/scrapers/djen/djen_scraper.py
 import logging
 import requests
-import time
 from datetime import date, datetime
 from typing import Dict, List
 from app import db
 from app.models import Advogado, AdvogadoPublicacao, DiarioOficial
+from app.scrapers.utils.indice_tokens import IndiceTokensRaros
+from app.scrapers.utils.text_utils import normalizar_texto
+from app.scrapers.utils.retry_policy import requisitar_com_retry
 import os
 
 logger = logging.getLogger(__name__)
@@ -57,10 +59,13 @@ class DJENScraper:
                 advogados = Advogado.query.filter(Advogado.whatsapp.isnot(None)).all()
                 logger.info(f"🔍 Processando {len(advogados)} advogados com WhatsApp")
                 
+                # ✅ PRÉ-FILTRO: só verifica advogados cujo token raro aparece na publicação
+                indice = IndiceTokensRaros(advogados)
+                
                 for publicacao in publicacoes:
                     texto_publicacao = publicacao.get('texto', '').upper()
                     
-                    for advogado in advogados:
+                    for advogado in indice.candidatos(normalizar_texto(texto_publicacao)):
                         if (advogado.nome_completo and 
                             advogado.nome_completo.upper() in texto_publicacao and 
                             len(advogado.nome_completo) > 5):
@@ -152,32 +157,22 @@ class DJENScraper:
                     "isGroup": False
                 }
                 
-                # ✅ TIMEOUT DE 30 SEGUNDOS
-                response = requests.post(
+                # ✅ TIMEOUT DE 30 SEGUNDOS, RETRY COM BACKOFF E RETRY-AFTER (política "uzapi").
+                # Não idempotente: sem reenvio em ReadTimeout/5xx, que duplicaria a mensagem
+                response = requisitar_com_retry(
+                    requests.post, "uzapi",
                     f"{uzapi_url}/send-text",
                     json=payload,
                     headers=headers,
-                    timeout=30
+                    timeout=30,
+                    idempotente=False
                 )
                 
                 if response.status_code == 200:
                     logger.info(f"✅ WhatsApp enviado para {mencao['advogado']}")
                     enviados += 1
                 else:
-                    # ✅ RETRY PARA FALHAS HTTP
-                    logger.warning(f"⚠️ Retry UZAPI para {mencao['advogado']}: {response.status_code}")
-                    time.sleep(2)
-                    response_retry = requests.post(
-                        f"{uzapi_url}/send-text",
-                        json=payload,
-                        headers=headers,
-                        timeout=30
-                    )
-                    if response_retry.status_code == 200:
-                        logger.info(f"✅ WhatsApp enviado no retry para {mencao['advogado']}")
-                        enviados += 1
-                    else:
-                        logger.error(f"❌ Falha UZAPI após retry: {response_retry.status_code}")
+                    logger.error(f"❌ Falha UZAPI após retry: {response.status_code}")
                         
             except requests.Timeout:
                 logger.warning(f"⏰ Timeout UZAPI para {mencao['advogado']}")
@@ -0,0 +1,86 @@
+# app/scrapers/djerj/cache_texto.py
+# CACHE DO TEXTO EXTRAÍDO POR PÁGINA (ENDEREÇADO PELO SHA-256 DO PDF)
+
+import os
+import gzip
+import json
+import hashlib
+import logging
+from typing import Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# "0" desliga o cache (sempre extrai com o pdfminer)
+CACHE_TEXTO_PAGINAS = os.getenv("CACHE_TEXTO_PAGINAS", "1").strip() != "0"
+DIRETORIO_CACHE_TEXTO = "texto_paginas"
+ARQUIVO_COMPLETO = "completo.json"
+
+
+def sha256_arquivo(caminho: str, bloco: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for parte in iter(lambda: f.read(bloco), b""):
+            h.update(parte)
+    return h.hexdigest()
+
+
+class CacheTextoPaginas:
+    """
+    Texto de cada página gravado comprimido (gzip) ao lado do PDF, em
+    ``texto_paginas/<sha256 do PDF>/<variante>/<página>.txt.gz``. A chave é o conteúdo do
+    PDF, não o nome do arquivo: um PDF baixado de novo com outro conteúdo não
+    reaproveita texto antigo. ``completo.json`` marca que todas as páginas foram
+    extraídas, e aí o PDF nem precisa ser aberto pelo pdfminer.
+    """
+
+    def __init__(self, caminho_pdf: str, sha256: Optional[str] = None, variante: str = ""):
+        self.sha256 = sha256 or sha256_arquivo(caminho_pdf)
+        # ``variante`` separa textos de extratores diferentes para o mesmo PDF
+        self.diretorio_sha = os.path.join(os.path.dirname(os.path.abspath(caminho_pdf)), DIRETORIO_CACHE_TEXTO,
+                                          self.sha256)
+        self.diretorio = os.path.join(self.diretorio_sha, variante)
+
+    def _caminho(self, page_num: int) -> str:
+        return os.path.join(self.diretorio, f"{page_num:05d}.txt.gz")
+
+    def ler(self, page_num: int) -> Optional[str]:
+        try:
+            with gzip.open(self._caminho(page_num), "rt", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, UnicodeDecodeError) as e:
+            logger.warning(f"⚠️ Cache de texto corrompido na página {page_num}: {e}")
+            return None
+
+    def gravar(self, page_num: int, texto: str) -> None:
+        """Grava em arquivo temporário + rename: nunca deixa página pela metade."""
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            destino = self._caminho(page_num)
+            tmp = f"{destino}.{os.getpid()}.tmp"
+            with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=5) as f:
+                f.write(texto)
+            os.replace(tmp, destino)
+        except OSError as e:
+            logger.warning(f"⚠️ Não foi possível gravar o cache de texto da página {page_num}: {e}")
+
+    def total_paginas(self) -> Optional[int]:
+        """Total de páginas se a extração já foi concluída para este PDF, senão None."""
+        try:
+            with open(os.path.join(self.diretorio, ARQUIVO_COMPLETO), encoding="utf-8") as f:
+                return int(json.load(f)["paginas"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def marcar_completo(self, paginas: int) -> None:
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            with open(os.path.join(self.diretorio, ARQUIVO_COMPLETO), "w", encoding="utf-8") as f:
+                json.dump({"paginas": paginas}, f)
+        except OSError as e:
+            logger.warning(f"⚠️ Não foi possível marcar o cache de texto como completo: {e}")
+
+    def paginas(self, total: int, inicio: int = 1) -> Iterator[Tuple[int, Optional[str]]]:
+        for page_num in range(inicio, total + 1):
+            yield page_num, self.ler(page_num)
@@ -0,0 +1,71 @@
+# app/scrapers/djerj/checkpoint.py
+# CHECKPOINT POR PÁGINA: RETOMA O CADERNO DE ONDE A TAREFA ANTERIOR PAROU
+
+import os
+import json
+import logging
+from datetime import date
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Grava o checkpoint a cada K páginas processadas (0 desliga)
+CHECKPOINT_PAGINAS = int(os.getenv("CHECKPOINT_PAGINAS", "50"))
+VERSAO_CHECKPOINT = 1
+
+
+def caminho_checkpoint(dt: date, caderno: str) -> str:
+    cache_dir = os.getenv("CACHE_DIR", "/tmp")
+    return os.path.join(cache_dir, f"checkpoint_{dt.strftime('%Y%m%d')}_{caderno.upper()}.json")
+
+
+def carregar_checkpoint(dt: date, caderno: str, pdf_sha256: str) -> Optional[Dict]:
+    """
+    Checkpoint salvo para (data, caderno), ou None. Um checkpoint de outro PDF
+    (sha256 diferente, ex.: diário republicado) é descartado.
+    """
+    caminho = caminho_checkpoint(dt, caderno)
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            estado = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Checkpoint ilegível, ignorando: {e}")
+        return None
+
+    if estado.get("versao") != VERSAO_CHECKPOINT or estado.get("pdf_sha256") != pdf_sha256:
+        logger.info(f"Checkpoint de outro PDF para {dt.strftime('%d/%m/%Y')} [{caderno}]. Recomeçando.")
+        return None
+    return estado
+
+
+def salvar_checkpoint(dt: date, caderno: str, pdf_sha256: str, ultima_pagina: int, mencoes: List[List]) -> None:
+    """
+    Grava ``ultima_pagina`` (todas as páginas até ela já foram casadas) e as
+    menções ``[advogado_id, pagina, contexto]`` encontradas até ali. Escrita
+    atômica: uma tarefa morta no meio da gravação não corrompe o checkpoint.
+    """
+    caminho = caminho_checkpoint(dt, caderno)
+    tmp = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "versao": VERSAO_CHECKPOINT,
+                "pdf_sha256": pdf_sha256,
+                "ultima_pagina": ultima_pagina,
+                "mencoes": mencoes,
+            }, f, ensure_ascii=False)
+        os.replace(tmp, caminho)
+    except OSError as e:
+        logger.warning(f"⚠️ Não foi possível gravar o checkpoint: {e}")
+
+
+def remover_checkpoint(dt: date, caderno: str) -> None:
+    try:
+        os.remove(caminho_checkpoint(dt, caderno))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"⚠️ Não foi possível remover o checkpoint: {e}")
@@ -0,0 +1,188 @@
+# app/scrapers/djerj/download.py
+# DOWNLOAD DE PDF EM STREAMING DIRETO PARA O DISCO, RETOMÁVEL COM RANGE + LEITURA VIA MMAP
+
+import os
+import re
+import json
+import mmap
+import logging
+from typing import Dict, Optional, Tuple
+
+import requests
+
+from app.scrapers.utils.retry_policy import STATUS_RETENTAVEIS, politica_retry, retry_after_resposta
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_BLOCO_DOWNLOAD = 256 * 1024
+# O %%EOF pode vir seguido de espaços/quebras de linha ou lixo do servidor
+JANELA_TRAILER = 2048
+# Retomadas (Range) de um mesmo download antes de desistir; a pausa segue a política "djerj_download"
+TENTATIVAS_DOWNLOAD = int(os.getenv("TENTATIVAS_DOWNLOAD", "5"))
+
+CONTENT_RANGE_PATTERN = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)', re.IGNORECASE)
+STARTXREF_PATTERN = re.compile(rb'startxref\s+(\d+)\s+%%EOF')
+# Conexão que cai ou trava no meio do corpo: retoma do byte onde parou
+ERROS_RETOMAVEIS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+
+def abrir_mmap(caminho: str) -> mmap.mmap:
+    """
+    Abre o arquivo mapeado em memória (somente leitura). O mmap tem
+    ``read``/``seek``/``tell`` e serve de arquivo para o pdfminer e o PyPDF2:
+    as páginas vêm do cache do sistema sob demanda, sem copiar o PDF para o heap.
+    """
+    with open(caminho, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def validar_pdf(caminho: str) -> bool:
+    """
+    Cabeçalho ``%PDF`` no início e, no fim, ``startxref <offset> %%EOF`` com o
+    offset dentro do arquivo (PDF não truncado).
+    """
+    try:
+        if os.path.getsize(caminho) < 8:
+            return False
+        with open(caminho, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as dados:
+            if dados[:4] != b"%PDF":
+                return False
+            trailers = STARTXREF_PATTERN.findall(dados[max(0, len(dados) - JANELA_TRAILER):])
+            return bool(trailers) and int(trailers[-1]) < len(dados)
+    except (OSError, ValueError):
+        return False
+
+
+def _ler_meta(caminho: str) -> Dict:
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _gravar_meta(caminho: str, meta: Dict) -> None:
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def _descartar(*caminhos: str) -> None:
+    for caminho in caminhos:
+        if os.path.exists(caminho):
+            os.remove(caminho)
+
+
+def _faixa_resposta(response: requests.Response) -> Tuple[int, Optional[int]]:
+    """``(byte inicial, tamanho total)`` da resposta: Content-Range (206) ou Content-Length (200)."""
+    if response.status_code == 206:
+        match = CONTENT_RANGE_PATTERN.match(response.headers.get("Content-Range", ""))
+        if not match:
+            return -1, None
+        return int(match.group(1)), None if match.group(3) == "*" else int(match.group(3))
+    tamanho = response.headers.get("Content-Length")
+    return 0, int(tamanho) if tamanho and tamanho.isdigit() else None
+
+
+def baixar_pdf_streaming(session: requests.Session, url: str, destino: str,
+                         headers: Optional[Dict[str, str]] = None, timeout: int = 30,
+                         tentativas: int = TENTATIVAS_DOWNLOAD) -> Optional[int]:
+    """
+    Baixa ``url`` em blocos (``iter_content``) para ``<destino>.part`` e só o
+    renomeia para ``destino`` depois de conferir o tamanho anunciado pelo
+    servidor e a estrutura do PDF. A memória usada é a de um bloco.
+
+    Se a conexão cair ou travar no meio, o parcial é mantido e o download
+    continua de onde parou com ``Range: bytes=<n>-`` (até ``tentativas`` vezes,
+    com backoff e prazo da política "djerj_download"; 429/503 respeitam o Retry-After);
+    o parcial também sobrevive entre chamadas, então uma nova tentativa do
+    chamador retoma em vez de recomeçar. ``<destino>.part.json`` guarda o tamanho
+    total e o ETag: um parcial que não bate com o servidor é descartado.
+    Retorna o tamanho em bytes, ou None se não obteve um PDF completo.
+    """
+    os.makedirs(os.path.dirname(destino) or ".", exist_ok=True)
+    parcial = f"{destino}.part"
+    caminho_meta = f"{parcial}.json"
+    meta = _ler_meta(caminho_meta)
+    if os.path.exists(parcial) and not meta:
+        _descartar(parcial)  # parcial sem origem conhecida: não dá para retomar com segurança
+
+    politica = politica_retry("djerj_download").com(tentativas=tentativas)
+    retry_after = None
+    for tentativa in politica.tentativas(lambda: retry_after):
+        retry_after = None
+        offset = os.path.getsize(parcial) if os.path.exists(parcial) else 0
+        cabecalhos = {**(headers or {}), "Accept-Encoding": "identity"}  # tamanho em bytes do arquivo, sem gzip
+        if offset:
+            cabecalhos["Range"] = f"bytes={offset}-"
+            if meta.get("url") == url and meta.get("validador"):
+                cabecalhos["If-Range"] = meta["validador"]
+            logger.info(f"⏯️ Retomando download a partir de {offset / (1024 * 1024):.1f}MB: {url}")
+
+        try:
+            with session.get(url, headers=cabecalhos, timeout=timeout, stream=True) as response:
+                if response.status_code == 416 and offset:
+                    if meta.get("total") == offset:
+                        break  # o parcial já tem o arquivo inteiro
+                    _descartar(parcial, caminho_meta)
+                    meta = {}
+                    continue
+                if response.status_code in STATUS_RETENTAVEIS:
+                    retry_after = retry_after_resposta(response)
+                    logger.warning(f"Download respondeu {response.status_code} ({tentativa + 1}/{tentativas}): {url}")
+                    continue
+                if response.status_code not in (200, 206):
+                    logger.warning(f"Download respondeu {response.status_code}: {url}")
+                    return None
+
+                inicio, total = _faixa_resposta(response)
+                if response.status_code == 206 and (inicio != offset or (meta.get("total") and total != meta["total"])):
+                    # Faixa inesperada ou outro arquivo no servidor: recomeça do zero
+                    logger.warning(f"Parcial não confere com o servidor ({inicio}/{total}). Recomeçando.")
+                    _descartar(parcial, caminho_meta)
+                    meta = {}
+                    continue
+
+                meta = {"url": url, "total": total,
+                        "validador": response.headers.get("ETag") or response.headers.get("Last-Modified")}
+                _gravar_meta(caminho_meta, meta)
+                # 200 com parcial = servidor ignorou o Range (ou o arquivo mudou): reescreve do início
+                with open(parcial, "ab" if inicio else "wb") as f:
+                    primeiro_bloco = inicio == 0
+                    for bloco in response.iter_content(chunk_size=TAMANHO_BLOCO_DOWNLOAD):
+                        if not bloco:
+                            continue
+                        if primeiro_bloco and not bloco.startswith(b"%PDF"):
+                            logger.warning(f"Resposta não é PDF (início {bloco[:16]!r}): {url}")
+                            f.close()
+                            _descartar(parcial, caminho_meta)
+                            return None
+                        primeiro_bloco = False
+                        f.write(bloco)
+        except ERROS_RETOMAVEIS as e:
+            baixados = os.path.getsize(parcial) if os.path.exists(parcial) else 0
+            logger.warning(f"🔌 Download interrompido em {baixados / (1024 * 1024):.1f}MB ({e.__class__.__name__}). "
+                           f"Retomando ({tentativa + 1}/{tentativas})...")
+            continue
+
+        baixados = os.path.getsize(parcial) if os.path.exists(parcial) else 0
+        total = meta.get("total")
+        if total and baixados < total:
+            logger.warning(f"🔌 Conexão encerrada em {baixados}/{total} bytes. Retomando ({tentativa + 1}/{tentativas})...")
+            continue
+        if total and baixados > total:
+            logger.warning(f"Arquivo maior que o anunciado ({baixados}/{total} bytes): {url}")
+            _descartar(parcial, caminho_meta)
+            return None
+        break
+    else:
+        logger.warning(f"Download incompleto dentro da política de retry; parcial mantido para retomar: {url}")
+        return None
+
+    if not validar_pdf(parcial):
+        logger.warning(f"PDF incompleto ou inválido ({os.path.getsize(parcial)} bytes): {url}")
+        _descartar(parcial, caminho_meta)
+        return None
+    tamanho = os.path.getsize(parcial)
+    os.replace(parcial, destino)
+    _descartar(caminho_meta)
+    return tamanho
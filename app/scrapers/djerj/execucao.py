@@ -0,0 +1,96 @@
+# app/scrapers/djerj/execucao.py
+# MÁQUINA DE ESTADOS POR (DATA, CADERNO): RETENTATIVAS RETOMAM NA PRIMEIRA ETAPA INCOMPLETA
+
+import json
+import logging
+from datetime import date
+from typing import Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import ExecucaoCaderno
+
+logger = logging.getLogger(__name__)
+
+# Ordem das etapas; ``ExecucaoCaderno.etapa`` guarda a última concluída
+ETAPAS = ("url_resolvida", "baixado", "extraido", "casado", "persistido", "notificado")
+
+STATUS_EM_ANDAMENTO = "em_andamento"
+STATUS_FALHOU = "falhou"
+STATUS_CONCLUIDO = "concluido"
+
+
+def iniciar_execucao(dt: date, caderno: str) -> ExecucaoCaderno:
+    """Busca (ou cria) a execução de (data, caderno) e conta mais uma tentativa."""
+    execucao = ExecucaoCaderno.query.filter_by(data_publicacao=dt, caderno=caderno).first()
+    if execucao is None:
+        execucao = ExecucaoCaderno(data_publicacao=dt, caderno=caderno, status=STATUS_EM_ANDAMENTO, tentativas=0)
+        db.session.add(execucao)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Outro worker criou a mesma execução ao mesmo tempo
+            db.session.rollback()
+            execucao = ExecucaoCaderno.query.filter_by(data_publicacao=dt, caderno=caderno).one()
+
+    if execucao.status != STATUS_CONCLUIDO:
+        execucao.status = STATUS_EM_ANDAMENTO
+        execucao.erro = None
+        execucao.tentativas = (execucao.tentativas or 0) + 1
+        db.session.commit()
+    return execucao
+
+
+def etapa_concluida(execucao: ExecucaoCaderno, etapa: str) -> bool:
+    return bool(execucao.etapa) and ETAPAS.index(execucao.etapa) >= ETAPAS.index(etapa)
+
+
+def proxima_etapa(execucao: ExecucaoCaderno) -> Optional[str]:
+    """Primeira etapa ainda não concluída, ou None se o caderno terminou."""
+    if not execucao.etapa:
+        return ETAPAS[0]
+    indice = ETAPAS.index(execucao.etapa) + 1
+    return ETAPAS[indice] if indice < len(ETAPAS) else None
+
+
+def tempos_execucao(execucao: ExecucaoCaderno) -> Dict[str, float]:
+    try:
+        return json.loads(execucao.tempos) if execucao.tempos else {}
+    except ValueError:
+        return {}
+
+
+def concluir_etapa(execucao: ExecucaoCaderno, etapa: str, segundos: float = 0.0, **campos) -> None:
+    """
+    Marca ``etapa`` como concluída (com o tempo gasto) e grava ``campos`` na
+    execução. Nunca volta a etapa: concluir uma etapa anterior só registra o tempo.
+    """
+    for nome, valor in campos.items():
+        setattr(execucao, nome, valor)
+    tempos = tempos_execucao(execucao)
+    tempos[etapa] = round(tempos.get(etapa, 0.0) + segundos, 3)
+    execucao.tempos = json.dumps(tempos)
+    if not etapa_concluida(execucao, etapa):
+        execucao.etapa = etapa
+    if execucao.etapa == ETAPAS[-1]:
+        execucao.status = STATUS_CONCLUIDO
+    db.session.commit()
+    logger.info(f"⏱️ [{execucao.caderno}] Etapa '{etapa}' concluída em {segundos:.2f}s")
+
+
+def registrar_falha(execucao: ExecucaoCaderno, etapa: str, erro: str) -> None:
+    """Guarda onde e por que a tentativa parou; a próxima retoma em ``etapa``."""
+    db.session.rollback()
+    execucao.status = STATUS_FALHOU
+    execucao.erro = f"{etapa}: {erro}"[:2000]
+    db.session.commit()
+    logger.error(f"❌ [{execucao.caderno}] Falha na etapa '{etapa}': {erro}")
+
+
+def execucoes_pendentes(dt: date) -> List[ExecucaoCaderno]:
+    """Execuções da data que ainda não chegaram à última etapa."""
+    return ExecucaoCaderno.query.filter(
+        ExecucaoCaderno.data_publicacao == dt,
+        ExecucaoCaderno.status != STATUS_CONCLUIDO,
+    ).all()
@@ -0,0 +1,357 @@
+# app/scrapers/djerj/extracao.py
+# EXTRAÇÃO DE TEXTO DO PDF (SEQUENCIAL OU POR BLOCOS DE PÁGINAS EM PROCESSOS)
+
+import os
+import re
+import logging
+import multiprocessing
+from io import StringIO
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from PyPDF2 import PdfReader
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdftypes import resolve1
+from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+from pdfminer.converter import TextConverter
+from pdfminer.layout import LAParams
+
+from app.scrapers.djerj.cache_texto import CacheTextoPaginas, CACHE_TEXTO_PAGINAS
+from app.scrapers.djerj.download import abrir_mmap
+from app.scrapers.djerj.gerenciador_cache import TIPO_TEXTO, obter_gerenciador_cache
+from app.scrapers.djerj.pipeline import ler_processos, limitar_processos
+
+logger = logging.getLogger(__name__)
+
+PAGINAS_POR_BLOCO = int(os.getenv("PAGINAS_POR_BLOCO", "25"))
+
+# Backend tentado primeiro em cada página ("pypdf2", "pdfminer" ou "pdfminer_layout").
+# Padrão: pdfminer com layout, o extrator de produção. Os mais rápidos são opt-in até o
+# benchmark_extracao mostrar o mesmo recall: se o texto sair quebrado, a página é
+# refeita com o pdfminer com layout, mas isso não pega nomes perdidos.
+BACKEND_LAYOUT = "pdfminer_layout"
+EXTRACAO_BACKEND = os.getenv("EXTRACAO_BACKEND", BACKEND_LAYOUT).strip().lower()
+
+# Heurística de texto quebrado
+TAMANHO_MINIMO_TEXTO = 50
+TAMANHO_MAXIMO_LINHA = 300           # sem quebras de linha: layout perdido
+PROPORCAO_MAXIMA_COLADAS = 0.03      # palavras coladas / total de palavras
+PALAVRA_COLADA_PATTERN = re.compile(r"\S{25,}|[a-zà-ÿ][A-ZÀ-Þ]|\d[A-Za-zÀ-ÿ]{3,}")
+
+
+def obter_processos_extracao() -> int:
+    """PROCESSOS_EXTRACAO (padrão 1 = sequencial; "0" = núcleos disponíveis). Sempre 1 em worker daemônico."""
+    return ler_processos("PROCESSOS_EXTRACAO")
+
+
+def extract_text_from_page(page, layout: bool = True) -> str:
+    resource_manager = PDFResourceManager()
+    buf = StringIO()
+    converter = TextConverter(resource_manager, buf, laparams=LAParams() if layout else None)
+    interpreter = PDFPageInterpreter(resource_manager, converter)
+    try:
+        interpreter.process_page(page)
+        return buf.getvalue()
+    finally:
+        converter.close()
+        buf.close()
+
+
+def contar_paginas(caminho_pdf: str) -> int:
+    """Total de páginas pelo /Count da árvore de páginas (sem interpretar conteúdo)."""
+    with abrir_mmap(caminho_pdf) as fp:
+        documento = PDFDocument(PDFParser(fp))
+        try:
+            return int(resolve1(resolve1(documento.catalog["Pages"])["Count"]))
+        except Exception:
+            return sum(1 for _ in PDFPage.create_pages(documento))
+
+
+def texto_parece_quebrado(texto: str, checar_linhas: bool = True) -> bool:
+    """
+    Texto curto demais, sem quebras de linha ou com muitas palavras coladas.
+    ``checar_linhas=False`` para backends que nunca emitem quebras de linha.
+    """
+    conteudo = texto.strip() if texto else ""
+    if len(conteudo) < TAMANHO_MINIMO_TEXTO:
+        return True
+    if checar_linhas and len(conteudo) / (conteudo.count("\n") + 1) > TAMANHO_MAXIMO_LINHA:
+        return True
+    palavras = conteudo.split()
+    coladas = sum(1 for palavra in palavras if PALAVRA_COLADA_PATTERN.search(palavra))
+    return coladas / len(palavras) > PROPORCAO_MAXIMA_COLADAS
+
+
+class DocumentoPdf:
+    """
+    PDF aberto para os backends de extração, mapeado em memória (mmap): o
+    arquivo não é copiado para o heap, nem pelo PyPDF2. As páginas do pdfminer
+    são lidas em ordem crescente, sem guardar o documento inteiro; o leitor do
+    PyPDF2 (com mmap próprio, já que cada leitor move a posição) só é criado se
+    algum backend precisar dele.
+    """
+
+    def __init__(self, caminho_pdf: str, pagenos: Optional[Iterable[int]] = None):
+        self.caminho_pdf = caminho_pdf
+        self.pagenos = sorted(pagenos) if pagenos is not None else None  # 1-based
+        self._fp = None
+        self._paginas = None
+        self._atual: Tuple[int, object] = (0, None)
+        self._leitor = None
+        self._mmap_leitor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def fechar(self) -> None:
+        self._paginas = None
+        self._leitor = None
+        for mapa in (self._fp, self._mmap_leitor):
+            if mapa is not None:
+                try:
+                    mapa.close()
+                except BufferError:
+                    pass  # ainda há views exportadas; o GC fecha depois
+        self._fp = self._mmap_leitor = None
+
+    def pagina_pdfminer(self, page_num: int):
+        if self._paginas is None:
+            self._fp = abrir_mmap(self.caminho_pdf)
+            if self.pagenos is None:
+                self._paginas = enumerate(PDFPage.get_pages(self._fp), 1)
+            else:
+                pagenos = {n - 1 for n in self.pagenos}  # pagenos do pdfminer é 0-based
+                self._paginas = zip(self.pagenos, PDFPage.get_pages(self._fp, pagenos=pagenos))
+        while self._atual[0] < page_num:
+            self._atual = next(self._paginas, (float("inf"), None))
+        if self._atual[0] != page_num:
+            raise IndexError(f"Página {page_num} fora de ordem ou inexistente")
+        return self._atual[1]
+
+    @property
+    def leitor(self) -> PdfReader:
+        if self._leitor is None:
+            self._mmap_leitor = abrir_mmap(self.caminho_pdf)
+            self._leitor = PdfReader(self._mmap_leitor)
+        return self._leitor
+
+
+def _backend_pdfminer_layout(documento: DocumentoPdf, page_num: int) -> str:
+    return extract_text_from_page(documento.pagina_pdfminer(page_num))
+
+
+def _backend_pdfminer(documento: DocumentoPdf, page_num: int) -> str:
+    return extract_text_from_page(documento.pagina_pdfminer(page_num), layout=False)
+
+
+def _backend_pypdf2(documento: DocumentoPdf, page_num: int) -> str:
+    return documento.leitor.pages[page_num - 1].extract_text() or ""
+
+
+# nome -> extrair(documento, page_num) -> texto. Novos backends entram aqui
+BACKENDS: Dict[str, Callable[[DocumentoPdf, int], str]] = {
+    "pypdf2": _backend_pypdf2,
+    "pdfminer": _backend_pdfminer,
+    BACKEND_LAYOUT: _backend_pdfminer_layout,
+}
+# pdfminer sem LAParams não agrupa linhas: o texto sai sem "\n" e só as palavras coladas contam
+BACKENDS_SEM_LINHAS = {"pdfminer"}
+if EXTRACAO_BACKEND not in BACKENDS:
+    logger.warning(f"⚠️ EXTRACAO_BACKEND '{EXTRACAO_BACKEND}' desconhecido. Usando {BACKEND_LAYOUT}.")
+    EXTRACAO_BACKEND = BACKEND_LAYOUT
+
+
+def extrair_texto_pagina(documento: DocumentoPdf, page_num: int, backend: str = EXTRACAO_BACKEND) -> Tuple[str, str]:
+    """
+    Extrai a página com ``backend`` e, se o texto parecer quebrado, refaz com o
+    pdfminer com layout. Retorna ``(texto, backend usado)``. Exceções do backend
+    de layout sobem para quem chamou.
+    """
+    if backend != BACKEND_LAYOUT:
+        try:
+            texto = BACKENDS[backend](documento, page_num)
+            if not texto_parece_quebrado(texto, checar_linhas=backend not in BACKENDS_SEM_LINHAS):
+                return texto, backend
+        except Exception as e:
+            logger.debug(f"Backend {backend} falhou na página {page_num}: {e}")
+    return BACKENDS[BACKEND_LAYOUT](documento, page_num), BACKEND_LAYOUT
+
+
+def _registrar_backends(usos: Counter) -> None:
+    if usos:
+        logger.info("📄 Páginas por backend: " + ", ".join(f"{nome}={total}" for nome, total in usos.most_common()))
+
+
+def extrair_bloco(caminho_pdf: str, inicio: int, fim: int, sha256: Optional[str] = None) -> List[Tuple[int, Optional[str], Optional[str]]]:
+    """
+    Extrai as páginas ``inicio..fim`` (1-based, inclusivo) abrindo o próprio PDF.
+    Roda em outro processo: páginas já no cache de texto são lidas dele e as
+    novas são gravadas lá. Retorna ``(page_num, texto, backend)``; página que
+    falhou volta com texto ``None`` e página do cache com backend ``None``.
+    """
+    cache = CacheTextoPaginas(caminho_pdf, sha256, EXTRACAO_BACKEND) if sha256 else None
+    resultado = []
+    faltando = []
+    for page_num in range(inicio, fim + 1):
+        texto = cache.ler(page_num) if cache else None
+        resultado.append((page_num, texto, None))
+        if texto is None:
+            faltando.append(page_num)
+    if not faltando:
+        return resultado
+
+    extraidos = {}
+    with DocumentoPdf(caminho_pdf, faltando) as documento:
+        for page_num in faltando:
+            try:
+                extraidos[page_num] = extrair_texto_pagina(documento, page_num)
+            except Exception as e:
+                logger.error(f"Erro ao extrair página {page_num}: {e}")
+                continue
+            if cache:
+                cache.gravar(page_num, extraidos[page_num][0])
+    return [(page_num, texto, None) if texto is not None else (page_num, *extraidos.get(page_num, (None, None)))
+            for page_num, texto, _ in resultado]
+
+
+def _extrair_sequencial(caminho_pdf: str, cache: Optional[CacheTextoPaginas], proxima: int,
+                        marcar_completo: bool = True) -> Iterator[Tuple[int, str]]:
+    total = contar_paginas(caminho_pdf)
+    reaproveitadas = 0
+    falhas = 0
+    usos = Counter()
+    with DocumentoPdf(caminho_pdf) as documento:
+        for page_num in range(proxima, total + 1):
+            texto = cache.ler(page_num) if cache else None
+            if texto is not None:
+                reaproveitadas += 1
+            else:
+                try:
+                    texto, backend = extrair_texto_pagina(documento, page_num)
+                except Exception as e:
+                    logger.error(f"Erro ao extrair página {page_num}: {e}")
+                    falhas += 1
+                    continue
+                usos[backend] += 1
+                if cache:
+                    cache.gravar(page_num, texto)
+            yield page_num, texto
+
+    _registrar_backends(usos)
+    if cache:
+        if reaproveitadas:
+            logger.info(f"📄 {reaproveitadas} páginas reaproveitadas do cache de texto")
+        if not falhas and marcar_completo:
+            cache.marcar_completo(total)
+
+
+def _extrair_paralelo(caminho_pdf: str, cache: Optional[CacheTextoPaginas], proxima: int, processos: int,
+                      marcar_completo: bool = True) -> Iterator[Tuple[int, str]]:
+    """
+    Divide o PDF em blocos de ``PAGINAS_POR_BLOCO`` páginas; cada processo abre o
+    mesmo arquivo e extrai o seu bloco com ``PDFPage.get_pages(pagenos=...)``.
+    Os blocos voltam na ordem das páginas, com no máximo ``processos * 2`` em voo.
+    """
+    total = contar_paginas(caminho_pdf)
+    sha256 = cache.sha256 if cache else None
+    blocos = [(inicio, min(inicio + PAGINAS_POR_BLOCO - 1, total))
+              for inicio in range(proxima, total + 1, PAGINAS_POR_BLOCO)]
+    if not blocos:
+        return
+
+    # forkserver/spawn: o pool nasce dentro da thread de extração do pipeline,
+    # e fork com outras threads vivas não é seguro
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        contexto_mp = multiprocessing.get_context("forkserver")
+        contexto_mp.set_forkserver_preload([__name__])  # pdfminer importado uma vez no servidor
+    else:
+        contexto_mp = multiprocessing.get_context("spawn")
+    logger.info(f"⚙️ Extração paralela: {total} páginas em {len(blocos)} blocos, {processos} processos")
+
+    falhas = 0
+    usos = Counter()
+    with ProcessPoolExecutor(max_workers=min(processos, len(blocos)), mp_context=contexto_mp) as executor:
+        pendentes = deque()
+        blocos_restantes = iter(blocos)
+        for inicio, fim in blocos_restantes:
+            pendentes.append((inicio, executor.submit(extrair_bloco, caminho_pdf, inicio, fim, sha256)))
+            if len(pendentes) >= processos * 2:
+                break
+        while pendentes:
+            inicio, futuro = pendentes.popleft()
+            proximo_bloco = next(blocos_restantes, None)
+            if proximo_bloco:
+                pendentes.append((proximo_bloco[0], executor.submit(extrair_bloco, caminho_pdf, *proximo_bloco, sha256)))
+            try:
+                paginas = futuro.result()
+            except Exception as e:
+                logger.error(f"Erro ao extrair bloco a partir da página {inicio}: {e}")
+                falhas += 1
+                continue
+            for page_num, texto, backend in paginas:
+                if texto is None:
+                    falhas += 1
+                    continue
+                if backend:
+                    usos[backend] += 1
+                yield page_num, texto
+
+    _registrar_backends(usos)
+    if cache and not falhas and marcar_completo:
+        cache.marcar_completo(total)
+
+
+def extrair_paginas_pdf(caminho_pdf: str, processos: int = 1, primeira_pagina: int = 1,
+                        pdf_sha256: Optional[str] = None) -> Iterator[Tuple[int, str]]:
+    """
+    Gera ``(page_num, raw_text)`` para cada página do PDF, na ordem, a partir de
+    ``primeira_pagina`` (retomada de checkpoint: as anteriores nem são extraídas).
+
+    Cada página passa primeiro pelo backend ``EXTRACAO_BACKEND`` e só volta ao
+    pdfminer com layout se o texto parecer quebrado. O texto extraído fica no
+    ``CacheTextoPaginas`` ao lado do PDF: numa nova execução sobre o mesmo PDF
+    (retentativa, fallback das 21h) as páginas já extraídas vão direto para o
+    casamento. Com ``processos > 1`` a extração é feita por blocos em paralelo.
+    ``pdf_sha256``, se quem chama já o calculou, evita ler o PDF de novo só para o hash.
+    """
+    cache = CacheTextoPaginas(caminho_pdf, pdf_sha256, EXTRACAO_BACKEND) if CACHE_TEXTO_PAGINAS else None
+    if not cache:
+        yield from _extrair_paginas(caminho_pdf, None, processos, primeira_pagina)
+        return
+    # Texto deste PDF fixado no cache enquanto é lido/gravado (fora da LRU)
+    with obter_gerenciador_cache().em_uso(cache.diretorio_sha):
+        yield from _extrair_paginas(caminho_pdf, cache, processos, primeira_pagina)
+
+
+def _extrair_paginas(caminho_pdf: str, cache: Optional[CacheTextoPaginas], processos: int,
+                     primeira_pagina: int) -> Iterator[Tuple[int, str]]:
+    proxima = max(1, primeira_pagina)
+
+    total = cache.total_paginas() if cache else None
+    if cache:
+        # Último acesso do texto deste PDF (LRU do CACHE_DIR) + acerto/falha
+        obter_gerenciador_cache().tocar(cache.diretorio_sha, TIPO_TEXTO, acerto=total is not None)
+    if total is not None:
+        for page_num, texto in cache.paginas(total, proxima):
+            if texto is None:
+                break  # página faltando no cache: completa pelo PDF a partir daqui
+            yield page_num, texto
+            proxima = page_num + 1
+        else:
+            logger.info(f"📄 Texto das páginas {max(1, primeira_pagina)}-{total} lido do cache ({cache.sha256[:12]})")
+            return
+
+    # Só marca o cache como completo se as páginas puladas vieram dele
+    marcar_completo = primeira_pagina <= 1
+    if limitar_processos(processos, "PROCESSOS_EXTRACAO") > 1:
+        yield from _extrair_paralelo(caminho_pdf, cache, proxima, processos, marcar_completo)
+    else:
+        yield from _extrair_sequencial(caminho_pdf, cache, proxima, marcar_completo)
+    if cache:
+        obter_gerenciador_cache().registrar(cache.diretorio_sha, TIPO_TEXTO)
@@ -0,0 +1,389 @@
+# app/scrapers/djerj/gerenciador_cache.py
+# GERENCIADOR DO CACHE EM DISCO (PDFs + TEXTO POR PÁGINA): ÍNDICE, LIMITE EM BYTES COM LRU, COMPRESSÃO E ESTATÍSTICAS
+
+import os
+import re
+import gzip
+import json
+import time
+import fcntl
+import shutil
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from app.scrapers.djerj.cache_texto import DIRETORIO_CACHE_TEXTO
+
+logger = logging.getLogger(__name__)
+
+# Orçamento total do cache (PDFs + texto extraído); "0" desliga a remoção
+CACHE_MAX_MB = int(os.getenv("CACHE_MAX_MB", "2048"))
+# PDFs sem acesso há mais que isso são guardados como .pdf.gz ("0" desliga)
+CACHE_COMPRIMIR_HORAS = float(os.getenv("CACHE_COMPRIMIR_HORAS", "24"))
+# Entradas acessadas há menos que isso nunca são removidas nem comprimidas, mesmo sem ``em_uso``
+CACHE_PROTECAO_MINUTOS = float(os.getenv("CACHE_PROTECAO_MINUTOS", "60"))
+
+ARQUIVO_INDICE = "cache_index.json"
+VERSAO_INDICE = 1
+TIPO_PDF = "pdf"
+TIPO_TEXTO = "texto"
+PDF_CACHE_PATTERN = re.compile(r"^diario_\d{8}_[A-Za-z0-9_-]+\.pdf(?:\.gz)?$")
+
+
+def _tamanho(caminho: str) -> int:
+    """Bytes de um arquivo ou, para diretório, a soma dos arquivos dentro dele."""
+    if os.path.isdir(caminho):
+        total = 0
+        for raiz, _, arquivos in os.walk(caminho):
+            for nome in arquivos:
+                try:
+                    total += os.path.getsize(os.path.join(raiz, nome))
+                except OSError:
+                    pass
+        return total
+    try:
+        return os.path.getsize(caminho)
+    except OSError:
+        return 0
+
+
+def _processo_vivo(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class GerenciadorCache:
+    """
+    Mantém ``CACHE_DIR`` dentro de ``CACHE_MAX_MB``. O índice
+    (``cache_index.json``) guarda, por entrada (``diario_*.pdf`` ou
+    ``texto_paginas/<sha256>``), o tamanho, o último acesso e se está
+    comprimida, além dos acertos/falhas por tipo. Quando o total passa do
+    limite, as entradas acessadas há mais tempo saem primeiro (LRU). Entradas
+    fixadas com ``em_uso`` (PDF/texto de um caderno em processamento) nunca
+    saem nem são comprimidas. ``manutencao()`` transforma em ``.pdf.gz`` os
+    PDFs parados há ``CACHE_COMPRIMIR_HORAS``, descomprimidos no próximo
+    acerto. O índice é lido e regravado sob ``flock``: vale entre threads e
+    entre workers do Celery. O gzip (nos dois sentidos) roda fora do ``flock``.
+    """
+
+    def __init__(self, diretorio: str, limite_bytes: int = CACHE_MAX_MB * 1024 * 1024,
+                 comprimir_apos_s: float = CACHE_COMPRIMIR_HORAS * 3600,
+                 protecao_s: float = CACHE_PROTECAO_MINUTOS * 60):
+        self.diretorio = diretorio
+        self.limite_bytes = limite_bytes
+        self.comprimir_apos_s = comprimir_apos_s
+        self.protecao_s = protecao_s
+        self._caminho_indice = os.path.join(diretorio, ARQUIVO_INDICE)
+        self._reconciliado = False
+
+    # ----- índice -----
+    def _ler_indice(self) -> Dict:
+        try:
+            with open(self._caminho_indice, encoding="utf-8") as f:
+                indice = json.load(f)
+            if indice.get("versao") == VERSAO_INDICE:
+                return indice
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Índice do cache ilegível, reconstruindo: {e}")
+        return {"versao": VERSAO_INDICE, "entradas": {}, "estatisticas": {}, "em_uso": {}}
+
+    def _gravar_indice(self, indice: Dict) -> None:
+        tmp = f"{self._caminho_indice}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(indice, f, ensure_ascii=False)
+            os.replace(tmp, self._caminho_indice)
+        except OSError as e:
+            logger.warning(f"⚠️ Não foi possível gravar o índice do cache: {e}")
+
+    @contextmanager
+    def _indice(self):
+        """Índice travado para leitura + escrita; regravado na saída do bloco."""
+        os.makedirs(self.diretorio, exist_ok=True)
+        with open(f"{self._caminho_indice}.lock", "a") as trava:
+            fcntl.flock(trava, fcntl.LOCK_EX)
+            try:
+                indice = self._ler_indice()
+                if not self._reconciliado:
+                    self._reconciliar(indice)
+                    self._reconciliado = True
+                yield indice
+                self._gravar_indice(indice)
+            finally:
+                fcntl.flock(trava, fcntl.LOCK_UN)
+
+    def gerencia(self, caminho: str) -> bool:
+        """``caminho`` está dentro do diretório do cache?"""
+        return not self._chave(caminho).startswith("..")
+
+    def _chave(self, caminho: str) -> str:
+        chave = os.path.relpath(os.path.abspath(caminho), os.path.abspath(self.diretorio))
+        return chave[:-3] if chave.endswith(".gz") else chave
+
+    def _reconciliar(self, indice: Dict) -> None:
+        """Inclui arquivos que já estavam no disco (ex.: de antes do índice) e esquece os que sumiram."""
+        entradas = indice["entradas"]
+        for chave in list(entradas):
+            if not os.path.exists(os.path.join(self.diretorio, chave + (".gz" if entradas[chave].get("comprimido") else ""))):
+                del entradas[chave]
+
+        candidatos = []
+        try:
+            candidatos += [(nome, TIPO_PDF) for nome in os.listdir(self.diretorio) if PDF_CACHE_PATTERN.match(nome)]
+        except OSError:
+            pass
+        dir_texto = os.path.join(self.diretorio, DIRETORIO_CACHE_TEXTO)
+        if os.path.isdir(dir_texto):
+            candidatos += [(os.path.join(DIRETORIO_CACHE_TEXTO, nome), TIPO_TEXTO) for nome in os.listdir(dir_texto)]
+        for relativo, tipo in candidatos:
+            caminho = os.path.join(self.diretorio, relativo)
+            chave = self._chave(caminho)
+            if chave not in entradas:
+                entradas[chave] = {"tipo": tipo, "tamanho": _tamanho(caminho),
+                                   "ultimo_acesso": os.path.getmtime(caminho), "comprimido": relativo.endswith(".gz")}
+
+    # ----- API -----
+    def obter_pdf(self, caminho: str, validar: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """
+        ``caminho`` se o PDF está no cache (descomprimindo o ``.pdf.gz`` se
+        preciso e conferindo com ``validar``), senão None. Conta acerto/falha.
+        """
+        chave = self._chave(caminho)
+        with self._indice() as indice:
+            entrada = indice["entradas"].get(chave)
+            if not (entrada and entrada.get("comprimido") and not os.path.exists(caminho)):
+                return self._conferir_pdf(indice, chave, caminho, validar)
+            # Fixada enquanto descomprime fora do flock: a manutenção não mexe nela
+            self._fixar(indice, chave)
+
+        self._descomprimir(caminho)
+        with self._indice() as indice:
+            self._liberar(indice, chave)
+            entrada = indice["entradas"].get(chave)
+            if entrada and os.path.exists(caminho):
+                entrada["comprimido"] = False
+                entrada["tamanho"] = _tamanho(caminho)
+            elif entrada:
+                del indice["entradas"][chave]  # .gz corrompido/sumiu
+            return self._conferir_pdf(indice, chave, caminho, validar)
+
+    def _conferir_pdf(self, indice: Dict, chave: str, caminho: str,
+                      validar: Optional[Callable[[str], bool]]) -> Optional[str]:
+        acerto = os.path.exists(caminho) and (validar is None or validar(caminho))
+        if acerto:
+            entrada = indice["entradas"].setdefault(
+                chave, {"tipo": TIPO_PDF, "tamanho": _tamanho(caminho), "comprimido": False})
+            entrada["ultimo_acesso"] = time.time()
+        self._contar(indice, TIPO_PDF, acerto)
+        return caminho if acerto else None
+
+    def registrar(self, caminho: str, tipo: str = TIPO_PDF) -> None:
+        """Anota uma entrada recém-gravada (PDF baixado, texto extraído) e aplica o limite (só LRU)."""
+        if not self.gerencia(caminho):
+            return
+        chave = self._chave(caminho)
+        with self._indice() as indice:
+            indice["entradas"][chave] = {"tipo": tipo, "tamanho": _tamanho(caminho),
+                                         "ultimo_acesso": time.time(), "comprimido": False}
+            self._aplicar_limites(indice)
+
+    def tocar(self, caminho: str, tipo: str = TIPO_TEXTO, acerto: Optional[bool] = None) -> None:
+        """Atualiza o último acesso (e conta acerto/falha, se ``acerto`` vier)."""
+        if not self.gerencia(caminho):
+            return
+        chave = self._chave(caminho)
+        with self._indice() as indice:
+            entrada = indice["entradas"].get(chave)
+            if entrada:
+                entrada["ultimo_acesso"] = time.time()
+            if acerto is not None:
+                self._contar(indice, tipo, acerto)
+
+    @contextmanager
+    def em_uso(self, caminho: str):
+        """
+        Fixa a entrada enquanto o bloco roda: não é removida nem comprimida,
+        mesmo passada a ``CACHE_PROTECAO_MINUTOS``. Vale entre processos (o pid
+        fica no índice; pids que já morreram são ignorados). Pode vir antes de
+        o arquivo existir (ex.: caderno que ainda vai baixar o PDF).
+        """
+        if not self.gerencia(caminho):
+            yield
+            return
+        chave = self._chave(caminho)
+        with self._indice() as indice:
+            self._fixar(indice, chave)
+        try:
+            yield
+        finally:
+            with self._indice() as indice:
+                self._liberar(indice, chave)
+
+    def aplicar_limites(self) -> None:
+        with self._indice() as indice:
+            self._aplicar_limites(indice)
+
+    def manutencao(self) -> None:
+        """
+        Comprime os PDFs parados há ``CACHE_COMPRIMIR_HORAS`` e aplica o limite.
+        Fora do caminho de download: o gzip roda sem o ``flock``, e o ``.pdf.gz``
+        só substitui o PDF se ninguém o usou enquanto isso.
+        """
+        if self.comprimir_apos_s > 0:
+            with self._indice() as indice:
+                fixadas = self._fixadas(indice)
+                limite = time.time() - max(self.comprimir_apos_s, self.protecao_s)
+                alvos = {chave: entrada.get("ultimo_acesso", 0) for chave, entrada in indice["entradas"].items()
+                         if entrada["tipo"] == TIPO_PDF and not entrada.get("comprimido")
+                         and chave not in fixadas and entrada.get("ultimo_acesso", 0) <= limite}
+            for chave, ultimo_acesso in alvos.items():
+                caminho = os.path.join(self.diretorio, chave)
+                tmp = self._comprimir(caminho)
+                if tmp is None:
+                    continue
+                with self._indice() as indice:
+                    entrada = indice["entradas"].get(chave)
+                    if (not entrada or entrada.get("comprimido") or entrada.get("ultimo_acesso", 0) != ultimo_acesso
+                            or chave in self._fixadas(indice)):
+                        self._remover(tmp)  # acessado/fixado durante a compressão: fica como está
+                        continue
+                    try:
+                        os.replace(tmp, f"{caminho}.gz")
+                        os.remove(caminho)
+                    except OSError as e:
+                        logger.warning(f"⚠️ Não foi possível comprimir {caminho}: {e}")
+                        self._remover(tmp)
+                        continue
+                    entrada["comprimido"] = True
+                    entrada["tamanho"] = _tamanho(f"{caminho}.gz")
+                    logger.info(f"🗜️ Cache: comprimido {chave}")
+        self.aplicar_limites()
+
+    def estatisticas(self) -> Dict[str, Dict]:
+        """``{tipo: {acertos, falhas, taxa_acerto}}`` + ``total`` (bytes e entradas no índice)."""
+        with self._indice() as indice:
+            resumo = {}
+            for tipo, contagem in indice["estatisticas"].items():
+                consultas = contagem.get("acertos", 0) + contagem.get("falhas", 0)
+                resumo[tipo] = {**contagem, "taxa_acerto": round(contagem.get("acertos", 0) / consultas, 3) if consultas else 0.0}
+            resumo["total"] = {"bytes": sum(e["tamanho"] for e in indice["entradas"].values()),
+                               "entradas": len(indice["entradas"])}
+        return resumo
+
+    # ----- internos -----
+    @staticmethod
+    def _contar(indice: Dict, tipo: str, acerto: bool) -> None:
+        contagem = indice["estatisticas"].setdefault(tipo, {"acertos": 0, "falhas": 0})
+        contagem["acertos" if acerto else "falhas"] += 1
+
+    @staticmethod
+    def _fixar(indice: Dict, chave: str) -> None:
+        indice.setdefault("em_uso", {}).setdefault(chave, []).append(os.getpid())
+
+    @staticmethod
+    def _liberar(indice: Dict, chave: str) -> None:
+        pids = indice.setdefault("em_uso", {}).get(chave, [])
+        if os.getpid() in pids:
+            pids.remove(os.getpid())
+        if not pids:
+            indice["em_uso"].pop(chave, None)
+
+    @staticmethod
+    def _fixadas(indice: Dict) -> set:
+        """Chaves fixadas por processos vivos (as de processos mortos são descartadas)."""
+        em_uso = indice.setdefault("em_uso", {})
+        for chave in list(em_uso):
+            em_uso[chave] = [pid for pid in em_uso[chave] if _processo_vivo(pid)]
+            if not em_uso[chave]:
+                del em_uso[chave]
+        return set(em_uso)
+
+    def _aplicar_limites(self, indice: Dict) -> None:
+        entradas = indice["entradas"]
+        agora = time.time()
+        if self.limite_bytes <= 0:
+            return
+        total = sum(e["tamanho"] for e in entradas.values())
+        if total <= self.limite_bytes:
+            return
+        fixadas = self._fixadas(indice)
+        # LRU: menos recentes primeiro
+        for chave in sorted(entradas, key=lambda c: entradas[c].get("ultimo_acesso", 0)):
+            if total <= self.limite_bytes:
+                break
+            entrada = entradas[chave]
+            if chave in fixadas or agora - entrada.get("ultimo_acesso", 0) < self.protecao_s:
+                continue
+            self._remover(os.path.join(self.diretorio, chave + (".gz" if entrada.get("comprimido") else "")))
+            total -= entrada["tamanho"]
+            del entradas[chave]
+            logger.info(f"🧹 Cache: removido {chave} ({entrada['tamanho'] / (1024 * 1024):.1f}MB, LRU)")
+        if total > self.limite_bytes:
+            logger.warning(f"⚠️ Cache acima do limite ({total / (1024 * 1024):.0f}MB > "
+                           f"{self.limite_bytes / (1024 * 1024):.0f}MB) só com entradas em uso")
+
+    @staticmethod
+    def _comprimir(caminho: str) -> Optional[str]:
+        """Grava ``arquivo`` comprimido num tmp ao lado; retorna o tmp (o rename fica com quem chama)."""
+        tmp = f"{caminho}.gz.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(caminho, "rb") as origem, gzip.open(tmp, "wb", compresslevel=6) as saida:
+                shutil.copyfileobj(origem, saida, 1024 * 1024)
+            return tmp
+        except OSError as e:
+            logger.warning(f"⚠️ Não foi possível comprimir {caminho}: {e}")
+            GerenciadorCache._remover(tmp)
+            return None
+
+    @staticmethod
+    def _descomprimir(caminho: str) -> bool:
+        origem_gz = f"{caminho}.gz"
+        tmp = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with gzip.open(origem_gz, "rb") as origem, open(tmp, "wb") as saida:
+                shutil.copyfileobj(origem, saida, 1024 * 1024)
+            os.replace(tmp, caminho)
+            os.remove(origem_gz)
+            return True
+        except FileNotFoundError:
+            # Outra thread/worker descomprimiu antes
+            GerenciadorCache._remover(tmp)
+            return os.path.exists(caminho)
+        except (OSError, EOFError) as e:
+            logger.warning(f"⚠️ Cache comprimido corrompido, descartando {origem_gz}: {e}")
+            GerenciadorCache._remover(tmp)
+            GerenciadorCache._remover(origem_gz)
+            return False
+
+    @staticmethod
+    def _remover(caminho: str) -> None:
+        try:
+            if os.path.isdir(caminho):
+                shutil.rmtree(caminho)
+            else:
+                os.remove(caminho)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"⚠️ Não foi possível remover {caminho} do cache: {e}")
+
+
+_gerenciadores: Dict[str, GerenciadorCache] = {}
+_gerenciadores_lock = threading.Lock()
+
+
+def obter_gerenciador_cache(diretorio: Optional[str] = None) -> GerenciadorCache:
+    """Um gerenciador por diretório de cache (``CACHE_DIR`` por padrão)."""
+    diretorio = os.path.abspath(diretorio or os.getenv("CACHE_DIR", "/tmp"))
+    with _gerenciadores_lock:
+        if diretorio not in _gerenciadores:
+            _gerenciadores[diretorio] = GerenciadorCache(diretorio)
+        return _gerenciadores[diretorio]
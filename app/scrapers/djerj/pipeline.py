@@ -0,0 +1,446 @@
+# app/scrapers/djerj/pipeline.py
+# PIPELINE DE PÁGINAS: EXTRAÇÃO -> FILA LIMITADA -> CASAMENTO (SEQUENCIAL OU EM PROCESSOS)
+
+import gc
+import os
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Tuple
+
+from app.scrapers.utils.text_utils import MapaOffsets, juntar_normalizados, normalizar_com_offsets, mapear_span
+from app.scrapers.djerj.segmentacao import SEGMENTAR_PUBLICACOES, segmentar_publicacoes
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_MINIMO_PAGINA = 50
+CONTEXTO_CARACTERES = 120
+# Bloco maior que isso (página sem estrutura de publicações) vira contexto de ±CONTEXTO_CARACTERES
+TAMANHO_MAXIMO_BLOCO = int(os.getenv("TAMANHO_MAXIMO_BLOCO", "4000"))
+# Caracteres (normalizados) do fim de cada página repassados à seguinte, para
+# achar menções quebradas na virada de página. Deve cobrir nome + JANELA_NOME_OAB.
+JANELA_ENTRE_PAGINAS = int(os.getenv("JANELA_ENTRE_PAGINAS", "200"))
+
+# Marcador de fim da fila entre as etapas
+_FIM = object()
+
+# Matcher do processo: no modo paralelo é herdado do pai (fork, copy-on-write)
+_matcher = None
+
+
+def processos_disponiveis() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def pode_criar_processos() -> bool:
+    """Processo daemônico (filho do prefork do Celery) não pode ter filhos: sem ProcessPoolExecutor."""
+    return not multiprocessing.current_process().daemon
+
+
+def limitar_processos(processos: int, nome: str = "processos") -> int:
+    """``processos``, ou 1 (sequencial) se este processo não pode criar filhos."""
+    if processos > 1 and not pode_criar_processos():
+        logger.info(f"{nome}={processos} ignorado: processo daemônico (worker Celery), rodando sequencial")
+        return 1
+    return max(1, processos)
+
+
+def ler_processos(variavel: str) -> int:
+    """
+    Processos de ``variavel`` no ambiente: padrão 1 (sequencial), "0" = núcleos
+    disponíveis ao worker. Sempre 1 em processo daemônico.
+    """
+    raw = os.getenv(variavel, "").strip()
+    processos = (processos_disponiveis() if raw == "0" else max(1, int(raw))) if raw else 1
+    return limitar_processos(processos, variavel)
+
+
+def obter_processos_matching() -> int:
+    """PROCESSOS_MATCHING (padrão 1 = sequencial; "0" = núcleos disponíveis)."""
+    return ler_processos("PROCESSOS_MATCHING")
+
+
+def obter_profundidade_fila() -> int:
+    """FILA_PAGINAS: máximo de páginas extraídas aguardando o casamento (limita a memória)."""
+    return max(1, int(os.getenv("FILA_PAGINAS", "16")))
+
+
+def _inicializar_worker(matcher) -> None:
+    global _matcher
+    _matcher = matcher
+
+
+# (trecho original, trecho normalizado, offsets) do fim de uma página
+Cauda = Tuple[str, str, MapaOffsets]
+# (pagina_anterior, limite, tamanho do normalizado, [(advogado_id, inicio, fim), ...]) das menções de uma página
+Virada = Tuple[int | None, int, int, List[Tuple[int, int, int]]]
+
+
+def cauda_pagina(raw_text: str, janela: int = JANELA_ENTRE_PAGINAS) -> Cauda | None:
+    """
+    Trecho final do texto ORIGINAL cuja normalização tem no máximo ``janela``
+    caracteres, começando em fronteira de palavra, já com a sua normalização
+    (a página seguinte não o normaliza de novo). Só o fim da página é
+    normalizado (dobrando o trecho até cobrir a janela), então o custo é O(janela).
+    """
+    if janela <= 0 or not raw_text:
+        return None
+    tamanho = janela * 2
+    while True:
+        trecho = raw_text[-tamanho:]
+        texto_norm, offsets = normalizar_com_offsets(trecho)
+        if len(texto_norm) > janela or tamanho >= len(raw_text):
+            break
+        tamanho *= 2
+    if len(texto_norm) <= janela:
+        return (trecho, texto_norm, offsets) if texto_norm else None
+    corte = texto_norm.find(" ", len(texto_norm) - janela)
+    if corte < 0:
+        return None
+    return trecho[offsets[corte + 1]:], texto_norm[corte + 1:], offsets.recortar(corte + 1)
+
+
+def casar_pagina(page_num: int, raw_text: str, matcher=None, cauda: Cauda | None = None,
+                 pagina_anterior: int | None = None) -> Tuple[int, List[Tuple[int, str, int]], Virada | None]:
+    """
+    Normaliza a página, divide em blocos de publicação (``segmentar_publicacoes``)
+    e busca as menções bloco a bloco: nome e OAB só pareiam dentro da mesma
+    publicação, e o contexto de cada menção é o bloco inteiro, recortado do texto
+    original. Retorna ``(page_num, [(advogado_id, contexto, pagina), ...], virada)``
+    — só dados simples, para poder voltar de outro processo.
+
+    ``cauda`` é o fim da página anterior (``cauda_pagina``), varrido junto com a
+    página: menções inteiras dentro da cauda já foram achadas na página anterior e
+    são descartadas; as que começam na cauda e terminam aqui ficam com
+    ``pagina = pagina_anterior`` (a página onde a menção começa). ``virada`` traz
+    os spans de cada menção para ``_sem_repetidas_na_virada`` descartar, na
+    ordem das páginas, as que a página anterior já contou com outra OAB.
+    """
+    matcher = matcher or _matcher
+    if not raw_text or len(raw_text.strip()) < TAMANHO_MINIMO_PAGINA:
+        logger.debug(f"Página {page_num} vazia ou muito curta. Pulando.")
+        return page_num, [], None
+
+    # ✅ Cada página é normalizada uma vez: a cauda já vem normalizada
+    texto_norm, offsets = normalizar_com_offsets(raw_text)
+    # Primeiro caractere normalizado que já pertence à página atual
+    limite = 0
+    if cauda:
+        cauda_texto, cauda_norm, cauda_offsets = cauda
+        raw_text, texto_norm, offsets = juntar_normalizados(cauda_texto, cauda_norm, cauda_offsets,
+                                                            raw_text, texto_norm, offsets)
+        limite = len(cauda_norm) + 1
+
+    blocos = segmentar_publicacoes(texto_norm) if SEGMENTAR_PUBLICACOES else [(0, len(texto_norm))]
+    hits = []
+    spans = []
+    for bloco_ini, bloco_fim in blocos:
+        if bloco_fim <= limite:
+            continue  # ✅ Bloco inteiro na sobreposição: já varrido na página anterior
+        for advogado_id, (start, end) in matcher.buscar(texto_norm[bloco_ini:bloco_fim]):
+            start, end = start + bloco_ini, end + bloco_ini
+            if end <= limite:
+                continue  # ✅ Inteira na sobreposição: já contada na página anterior
+            na_cauda = start < limite
+            # Menções da própria página não puxam contexto da página anterior
+            ctx_ini = max(bloco_ini, 0 if na_cauda else limite)
+            ctx_fim = bloco_fim
+            if not SEGMENTAR_PUBLICACOES or ctx_fim - ctx_ini > TAMANHO_MAXIMO_BLOCO:
+                ctx_ini = max(ctx_ini, start - CONTEXTO_CARACTERES)
+                ctx_fim = min(ctx_fim, end + CONTEXTO_CARACTERES)
+            # ✅ Contexto recortado do texto original (com acentos), via offsets
+            raw_ini, raw_fim = mapear_span(offsets, ctx_ini, ctx_fim)
+            pagina = pagina_anterior if na_cauda and pagina_anterior is not None else page_num
+            hits.append((advogado_id, " ".join(raw_text[raw_ini:raw_fim].split()), pagina))
+            spans.append((advogado_id, start, end))
+    return page_num, hits, (pagina_anterior, limite, len(texto_norm), spans)
+
+
+def _sem_repetidas_na_virada(resultados: Iterable[Tuple[int, List[Tuple[int, str, int]], Virada | None]]
+                             ) -> Iterator[Tuple[int, List[Tuple[int, str, int]]]]:
+    """
+    Recebe os resultados de ``casar_pagina`` na ordem das páginas e descarta as
+    menções que começam na cauda sobre um nome que a página anterior já contou:
+    o nome no fim da página N pareia com uma OAB antes dele na N e com outra
+    depois da virada na N+1. Os spans da página anterior são guardados contados
+    do fim do texto (a cauda é o fim do normalizado da página) e comparados por
+    advogado: spans pareados de um mesmo advogado nunca se sobrepõem, então
+    sobreposição é o mesmo nome. Feito aqui, e não em ``casar_pagina``, porque no
+    pool a página N+1 é casada antes do resultado da N existir.
+    """
+    pagina_spans, anteriores = None, []
+    for page_num, hits, virada in resultados:
+        if virada is None:
+            yield page_num, hits
+            continue
+        pagina_anterior, limite, tamanho, spans = virada
+        if limite and pagina_anterior is not None and pagina_anterior == pagina_spans:
+            tamanho_cauda = limite - 1
+            mantidos = []
+            for hit, (advogado_id, start, end) in zip(hits, spans):
+                if start < limite and any(anterior == advogado_id and start < tamanho_cauda + fim and tamanho_cauda + ini < end
+                                          for anterior, ini, fim in anteriores):
+                    continue  # ✅ Mesmo nome já contado na página anterior
+                mantidos.append(hit)
+            hits = mantidos
+        pagina_spans, anteriores = page_num, [(advogado_id, start - tamanho, end - tamanho)
+                                              for advogado_id, start, end in spans]
+        yield page_num, hits
+
+
+def _com_cauda(paginas: Iterable[Tuple[int, str]], janela: int) -> Iterator[Tuple[int, str, Cauda | None, int | None]]:
+    """Acrescenta a cada página ``(cauda, pagina_anterior)`` da página que a precede."""
+    cauda, pagina_anterior = None, None
+    for page_num, raw_text in paginas:
+        yield page_num, raw_text, cauda, pagina_anterior
+        if raw_text and raw_text.strip():
+            cauda, pagina_anterior = cauda_pagina(raw_text, janela), page_num
+
+
+@contextmanager
+def _pool_matching(matcher, processos: int):
+    """
+    ProcessPoolExecutor com o matcher entregue uma vez a cada processo. Os filhos
+    são criados já aqui (antes de qualquer thread do pipeline existir), para que o
+    fork não herde locks de outras threads.
+    """
+    try:
+        contexto_mp = multiprocessing.get_context("fork")
+    except ValueError:
+        contexto_mp = None  # sem fork (ex.: Windows): o matcher vai serializado uma vez por processo
+
+    # Congela os objetos atuais fora do GC: evita que as coletas nos filhos
+    # toquem (e copiem) as páginas de memória do matcher herdado
+    gc.collect()
+    gc.freeze()
+    try:
+        with ProcessPoolExecutor(max_workers=processos, mp_context=contexto_mp,
+                                 initializer=_inicializar_worker, initargs=(matcher,)) as executor:
+            executor.submit(processos_disponiveis).result()
+            logger.info(f"⚙️ Casamento paralelo com {processos} processos")
+            yield executor
+    finally:
+        gc.unfreeze()
+
+
+def _casar_sequencial(paginas: Iterable[Tuple[int, str]], matcher, janela: int) -> Iterator[Tuple[int, List[Tuple[int, str, int]]]]:
+    yield from _sem_repetidas_na_virada(_casar_sequencial_com_virada(paginas, matcher, janela))
+
+
+def _casar_sequencial_com_virada(paginas: Iterable[Tuple[int, str]], matcher, janela: int
+                                 ) -> Iterator[Tuple[int, List[Tuple[int, str, int]], Virada | None]]:
+    for page_num, raw_text, cauda, pagina_anterior in _com_cauda(paginas, janela):
+        try:
+            yield casar_pagina(page_num, raw_text, matcher, cauda, pagina_anterior)
+        except Exception as e:
+            logger.error(f"Erro ao processar página {page_num}: {e}")
+
+
+def _casar_no_pool(paginas: Iterable[Tuple[int, str]], executor, processos: int, janela: int) -> Iterator[Tuple[int, List[Tuple[int, str, int]]]]:
+    yield from _sem_repetidas_na_virada(_casar_no_pool_com_virada(paginas, executor, processos, janela))
+
+
+def _casar_no_pool_com_virada(paginas: Iterable[Tuple[int, str]], executor, processos: int, janela: int
+                              ) -> Iterator[Tuple[int, List[Tuple[int, str, int]], Virada | None]]:
+    # Janela limitada de páginas em voo: memória constante mesmo em cadernos enormes
+    pendentes = deque()
+    for page_num, raw_text, cauda, pagina_anterior in _com_cauda(paginas, janela):
+        pendentes.append((page_num, executor.submit(casar_pagina, page_num, raw_text, None, cauda, pagina_anterior)))
+        if len(pendentes) >= processos * 4:
+            yield from _coletar(pendentes.popleft())
+    while pendentes:
+        yield from _coletar(pendentes.popleft())
+
+
+def _coletar(pendente) -> Iterator[Tuple[int, List[Tuple[int, str, int]], Virada | None]]:
+    page_num, future = pendente
+    try:
+        yield future.result()
+    except Exception as e:
+        logger.error(f"Erro ao processar página {page_num}: {e}")
+
+
+def casar_paginas(paginas: Iterable[Tuple[int, str]], matcher, processos: int = 1,
+                  janela: int = JANELA_ENTRE_PAGINAS) -> Iterator[Tuple[int, List[Tuple[int, str, int]]]]:
+    """
+    Casa as páginas ``(page_num, raw_text)`` e gera ``(page_num, hits)`` na ordem
+    de entrada. Com ``processos > 1`` o casamento é distribuído em um
+    ProcessPoolExecutor; o matcher é montado uma vez no pai e herdado pelos
+    filhos via fork (copy-on-write), sem serialização.
+    """
+    processos = limitar_processos(processos, "PROCESSOS_MATCHING")
+    if processos <= 1:
+        yield from _casar_sequencial(paginas, matcher, janela)
+        return
+    with _pool_matching(matcher, processos) as executor:
+        yield from _casar_no_pool(paginas, executor, processos, janela)
+
+
+class ContadorEtapa:
+    """
+    Vazão de uma etapa do pipeline. ``ocupado`` é o tempo trabalhando e
+    ``bloqueado`` o tempo parado na fila: a extração bloqueia com a fila cheia
+    (casamento é o gargalo) e o casamento bloqueia com a fila vazia (extração é o gargalo).
+    """
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.paginas = 0
+        self.ocupado = 0.0
+        self.bloqueado = 0.0
+
+    @property
+    def paginas_por_segundo(self) -> float:
+        return self.paginas / self.ocupado if self.ocupado else 0.0
+
+    def resumo(self) -> str:
+        return (f"{self.nome}: {self.paginas} páginas, {self.paginas_por_segundo:.1f} pág/s, "
+                f"ocupado {self.ocupado:.1f}s, bloqueado na fila {self.bloqueado:.1f}s")
+
+
+class PipelinePaginas:
+    """
+    Extração e casamento em etapas separadas, ligadas por uma fila limitada.
+
+    Uma thread extrai as páginas e as coloca na fila enquanto o casamento consome
+    a página anterior; com a fila cheia a extração espera, então o pico de
+    memória fica limitado a ``profundidade_fila`` páginas. Iterar o pipeline gera
+    ``(page_num, hits)`` na ordem das páginas; ``extracao`` e ``casamento``
+    guardam a vazão de cada etapa. Com ``executor`` (pool de um
+    ``CasamentoCompartilhado``) as páginas vão para esse pool em vez de um próprio.
+    """
+
+    def __init__(self, paginas: Iterable[Tuple[int, str]], matcher, processos: int = 1,
+                 profundidade_fila: int | None = None, janela: int = JANELA_ENTRE_PAGINAS,
+                 executor: ProcessPoolExecutor | None = None):
+        self.paginas = paginas
+        self.janela = janela
+        self.matcher = matcher
+        # Sem pool externo, o pool próprio só existe se este processo pode ter filhos
+        self.processos = processos if executor is not None else limitar_processos(processos, "PROCESSOS_MATCHING")
+        self.executor = executor
+        self.profundidade_fila = profundidade_fila or obter_profundidade_fila()
+        self.extracao = ContadorEtapa("extração")
+        self.casamento = ContadorEtapa("casamento")
+        self._fila: queue.Queue = queue.Queue(maxsize=self.profundidade_fila)
+        self._parar = threading.Event()
+        self._erro: BaseException | None = None
+
+    def _colocar(self, item) -> bool:
+        """Coloca na fila; desiste se o consumidor parou (evita thread presa)."""
+        while not self._parar.is_set():
+            try:
+                self._fila.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _extrair(self) -> None:
+        try:
+            paginas = iter(self.paginas)
+            while not self._parar.is_set():
+                inicio = time.perf_counter()
+                try:
+                    pagina = next(paginas)
+                except StopIteration:
+                    break
+                self.extracao.ocupado += time.perf_counter() - inicio
+                self.extracao.paginas += 1
+
+                inicio = time.perf_counter()
+                if not self._colocar(pagina):
+                    break
+                self.extracao.bloqueado += time.perf_counter() - inicio
+        except BaseException as e:
+            # Repassado ao consumidor: uma extração interrompida não pode parecer um caderno completo
+            logger.error(f"❌ Erro na etapa de extração: {e!r}")
+            self._erro = e
+        finally:
+            self._colocar(_FIM)
+
+    def _consumir(self) -> Iterator[Tuple[int, str]]:
+        while True:
+            inicio = time.perf_counter()
+            pagina = self._fila.get()
+            self.casamento.bloqueado += time.perf_counter() - inicio
+            if pagina is _FIM:
+                return
+            yield pagina
+
+    def _executar(self, casamento: Iterator) -> Iterator[Tuple[int, List[Tuple[int, str, int]]]]:
+        extrator = threading.Thread(target=self._extrair, name="extracao-paginas", daemon=True)
+        extrator.start()
+        try:
+            while True:
+                inicio = time.perf_counter()
+                bloqueado_antes = self.casamento.bloqueado
+                try:
+                    resultado = next(casamento)
+                except StopIteration:
+                    break
+                # Tempo esperando a fila não conta como trabalho do casamento
+                self.casamento.ocupado += (time.perf_counter() - inicio) - (self.casamento.bloqueado - bloqueado_antes)
+                self.casamento.paginas += 1
+                yield resultado
+        finally:
+            self._parar.set()
+            extrator.join()
+        if self._erro is not None:
+            raise self._erro
+
+    def __iter__(self) -> Iterator[Tuple[int, List[Tuple[int, str, int]]]]:
+        if self.executor is not None:
+            yield from self._executar(_casar_no_pool(self._consumir(), self.executor, self.processos, self.janela))
+            return
+        if self.processos <= 1:
+            yield from self._executar(_casar_sequencial(self._consumir(), self.matcher, self.janela))
+            return
+        # O pool é criado antes da thread de extração (fork sem outras threads vivas)
+        with _pool_matching(self.matcher, self.processos) as executor:
+            yield from self._executar(_casar_no_pool(self._consumir(), executor, self.processos, self.janela))
+
+    def registrar_vazao(self) -> None:
+        logger.info(f"📊 Pipeline (fila {self.profundidade_fila}) — {self.extracao.resumo()}")
+        logger.info(f"📊 Pipeline (fila {self.profundidade_fila}) — {self.casamento.resumo()}")
+        gargalo = self.extracao if self.casamento.bloqueado > self.extracao.bloqueado else self.casamento
+        logger.info(f"📊 Gargalo provável: {gargalo.nome}")
+
+
+class CasamentoCompartilhado:
+    """
+    Matcher e pool de casamento criados uma vez e usados ao mesmo tempo pelos
+    pipelines de vários cadernos (um por thread). Deve ser aberto ANTES das
+    threads dos cadernos: o pool nasce por fork, que só é seguro sem outras
+    threads vivas. ``cadernos`` é quantos cadernos rodam juntos, para dividir
+    os processos de extração entre eles.
+    """
+
+    def __init__(self, matcher, processos: int = 1, cadernos: int = 1):
+        self.matcher = matcher
+        self.processos = limitar_processos(processos, "PROCESSOS_MATCHING")
+        self.cadernos = max(1, cadernos)
+        self.executor: ProcessPoolExecutor | None = None
+        self._pool = None
+
+    def __enter__(self) -> "CasamentoCompartilhado":
+        if self.processos > 1:
+            self._pool = _pool_matching(self.matcher, self.processos)
+            self.executor = self._pool.__enter__()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._pool is not None:
+            self._pool.__exit__(*exc)
+            self._pool, self.executor = None, None
+
+    def pipeline(self, paginas: Iterable[Tuple[int, str]], **kwargs) -> PipelinePaginas:
+        return PipelinePaginas(paginas, self.matcher, self.processos, executor=self.executor, **kwargs)
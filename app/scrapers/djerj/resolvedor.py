@@ -0,0 +1,100 @@
+# app/scrapers/djerj/resolvedor.py
+# RESOLVEDOR HTTP DA URL DO PDF: consultaDJE.aspx -> pdf.aspx -> temp/*.pdf, SEM CHROME
+
+import os
+import re
+import html
+import logging
+from datetime import date
+from typing import List, Optional, Dict, Tuple
+from urllib.parse import urljoin
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Apontável para um servidor local com HTML gravado (ex.: python -m http.server)
+URL_BASE_DJERJ = os.getenv("URL_BASE_DJERJ", "https://www3.tjrj.jus.br/consultadje/")
+
+# Caminho do PDF temporário no HTML do pdf.aspx (mesmos padrões usados no Chrome)
+PADROES_URL_PDF = (
+    re.compile(r"(?:['\"])((?:/)?temp/[^\"']+?\.pdf)(?:['\"])", re.IGNORECASE),
+    re.compile(r"(?:filename=)([^&\"'']+?\.pdf)", re.IGNORECASE),
+    re.compile(r"openPDF\('([^']+?\.pdf)'\)", re.IGNORECASE),
+)
+# URL do PDF temporário vista nos eventos de rede do Chrome
+URL_PDF_TEMP_PATTERN = re.compile(r"/temp/[^?#\"']+?\.pdf(?:[?#]|$)", re.IGNORECASE)
+IFRAME_SRC_PATTERN = re.compile(r"<iframe\b[^>]*?\bsrc\s*=\s*[\"']([^\"']+)[\"']", re.IGNORECASE)
+
+# (url do PDF, Referer a enviar no download)
+CandidatoPdf = Tuple[str, str]
+
+
+def url_consulta(dt: date, caderno: str, base: str = URL_BASE_DJERJ) -> str:
+    return f"{base}consultaDJE.aspx?dtPub={dt.strftime('%d/%m/%Y')}&caderno={caderno}&pagina=-1"
+
+
+def extrair_candidatos_pdf(html_pdf: str) -> List[str]:
+    """Caminhos ``temp/*.pdf`` citados no HTML do pdf.aspx, sem repetição e na ordem em que aparecem."""
+    candidatos = []
+    for padrao in PADROES_URL_PDF:
+        for caminho in padrao.findall(html_pdf or ""):
+            caminho = caminho.strip()
+            if caminho and caminho not in candidatos:
+                candidatos.append(caminho)
+    return candidatos
+
+
+def montar_url_pdf(caminho: str, base: str = URL_BASE_DJERJ) -> str:
+    """Normaliza o caminho candidato para ``<base>temp/<arquivo>.pdf``."""
+    caminho_limpo = caminho.lstrip("/").replace("consultadje/", "").strip()
+    if not caminho_limpo.lower().startswith("temp/"):
+        caminho_limpo = f"temp/{caminho_limpo}"
+    return f"{base}{caminho_limpo}"
+
+
+def extrair_iframes_pdf(html_consulta: str, url_pagina: str) -> List[str]:
+    """URLs absolutas dos iframes do pdf.aspx na página de consulta."""
+    urls = []
+    for src in IFRAME_SRC_PATTERN.findall(html_consulta or ""):
+        src = html.unescape(src)
+        if "pdf.aspx" in src.lower():
+            url = urljoin(url_pagina, src)
+            if url not in urls:
+                urls.append(url)
+    return urls
+
+
+def resolver_urls_pdf(session: requests.Session, dt: date, caderno: str,
+                      headers: Optional[Dict[str, str]] = None, timeout: int = 20,
+                      base: str = URL_BASE_DJERJ) -> List[CandidatoPdf]:
+    """
+    Faz com ``requests`` o mesmo caminho do navegador: abre o consultaDJE.aspx
+    (a sessão guarda os cookies do ASP.NET), segue o iframe do pdf.aspx e extrai
+    dele os caminhos ``temp/*.pdf``. Retorna ``[(url_pdf, referer)]``; lista vazia
+    se o HTML não trouxer o PDF (ex.: montado por JavaScript), e aí o chamador
+    recorre ao Chrome.
+    """
+    headers = dict(headers or {})
+    url = url_consulta(dt, caderno, base)
+    resposta = session.get(url, headers=headers, timeout=timeout)
+    if resposta.status_code != 200:
+        logger.warning(f"consultaDJE.aspx respondeu {resposta.status_code}: {url}")
+        return []
+
+    iframes = extrair_iframes_pdf(resposta.text, resposta.url)
+    if not iframes:
+        logger.info("Nenhum iframe do pdf.aspx no HTML da consulta")
+        return []
+
+    candidatos: List[CandidatoPdf] = []
+    for url_iframe in iframes:
+        resposta_iframe = session.get(url_iframe, headers={**headers, "Referer": resposta.url}, timeout=timeout)
+        if resposta_iframe.status_code != 200:
+            logger.warning(f"pdf.aspx respondeu {resposta_iframe.status_code}: {url_iframe}")
+            continue
+        for caminho in extrair_candidatos_pdf(resposta_iframe.text):
+            url_pdf = montar_url_pdf(caminho, base)
+            if all(url_pdf != existente for existente, _ in candidatos):
+                candidatos.append((url_pdf, resposta_iframe.url))
+    return candidatos
@@ -3,31 +3,37 @@
 import os
 import re
 import time
-import json
-import unicodedata
 import logging
 import requests
-from io import StringIO
 from datetime import datetime, date
 from zoneinfo import ZoneInfo
-from typing import List, Dict, Any, Set, Tuple, Match
+from typing import List, Dict, Tuple, Optional
 from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-
-from pdfminer.pdfpage import PDFPage
-from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
-from pdfminer.converter import TextConverter
-from pdfminer.layout import LAParams
+from selenium.common.exceptions import TimeoutException
 
 from app import db, create_app
 from app.models import DiarioOficial, Advogado, AdvogadoPublicacao
+from app.scrapers.utils.matcher import carregar_matcher, parear_nome_oab, JANELA_NOME_OAB
+from app.scrapers.utils.indice_tokens import IndiceTokensRaros
+from app.scrapers.utils.text_utils import normalizar_texto
+from app.scrapers.djerj.pipeline import PipelinePaginas, CasamentoCompartilhado, obter_processos_matching, pode_criar_processos
+from app.scrapers.djerj.cache_texto import sha256_arquivo
+from app.scrapers.djerj.gerenciador_cache import TIPO_PDF, obter_gerenciador_cache
+from app.scrapers.djerj.checkpoint import CHECKPOINT_PAGINAS, carregar_checkpoint, salvar_checkpoint, remover_checkpoint
+from app.scrapers.djerj.download import baixar_pdf_streaming, validar_pdf
+from app.scrapers.utils.retry_policy import politica_retry, requisitar_com_retry
+from app.scrapers.utils.chrome_driver import USER_AGENT_CHROME, obter_pool_chrome, descartar_eventos_rede, aguardar_url_na_rede
+from app.scrapers.djerj.resolvedor import URL_PDF_TEMP_PATTERN, resolver_urls_pdf, extrair_candidatos_pdf, montar_url_pdf, url_consulta
+from app.scrapers.djerj.extracao import extrair_paginas_pdf, obter_processos_extracao
+from app.scrapers.djerj.execucao import (
+    STATUS_CONCLUIDO, iniciar_execucao, etapa_concluida, proxima_etapa, concluir_etapa, registrar_falha
+)
 
 # ===================== TIMEZONE =====================
 TZ_SP = ZoneInfo("America/Sao_Paulo")
@@ -53,10 +59,19 @@ root_logger.addHandler(handler)
 logger = logging.getLogger(__name__)
 
 # ===================== CONFIGURAÇÕES =====================
-USER_AGENT = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36")
-MAX_RETRIES = 3
+USER_AGENT = USER_AGENT_CHROME  # mesmo UA no resolvedor HTTP e no Chrome do pool
+HEADERS_PDF = {
+    "User-Agent": USER_AGENT,
+    "Accept": "application/pdf, */*",
+    "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
+}
 WHATSAPP_THREADS = int(os.getenv("WHATSAPP_THREADS", "8"))
+# Cadernos baixados e processados ao mesmo tempo (cada um na sua thread). Sem a
+# variável: 2, ou 1 dentro de um worker Celery (processo daemônico, memória curta)
+CADERNOS_PARALELOS = int(os.getenv("CADERNOS_PARALELOS", "0"))
 advogado_patterns = {}  # Cache para regex pré-compilada
+# "automato" = Aho-Corasick com todos os advogados | "indice" = token raro + regex por candidato
+MOTOR_BUSCA = os.getenv("MOTOR_BUSCA_DJERJ", "automato").strip().lower()
 
 # ===================== PRIORIDADE DE NOTIFICAÇÃO POR CADERNO =====================
 PRIORIDADE_CADERNO = {
@@ -77,13 +92,6 @@ def caminho_pdf_cache(dt: date, caderno: str) -> str:
     return f"{cache_dir}/diario_{d}_{safe_caderno}.pdf"
 
 # ===================== UTILIDADES DE TEXTO AVANÇADAS =====================
-def normalizar_texto(texto: str) -> str:
-    if not texto: return ""
-    texto = texto.upper()
-    texto = unicodedata.normalize('NFKD', texto).encode('ASCII', 'ignore').decode('ASCII')
-    texto = re.sub(r'\s+', ' ', texto)
-    return texto.strip()
-
 OAB_PATTERN = re.compile(r'[\s\-\/\.]*')
 def criar_regex_oab(numero_oab: str) -> re.Pattern:
     if not numero_oab: return re.compile("")
@@ -102,46 +110,34 @@ def criar_regex_nome_flexivel(nome_completo: str) -> re.Pattern:
         else: regex_partes.append(re.escape(parte))
     return re.compile(r'\s+'.join(regex_partes))
 
-def buscar_mencoes_advogado(texto_norm: str, advogado: Advogado) -> List[Match]:
-    """Busca todas as menções válidas do advogado no texto normalizado."""
-    resultados = []
-    
-    if advogado.id not in advogado_patterns:
-        advogado_patterns[advogado.id] = {
+def _padroes_advogado(advogado: Advogado) -> Dict[str, re.Pattern | None]:
+    patterns = advogado_patterns.get(advogado.id)
+    if patterns is None:
+        oab = criar_regex_oab(advogado.numero_oab) if advogado.numero_oab else None
+        patterns = advogado_patterns[advogado.id] = {
             'nome': criar_regex_nome_flexivel(advogado.nome_completo),
-            'oab': criar_regex_oab(advogado.numero_oab) if advogado.numero_oab else None
+            'oab': oab if oab is not None and oab.pattern else None
         }
+    return patterns
+
+def buscar_mencoes_advogado(texto_norm: str, advogado: Advogado) -> List[Tuple[int, int]]:
+    """
+    Busca todas as menções válidas do advogado no texto normalizado e retorna os spans.
+
+    Nome e OAB são buscados separadamente com as regex pré-compiladas do advogado
+    (tempo linear, nenhuma regex compilada por página) e depois pareados por
+    distância, nas duas ordens (nome + OAB e OAB + nome), com até 150 caracteres.
+    """
+    patterns = _padroes_advogado(advogado)
+    nomes = [m.span() for m in patterns['nome'].finditer(texto_norm)]
     
-    patterns = advogado_patterns[advogado.id]
-    
-    # ✅ CORREÇÃO: Busca ambas as ordens (nome + OAB e OAB + nome)
-    if patterns['oab']:
-        # 1. Nome seguido de OAB (até 150 caracteres de distância)
-        padrao_nome_oab = f"({patterns['nome'].pattern})" + r".{0,150}?" + f"({patterns['oab'].pattern})"
-        
-        # 2. OAB seguido de nome (até 150 caracteres de distância)  
-        padrao_oab_nome = f"({patterns['oab'].pattern})" + r".{0,150}?" + f"({patterns['nome'].pattern})"
-        
-        # Combina ambos os padrões em uma única regex compilada
-        padrao_completo = re.compile(f"({padrao_nome_oab}|{padrao_oab_nome})", re.IGNORECASE)
-        
-        resultados.extend(padrao_completo.finditer(texto_norm))
-    else:
-        resultados.extend(patterns['nome'].finditer(texto_norm))
+    if not patterns['oab']:
+        return nomes
+    if not nomes:
+        return []
     
-    return resultados
-
-def extract_text_from_page(page) -> str:
-    resource_manager = PDFResourceManager()
-    buf = StringIO()
-    converter = TextConverter(resource_manager, buf, laparams=LAParams())
-    interpreter = PDFPageInterpreter(resource_manager, converter)
-    try:
-        interpreter.process_page(page)
-        return buf.getvalue()
-    finally:
-        converter.close()
-        buf.close()
+    oabs = [m.span() for m in patterns['oab'].finditer(texto_norm)]
+    return parear_nome_oab(nomes, oabs, JANELA_NOME_OAB)
 
 def _filter_kwargs(model_cls, **kwargs):
     cols = set(c.name for c in model_cls.__table__.columns)
@@ -167,7 +163,8 @@ def enviar_whatsapp_single(telefone: str, mensagem: str) -> bool:
         url = os.getenv("WHATSAPP_API_URL", "https://oabrj.uzapi.com.br:3333/sendText")
         headers = {"Content-Type": "application/json", "sessionkey": "oab"}
         payload = {"session": "oab", "number": telefone, "text": mensagem}
-        resp = requests.post(url, json=payload, headers=headers, timeout=15)
+        resp = requisitar_com_retry(requests.post, "uzapi", url, json=payload, headers=headers, timeout=15,
+                                    idempotente=False)  # reenvio em ReadTimeout duplicaria a mensagem
         if resp.status_code == 200:
             logger.info(f"Mensagem enviada para {telefone}")
             return True
@@ -178,7 +175,24 @@ def enviar_whatsapp_single(telefone: str, mensagem: str) -> bool:
         logger.error(f"Erro WhatsApp: {e}")
         return False
 
-def enviar_notificacao_individual(mencoes: list, dt: date, caderno: str, app) -> int:
+def advogados_notificados(diario_id: int) -> set[int]:
+    """Advogados que já receberam o WhatsApp deste diário (envio de uma tentativa anterior)."""
+    linhas = (db.session.query(AdvogadoPublicacao.advogado_id)
+              .filter(AdvogadoPublicacao.diario_id == diario_id, AdvogadoPublicacao.notificado_em.isnot(None))
+              .distinct())
+    return {advogado_id for advogado_id, in linhas}
+
+def marcar_notificado(diario_id: int, advogado_id: int) -> None:
+    """Registra o envio logo após o WhatsApp sair: se a tarefa morrer, a retomada não o repete."""
+    try:
+        (AdvogadoPublicacao.query.filter_by(diario_id=diario_id, advogado_id=advogado_id)
+         .update({"notificado_em": datetime.utcnow()}, synchronize_session=False))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Erro ao registrar envio para o advogado {advogado_id}: {e}")
+
+def enviar_notificacao_individual(mencoes: list, dt: date, caderno: str, app, diario_id: Optional[int] = None) -> int:
     """Envia mensagem WhatsApp individual com opção de CANCELAR."""
     with app.app_context():
         try:
@@ -242,6 +256,8 @@ def enviar_notificacao_individual(mencoes: list, dt: date, caderno: str, app) ->
             )
             
             if enviar_whatsapp_single(advogado.whatsapp, mensagem):
+                if diario_id is not None:
+                    marcar_notificado(diario_id, advogado.id)
                 return 1
             return 0
             
@@ -249,11 +265,12 @@ def enviar_notificacao_individual(mencoes: list, dt: date, caderno: str, app) ->
             logger.error(f"Erro ao enviar notificação individual: {e}")
             return 0
 
-def enviar_notificacoes_paralelo(por_advogado: dict, dt: date, caderno: str, app) -> int:
-    """Envia notificações em paralelo com ThreadPoolExecutor."""
+def enviar_notificacoes_paralelo(por_advogado: dict, dt: date, caderno: str, app,
+                                 diario_id: Optional[int] = None) -> int:
+    """Envia notificações em paralelo com ThreadPoolExecutor (com ``diario_id``, cada envio fica registrado)."""
     total_msgs = 0
     with ThreadPoolExecutor(max_workers=WHATSAPP_THREADS) as executor:
-        futures = [executor.submit(enviar_notificacao_individual, mencoes, dt, caderno, app) 
+        futures = [executor.submit(enviar_notificacao_individual, mencoes, dt, caderno, app, diario_id) 
                   for mencoes in por_advogado.values() if mencoes]
         
         for future in futures:
@@ -267,20 +284,114 @@ def enviar_notificacoes_paralelo(por_advogado: dict, dt: date, caderno: str, app
     return total_msgs
 
 # ===================== DOWNLOAD COM SOLUÇÃO HÍBRIDA =====================
-def baixar_pdf_durante_sessao(dt: date, caderno: str, driver: webdriver.Chrome) -> str | None:
+class ChromeSobDemanda:
+    """Pega um Chrome do pool só na primeira vez que ele é de fato necessário (fallback do resolvedor HTTP)."""
+
+    def __init__(self):
+        self._driver = None
+
+    @property
+    def driver(self) -> webdriver.Chrome:
+        if self._driver is None:
+            logger.info("🌐 Pegando Chrome do pool (fallback do resolvedor HTTP)...")
+            self._driver = obter_pool_chrome().emprestar()
+        return self._driver
+
+    def fechar(self) -> None:
+        if self._driver is not None:
+            obter_pool_chrome().devolver(self._driver)
+            self._driver = None
+
+def _sessao_do_driver(driver: webdriver.Chrome) -> requests.Session:
+    """Sessão HTTP com os cookies do navegador (o PDF temporário é servido por sessão)."""
+    session = requests.Session()
+    for c in driver.get_cookies():
+        try: session.cookies.set(c["name"], c["value"])
+        except Exception: pass
+    return session
+
+def _baixar_candidatos(session: requests.Session, candidatos: List[Tuple[str, str]], destino: str,
+                       execucao=None, tempo_resolucao: float = 0.0) -> str | None:
+    """Tenta cada ``(url_pdf, referer)`` até um download válido e registra as etapas da execução."""
+    for pdf_url, referer in candidatos:
+        logger.info(f"🎯 Tentando URL: {pdf_url}")
+        headers = {**HEADERS_PDF, "Referer": referer}
+        try:
+            # ✅ Streaming direto para o disco: o PDF nunca fica inteiro na memória
+            inicio_download = time.perf_counter()
+            tamanho = baixar_pdf_streaming(session, pdf_url, destino, headers=headers, timeout=30)
+            if tamanho:
+                size_mb = tamanho / (1024 * 1024)
+                logger.info(f"💾 PDF salvo ({size_mb:.1f}MB): {destino}")
+                obter_gerenciador_cache().registrar(destino)
+                if execucao is not None:
+                    concluir_etapa(execucao, "url_resolvida", tempo_resolucao, url_pdf=pdf_url)
+                    concluir_etapa(execucao, "baixado", time.perf_counter() - inicio_download, arquivo_pdf=destino)
+                return destino
+        except Exception as e:
+            logger.warning(f"Falha ao baixar candidato: {e}")
+    return None
+
+def baixar_pdf_durante_sessao(dt: date, caderno: str, chrome: ChromeSobDemanda, execucao=None) -> str | None:
     destino = caminho_pdf_cache(dt, caderno)
-    if os.path.exists(destino) and os.path.getsize(destino) > 0:
+    # ✅ Cache gerenciado: descomprime o .pdf.gz se preciso, conta acerto/falha e atualiza o LRU
+    if obter_gerenciador_cache().obter_pdf(destino, validar=validar_pdf):
         size_mb = os.path.getsize(destino) / (1024 * 1024)
         logger.info(f"Cache encontrado ({size_mb:.1f}MB): {destino}")
+        if execucao is not None:
+            concluir_etapa(execucao, "baixado", arquivo_pdf=destino)
         return destino
+
+    # ✅ URL já resolvida em uma tentativa anterior: baixa direto, sem passar pelo Chrome
+    if execucao is not None and etapa_concluida(execucao, "url_resolvida") and execucao.url_pdf:
+        inicio_download = time.perf_counter()
+        try:
+            with requests.Session() as session:
+                tamanho = baixar_pdf_streaming(session, execucao.url_pdf, destino, headers=HEADERS_PDF, timeout=30)
+        except Exception as e:
+            logger.warning(f"Falha ao baixar a URL resolvida anteriormente: {e}")
+            tamanho = None
+        if tamanho:
+            logger.info(f"💾 PDF salvo pela URL já resolvida ({tamanho / (1024 * 1024):.1f}MB): {destino}")
+            obter_gerenciador_cache().registrar(destino)
+            concluir_etapa(execucao, "baixado", time.perf_counter() - inicio_download, arquivo_pdf=destino)
+            return destino
+        logger.info("URL anterior expirou. Resolvendo novamente...")
+
     logger.info(f"Buscando PDF para {dt.strftime('%d/%m/%Y')} [caderno={caderno}]...")
 
-    for tentativa in range(MAX_RETRIES):
+    # ✅ Resolvedor HTTP puro (sem Chrome): consultaDJE.aspx -> pdf.aspx -> temp/*.pdf
+    inicio_resolucao = time.perf_counter()
+    with requests.Session() as session:
+        try:
+            candidatos = resolver_urls_pdf(session, dt, caderno, headers=HEADERS_PDF)
+        except Exception as e:
+            logger.warning(f"Resolvedor HTTP falhou: {e}")
+            candidatos = []
+        if candidatos:
+            logger.info(f"⚡ URLs resolvidas sem Chrome ({len(candidatos)}) em {time.perf_counter() - inicio_resolucao:.2f}s")
+            caminho = _baixar_candidatos(session, candidatos, destino, execucao, time.perf_counter() - inicio_resolucao)
+            if caminho:
+                return caminho
+    logger.info("Resolvedor HTTP não obteve o PDF. Usando o Chrome...")
+
+    driver = chrome.driver
+    politica = politica_retry("djerj_chrome")
+    for tentativa in politica.tentativas():
         try:
-            url = f"https://www3.tjrj.jus.br/consultadje/consultaDJE.aspx?dtPub={dt.strftime('%d/%m/%Y')}&caderno={caderno}&pagina=-1"
-            driver.get(url)
+            descartar_eventos_rede(driver)
+            driver.get(url_consulta(dt, caderno))
+            # ✅ Modo rede (CDP): a URL temp/*.pdf vem dos eventos de rede do iframe,
+            # sem esperar o sleep nem varrer o page_source
+            urls_rede = aguardar_url_na_rede(driver, URL_PDF_TEMP_PATTERN, timeout=15)
+            if urls_rede:
+                logger.info(f"📡 URL do PDF capturada na rede: {urls_rede[0]}")
+                with _sessao_do_driver(driver) as session:
+                    caminho = _baixar_candidatos(session, [(url, driver.current_url) for url in urls_rede], destino,
+                                                 execucao, time.perf_counter() - inicio_resolucao)
+                if caminho:
+                    return caminho
             WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(2)
             iframes = WebDriverWait(driver, 15).until(EC.presence_of_all_elements_located((By.TAG_NAME, "iframe")))
             
             for iframe in iframes:
@@ -288,48 +399,16 @@ def baixar_pdf_durante_sessao(dt: date, caderno: str, driver: webdriver.Chrome)
                 if "pdf.aspx" not in src: continue
                 try:
                     WebDriverWait(driver, 15).until(EC.frame_to_be_available_and_switch_to_it(iframe))
-                    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-                    time.sleep(2)
-                    html = driver.page_source or ""
-                    candidates = set()
-                    for pat in (
-                        r"(?:['\"])((?:/)?temp/[^\"']+?\.pdf)(?:['\"])", 
-                        r"(?:filename=)([^&\"'']+?\.pdf)", 
-                        r"openPDF\('([^']+?\.pdf)'\)",
-                    ):
-                        for m in re.findall(pat, html, flags=re.IGNORECASE):
-                            candidates.add(m.strip())
-                    if not candidates:
-                        driver.switch_to.default_content()
-                        continue
-                    logger.info(f"URLs candidatas ({len(candidates)}): {list(candidates)[:3]}{'...' if len(candidates)>3 else ''}")
-                    session = requests.Session()
-                    for c in driver.get_cookies():
-                        try: session.cookies.set(c["name"], c["value"])
-                        except Exception: pass
-                    headers = {
-                        "User-Agent": USER_AGENT, 
-                        "Accept": "application/pdf, */*", 
-                        "Referer": driver.current_url, 
-                        "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8"
-                    }
-                    for path in candidates:
-                        clean_path = path.lstrip("/").replace("consultadje/", "").strip()
-                        if not clean_path.lower().startswith("temp/"): 
-                            clean_path = f"temp/{clean_path}"
-                        pdf_url = f"https://www3.tjrj.jus.br/consultadje/{clean_path}"
-                        logger.info(f"🎯 Tentando URL: {pdf_url}")
-                        try:
-                            response = session.get(pdf_url, headers=headers, timeout=30)
-                            if response.status_code == 200 and response.content.startswith(b"%PDF"):
-                                os.makedirs(os.path.dirname(destino), exist_ok=True)
-                                with open(destino, "wb") as f: 
-                                    f.write(response.content)
-                                size_mb = len(response.content) / (1024 * 1024)
-                                logger.info(f"💾 PDF salvo ({size_mb:.1f}MB): {destino}")
-                                return destino
-                        except Exception as e:
-                            logger.warning(f"Falha ao baixar candidato: {e}")
+                    # Espera o caminho temp/*.pdf aparecer no HTML do iframe (no lugar de um sleep fixo)
+                    candidates = WebDriverWait(driver, 10, poll_frequency=0.25).until(
+                        lambda d: extrair_candidatos_pdf(d.page_source or ""))
+                    logger.info(f"URLs candidatas ({len(candidates)}): {candidates[:3]}{'...' if len(candidates)>3 else ''}")
+                    tempo_resolucao = time.perf_counter() - inicio_resolucao
+                    candidatos = [(montar_url_pdf(path), driver.current_url) for path in candidates]
+                    with _sessao_do_driver(driver) as session:
+                        caminho = _baixar_candidatos(session, candidatos, destino, execucao, tempo_resolucao)
+                    if caminho:
+                        return caminho
                     driver.switch_to.default_content()
                 except TimeoutException:
                     logger.warning("Timeout ao acessar iframe. Continuando...")
@@ -339,63 +418,102 @@ def baixar_pdf_durante_sessao(dt: date, caderno: str, driver: webdriver.Chrome)
                     logger.warning(f"Erro no iframe: {e}")
                     driver.switch_to.default_content()
                     continue
-            logger.warning(f"Tentativa {tentativa+1}/{MAX_RETRIES} falhou para o caderno {caderno}. Tentando novamente em 5s...")
-            time.sleep(5)
+            logger.warning(f"Tentativa {tentativa+1}/{politica.tentativas_max} falhou para o caderno {caderno}.")
         except Exception as e:
-            logger.error(f"Erro na tentativa {tentativa+1}/{MAX_RETRIES} para o caderno {caderno}: {e}. Tentando novamente em 5s...")
-            time.sleep(5)
-    logger.error(f"❌ Falha crítica: não foi possível baixar PDF após {MAX_RETRIES} tentativas. Abortando.")
+            logger.error(f"Erro na tentativa {tentativa+1}/{politica.tentativas_max} para o caderno {caderno}: {e}")
+    logger.error(f"❌ Falha crítica: não foi possível baixar PDF do caderno {caderno} dentro da política de retry. Abortando.")
     return None
 
-def processar_pdf(dt: date, caderno: str, caminho_pdf: str, advogados: List[Advogado]) -> Tuple[int, Dict[int, List[Dict]]]:
+def montar_matcher(advogados: List[Advogado]):
+    # ✅ Cada página é varrida uma vez, sem laço por advogado
+    inicio_matcher = time.time()
+    if MOTOR_BUSCA == "indice":
+        matcher = IndiceTokensRaros(advogados, verificar=buscar_mencoes_advogado)
+    else:
+        matcher = carregar_matcher(advogados)  # ✅ Reaproveita o automato salvo em CACHE_DIR
+    logger.info(f"Matcher '{MOTOR_BUSCA}' pronto com {matcher.total_advogados} advogados em {time.time() - inicio_matcher:.2f}s")
+    return matcher
+
+def processar_pdf(dt: date, caderno: str, caminho_pdf: str, advogados: List[Advogado],
+                  tempos: Optional[Dict[str, float]] = None,
+                  casamento: Optional[CasamentoCompartilhado] = None) -> Tuple[int, Dict[int, List[Dict]]]:
+    """
+    Extrai e casa as páginas do PDF. Se ``tempos`` for passado, recebe o tempo
+    ocupado de cada etapa do pipeline (``extraido`` e ``casado``). Com
+    ``casamento`` o matcher e o pool são os compartilhados entre os cadernos.
+    """
     total_mencoes = 0
     por_advogado = defaultdict(list)
 
-    # Pré-compila padrões para todos os advogados
-    for advogado in advogados:
-        if advogado.id not in advogado_patterns:
-            advogado_patterns[advogado.id] = {
-                'nome': criar_regex_nome_flexivel(advogado.nome_completo),
-                'oab': criar_regex_oab(advogado.numero_oab) if advogado.numero_oab else None
-            }
+    matcher = casamento.matcher if casamento else montar_matcher(advogados)
+    advogados_por_id = {advogado.id: advogado for advogado in advogados}
+
+    def registrar_mencao(advogado_id: int, pagina: int, contexto: str) -> Optional[Advogado]:
+        nonlocal total_mencoes
+        advogado = advogados_por_id.get(advogado_id)
+        if advogado is None:
+            return None  # advogado removido desde o checkpoint (ou desde o matcher em cache)
+        total_mencoes += 1
+        link_publicacao = f"https://www3.tjrj.jus.br/consultadje/consultaDJE.aspx?dtPub={dt.strftime('%d/%m/%Y')}&caderno={caderno}&pagina={pagina}"
+        mencao = {
+            "advogado": advogado, 
+            "pagina": pagina, 
+            "contexto": contexto, 
+            "link": link_publicacao,
+            "data_publicacao": dt, 
+            "caderno": caderno,
+        }
+        por_advogado[advogado.id].append(mencao)
+        mencoes_checkpoint.append([advogado_id, pagina, contexto])
+        return advogado
+
+    # ✅ Retoma do checkpoint de uma tentativa anterior (ex.: tarefa morta pelo time limit)
+    pdf_sha256 = sha256_arquivo(caminho_pdf)
+    checkpoint = carregar_checkpoint(dt, caderno, pdf_sha256) if CHECKPOINT_PAGINAS > 0 else None
+    mencoes_checkpoint: List[List] = []
+    ultima_pagina = 0
+    if checkpoint:
+        ultima_pagina = checkpoint["ultima_pagina"]
+        ausentes = sum(registrar_mencao(advogado_id, pagina, contexto) is None
+                       for advogado_id, pagina, contexto in checkpoint["mencoes"])
+        if ausentes:
+            logger.warning(f"⚠️ {ausentes} menção(ões) do checkpoint de advogados que não estão mais na lista: ignoradas")
+        logger.info(f"♻️ Retomando caderno {caderno} após a página {ultima_pagina} ({total_mencoes} menções do checkpoint)")
 
     logger.info(f"Processando {len(advogados)} advogados no caderno {caderno}...")
-    with open(caminho_pdf, "rb") as fp:
-        for page_num, page in enumerate(PDFPage.get_pages(fp), 1):
-            try:
-                raw_text = extract_text_from_page(page)
-                if not raw_text or len(raw_text.strip()) < 50:
-                    logger.debug(f"Página {page_num} vazia ou muito curta. Pulando.")
-                    continue
-                texto_norm = normalizar_texto(raw_text)
-                
-                for advogado in advogados:
-                    patterns = advogado_patterns[advogado.id]
-                    matches = buscar_mencoes_advogado(texto_norm, advogado)
-                    
-                    for match in matches:
-                        total_mencoes += 1
-                        start, end = match.span()
-                        ctx_ini = max(0, start - 120)
-                        ctx_fim = min(len(texto_norm), end + 120)
-                        contexto = texto_norm[ctx_ini:ctx_fim].strip()
-                        link_publicacao = f"https://www3.tjrj.jus.br/consultadje/consultaDJE.aspx?dtPub={dt.strftime('%d/%m/%Y')}&caderno={caderno}&pagina={page_num}"
-                        mencao = {
-                            "advogado": advogado, 
-                            "pagina": page_num, 
-                            "contexto": contexto, 
-                            "link": link_publicacao,
-                            "data_publicacao": dt, 
-                            "caderno": caderno,
-                        }
-                        por_advogado[advogado.id].append(mencao)
-                        logger.info(f"Menção confirmada: {advogado.nome_completo} - Página {page_num}")
-                
-                if page_num % 10 == 0: 
-                    logger.info(f"Páginas processadas: {page_num}")
-            except Exception as e:
-                logger.error(f"Erro ao processar página {page_num}: {e}")
-                continue
+    # ✅ Extração e casamento em etapas paralelas, ligadas por fila limitada.
+    # Na retomada, a última página do checkpoint é relida só para fornecer a cauda
+    # (menções quebradas entre ela e a seguinte); seus resultados são descartados.
+    if casamento:
+        # Cadernos simultâneos dividem os núcleos da extração
+        processos_extracao = max(1, obter_processos_extracao() // casamento.cadernos)
+        paginas = extrair_paginas_pdf(caminho_pdf, processos_extracao, max(1, ultima_pagina), pdf_sha256)
+        pipeline = casamento.pipeline(paginas)
+    else:
+        paginas = extrair_paginas_pdf(caminho_pdf, obter_processos_extracao(), max(1, ultima_pagina), pdf_sha256)
+        pipeline = PipelinePaginas(paginas, matcher, obter_processos_matching())
+    processadas = 0
+    for page_num, hits in pipeline:
+        if page_num <= ultima_pagina:
+            continue
+        for advogado_id, contexto, pagina in hits:
+            advogado = registrar_mencao(advogado_id, pagina, contexto)
+            if advogado:
+                logger.info(f"Menção confirmada: {advogado.nome_completo} - Página {pagina}")
+
+        processadas += 1
+        if CHECKPOINT_PAGINAS > 0 and processadas % CHECKPOINT_PAGINAS == 0:
+            salvar_checkpoint(dt, caderno, pdf_sha256, page_num, mencoes_checkpoint)
+        if page_num % 10 == 0: 
+            logger.info(f"Páginas processadas: {page_num}")
+    pipeline.registrar_vazao()
+    if tempos is not None:
+        tempos["extraido"] = pipeline.extracao.ocupado
+        tempos["casado"] = pipeline.casamento.ocupado
+
+    # Checkpoint final: se a persistência falhar, a retentativa não recasa nada
+    if CHECKPOINT_PAGINAS > 0 and processadas:
+        salvar_checkpoint(dt, caderno, pdf_sha256, page_num, mencoes_checkpoint)
     return total_mencoes, dict(por_advogado)
 
 def persistir_resultados(dt: date, caderno: str, caminho_pdf: str, total_mencoes: int, por_advogado: dict):
@@ -449,46 +567,134 @@ def persistir_resultados(dt: date, caderno: str, caminho_pdf: str, total_mencoes
         logger.error(f"Erro ao persistir: {e}")
         return None
 
-def processar_caderno_do_dia(dt: date, caderno: str, advogados: List[Advogado], driver: webdriver.Chrome, app) -> Tuple[int, int]:
-    """Processa um único caderno do diário oficial e retorna (mencoes, mensagens)."""
+def carregar_mencoes_persistidas(diario_id: int, dt: date, caderno: str) -> Dict[int, List[Dict]]:
+    """Remonta ``por_advogado`` a partir do banco (retomada direto na notificação)."""
+    por_advogado = defaultdict(list)
+    for pub in AdvogadoPublicacao.query.filter_by(diario_id=diario_id).order_by(AdvogadoPublicacao.pagina).all():
+        por_advogado[pub.advogado_id].append({
+            "advogado": pub.advogado,
+            "pagina": pub.pagina,
+            "contexto": pub.contexto or "",
+            "link": pub.link,
+            "data_publicacao": dt,
+            "caderno": caderno,
+        })
+    return dict(por_advogado)
+
+def processar_caderno_do_dia(dt: date, caderno: str, advogados: List[Advogado], chrome: ChromeSobDemanda, app,
+                             casamento: Optional[CasamentoCompartilhado] = None) -> Tuple[int, int]:
+    """
+    Processa um único caderno do diário oficial e retorna (mencoes, mensagens).
+    O estado de cada etapa fica em ``ExecucaoCaderno``: uma retentativa (ou o
+    fallback das 21h) retoma na primeira etapa incompleta.
+    """
     logger.info(f"\n===== CADERNO: {caderno} =====")
     
     # ✅ Log informativo sobre configuração de notificações
     notifica = PRIORIDADE_CADERNO.get(caderno.upper(), False)
     logger.info(f"🔔 Configuração de notificações: {'ENVIAR' if notifica else 'NÃO ENVIAR'}")
     
-    # ✅ Verifica específicamente por data + caderno
-    q = DiarioOficial.query.filter_by(data_publicacao=dt, caderno=caderno)
-    if q.first():
+    execucao = iniciar_execucao(dt, caderno)
+    if execucao.status == STATUS_CONCLUIDO:
         logger.warning(f"Diário já processado para {dt.strftime('%d/%m/%Y')} [{caderno}]. Pulando.")
         return 0, 0
     
-    caminho = baixar_pdf_durante_sessao(dt, caderno, driver)
-    if not caminho:
-        logger.error(f"Falha ao obter PDF para caderno {caderno}")
+    # ✅ Diário gravado antes das execuções por etapa existirem: nada a retomar
+    if not execucao.etapa and DiarioOficial.query.filter_by(data_publicacao=dt, caderno=caderno).first():
+        logger.warning(f"Diário já processado para {dt.strftime('%d/%m/%Y')} [{caderno}]. Pulando.")
+        concluir_etapa(execucao, "notificado")
         return 0, 0
     
-    total_mencoes, por_advogado = processar_pdf(dt, caderno, caminho, advogados)
-    if total_mencoes == 0:
-        logger.info("Nenhuma menção encontrada. Pulando persistência.")
-        return 0, 0
+    if execucao.etapa:
+        logger.info(f"♻️ Retomando caderno {caderno} na etapa '{proxima_etapa(execucao)}' (tentativa {execucao.tentativas})")
     
-    diario = persistir_resultados(dt, caderno, caminho, total_mencoes, por_advogado)
-    if not diario: 
-        return 0, 0
+    try:
+        # PDF do caderno fixado no cache: a LRU/compressão não o tocam enquanto é processado
+        with obter_gerenciador_cache().em_uso(caminho_pdf_cache(dt, caderno)):
+            return _executar_etapas(execucao, dt, caderno, advogados, chrome, app, casamento)
+    except Exception as e:
+        registrar_falha(execucao, proxima_etapa(execucao) or "notificado", str(e))
+        raise
+
+def _executar_etapas(execucao, dt: date, caderno: str, advogados: List[Advogado], chrome: ChromeSobDemanda, app,
+                     casamento: Optional[CasamentoCompartilhado] = None) -> Tuple[int, int]:
+    if etapa_concluida(execucao, "persistido"):
+        # ✅ Já gravado: só falta notificar, com as menções lidas do banco
+        total_mencoes = execucao.total_mencoes or 0
+        por_advogado = carregar_mencoes_persistidas(execucao.diario_id, dt, caderno)
+    else:
+        if etapa_concluida(execucao, "baixado") and execucao.arquivo_pdf and validar_pdf(execucao.arquivo_pdf):
+            caminho = execucao.arquivo_pdf
+            obter_gerenciador_cache().tocar(caminho, TIPO_PDF, acerto=True)
+        else:
+            caminho = baixar_pdf_durante_sessao(dt, caderno, chrome, execucao)
+        if not caminho:
+            registrar_falha(execucao, "baixado", "não foi possível obter o PDF")
+            return 0, 0
+        
+        # Extração e casamento já feitos são reaproveitados do cache de texto e do checkpoint
+        tempos = {}
+        total_mencoes, por_advogado = processar_pdf(dt, caderno, caminho, advogados, tempos, casamento)
+        concluir_etapa(execucao, "extraido", tempos.get("extraido", 0.0))
+        concluir_etapa(execucao, "casado", tempos.get("casado", 0.0), total_mencoes=total_mencoes)
+        if total_mencoes == 0:
+            logger.info("Nenhuma menção encontrada. Pulando persistência.")
+            remover_checkpoint(dt, caderno)
+            concluir_etapa(execucao, "notificado", mensagens_enviadas=0)
+            return 0, 0
+        
+        inicio_persistencia = time.perf_counter()
+        diario = DiarioOficial.query.filter_by(data_publicacao=dt, caderno=caderno).first()
+        if diario:
+            # Persistido por uma tentativa que morreu antes de registrar a etapa
+            logger.info(f"♻️ Diário {dt.strftime('%d/%m/%Y')} [{caderno}] já gravado. Reaproveitando.")
+        else:
+            diario = persistir_resultados(dt, caderno, caminho, total_mencoes, por_advogado)
+        if not diario: 
+            registrar_falha(execucao, "persistido", "erro ao gravar o diário")
+            return 0, 0
+        concluir_etapa(execucao, "persistido", time.perf_counter() - inicio_persistencia, diario_id=diario.id)
+        remover_checkpoint(dt, caderno)
     
     # ✅ Envio de notificações apenas se o caderno tiver prioridade
+    inicio_notificacao = time.perf_counter()
     if PRIORIDADE_CADERNO.get(caderno.upper(), False):
-        msgs_enviadas = enviar_notificacoes_paralelo(por_advogado, dt, caderno, app)
+        # ✅ Retomada (tarefa morta ou retentativa): quem já recebeu não recebe de novo
+        ja_notificados = advogados_notificados(execucao.diario_id)
+        if ja_notificados:
+            logger.info(f"♻️ {len(ja_notificados)} advogado(s) já notificados em tentativa anterior. Não reenviando.")
+        pendentes = {adv_id: mencoes for adv_id, mencoes in por_advogado.items() if adv_id not in ja_notificados}
+        msgs_enviadas = len(ja_notificados) + enviar_notificacoes_paralelo(pendentes, dt, caderno, app, execucao.diario_id)
     else:
         msgs_enviadas = 0
         logger.info(f"📋 Caderno {caderno} processado e salvo, mas sem notificações (configuração de baixo impacto)")
+    concluir_etapa(execucao, "notificado", time.perf_counter() - inicio_notificacao, mensagens_enviadas=msgs_enviadas)
     
     return total_mencoes, msgs_enviadas
 
 # ===================== ORQUESTRAÇÃO TURBINADA =====================
-def executar_scraper_completo():
-    """Executa a verificação diária completa em todos os cadernos."""
+def _processar_caderno_isolado(dt: date, caderno: str, advogados: List[Advogado], app,
+                               casamento: CasamentoCompartilhado) -> Tuple[int, int]:
+    """Um caderno na sua thread: contexto da app (sessão do banco) e Chrome próprios."""
+    with app.app_context():
+        logger.info(f"\n📖 PROCESSANDO CADERNO: {caderno}")
+        # ✅ Chrome só é emprestado do pool se o resolvedor HTTP falhar neste caderno
+        chrome = ChromeSobDemanda()
+        try:
+            return processar_caderno_do_dia(dt, caderno, advogados, chrome, app, casamento)
+        finally:
+            chrome.fechar()
+
+def obter_cadernos_paralelos() -> int:
+    if CADERNOS_PARALELOS > 0:
+        return CADERNOS_PARALELOS
+    return 2 if pode_criar_processos() else 1
+
+def executar_scraper_completo(cadernos: Optional[List[str]] = None):
+    """
+    Executa a verificação diária completa em todos os cadernos (ou só em
+    ``cadernos``, ex.: os pendentes que a tarefa de retentativa retoma).
+    """
     app = create_app()
     
     with app.app_context():
@@ -505,44 +711,39 @@ def executar_scraper_completo():
         logger.info(f"📊 {len(advogados)} advogados carregados para verificação")
         
         # Todos os cadernos para verificação diária
-        cadernos = obter_cadernos()
+        cadernos = cadernos or obter_cadernos()
         logger.info(f"📰 Cadernos para verificação: {', '.join(cadernos)}")
         
         total_geral_mencoes = 0
         total_geral_msgs = 0
 
-        # Configuração única do Chrome
-        chrome_options = Options()
-        chrome_options.add_argument("--headless=new")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument(f"--user-agent={USER_AGENT}")
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--disable-software-rasterizer")
-        chrome_options.add_argument("--remote-debugging-port=0")
-        chrome_options.add_argument("--disable-setuid-sandbox")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
-        driver = webdriver.Chrome(options=chrome_options)
-        
+        # ✅ Cadernos em paralelo: download de um sobrepõe extração/casamento do outro.
+        # Matcher e pool de casamento são criados uma vez, antes das threads (fork seguro).
+        paralelos = min(obter_cadernos_paralelos(), len(cadernos)) or 1
+        processos_matching = obter_processos_matching()
+        logger.info(f"⚙️ {paralelos} caderno(s) em paralelo, {processos_matching} processo(s) de casamento, "
+                    f"{obter_processos_extracao()} de extração"
+                    f"{'' if pode_criar_processos() else ' (worker daemônico: sem pools de processos)'}")
+        # ✅ Um Chrome por caderno em paralelo: dois fallbacks ao mesmo tempo não esperam um pelo outro
+        obter_pool_chrome().garantir_tamanho(paralelos)
         try:
-            for caderno in cadernos:
-                try:
-                    logger.info(f"\n📖 PROCESSANDO CADERNO: {caderno}")
-                    mencoes, msgs = processar_caderno_do_dia(dt, caderno, advogados, driver, app)
-                    total_geral_mencoes += mencoes
-                    total_geral_msgs += msgs
-                    logger.info(f"✅ Caderno {caderno} finalizado: {mencoes} menções, {msgs} notificações")
-                except Exception as e:
-                    logger.error(f"❌ Erro ao processar caderno {caderno}: {e}")
-                    continue
+            with CasamentoCompartilhado(montar_matcher(advogados), processos_matching, paralelos) as casamento, \
+                    ThreadPoolExecutor(max_workers=paralelos, thread_name_prefix="caderno") as executor:
+                futuros = {
+                    executor.submit(_processar_caderno_isolado, dt, caderno, advogados, app, casamento): caderno
+                    for caderno in cadernos
+                }
+                for futuro in as_completed(futuros):
+                    caderno = futuros[futuro]
+                    try:
+                        mencoes, msgs = futuro.result()
+                        total_geral_mencoes += mencoes
+                        total_geral_msgs += msgs
+                        logger.info(f"✅ Caderno {caderno} finalizado: {mencoes} menções, {msgs} notificações")
+                    except Exception as e:
+                        logger.error(f"❌ Erro ao processar caderno {caderno}: {e}")
         except Exception as e:
             logger.error(f"❌ Erro geral na execução: {e}")
-        finally:
-            driver.quit()
 
         dur = time.time() - inicio
         logger.info("="*60)
@@ -551,6 +752,19 @@ def executar_scraper_completo():
         logger.info(f"📊 Menções totais encontradas: {total_geral_mencoes}")
         logger.info(f"✉️ Notificações enviadas: {total_geral_msgs}")
         logger.info(f"📅 Data processada: {dt.strftime('%d/%m/%Y')}")
+        try:
+            # Compressão dos PDFs parados fica para o fim, fora do caminho de download
+            obter_gerenciador_cache().manutencao()
+        except Exception as e:
+            logger.warning(f"⚠️ Falha na manutenção do cache: {e}")
+        try:
+            estatisticas = obter_gerenciador_cache().estatisticas()
+            total_cache = estatisticas.pop("total")
+            logger.info(f"🗄️ Cache: {total_cache['entradas']} entradas, {total_cache['bytes'] / (1024 * 1024):.0f}MB; " +
+                        ", ".join(f"{tipo} {e['acertos']}/{e['acertos'] + e['falhas']} acertos"
+                                  for tipo, e in estatisticas.items()))
+        except Exception as e:
+            logger.warning(f"⚠️ Não foi possível ler as estatísticas do cache: {e}")
         logger.info("="*60)
 
 if __name__ == "__main__":
@@ -0,0 +1,57 @@
+# app/scrapers/djerj/segmentacao.py
+# SEGMENTAÇÃO DA PÁGINA EM PUBLICAÇÕES: NÚMERO CNJ QUE ABRE CADA BLOCO + MARCADOR "ADV:"
+
+import os
+import re
+from typing import List, Tuple
+
+Span = Tuple[int, int]
+
+# "0" volta ao casamento por página inteira (contexto de ±CONTEXTO_CARACTERES)
+SEGMENTAR_PUBLICACOES = os.getenv("SEGMENTAR_PUBLICACOES", "1").strip() != "0"
+
+# Número CNJ (NNNNNNN-DD.AAAA.J.TR.OOOO), com o "PROC."/"PROCESSO Nº" que costuma
+# precedê-lo, em texto JÁ NORMALIZADO (o º vira "o" minúsculo na normalização)
+PROCESSO_CNJ_PATTERN = re.compile(
+    r'(?:\bPROC(?:ESSO)?\.?\s*(?:N(?:O|\.O)?\.?\s*)?:?\s*)?'
+    r'(?<![\d.\-])\d{7}-?\d{2}\.?\d{4}\.?\d\.?\d{2}\.?\d{4}(?![\d])',
+    re.IGNORECASE
+)
+
+# "ADV:", "ADV.:", "ADV(S).:", "ADVOGADO(S):", "ADVOGADA:", "ADVOGADOS:"
+MARCADOR_ADV_PATTERN = re.compile(r'\bADV(?:OGAD[OA]S?|S)?(?:\s*\(\s*[AS]\s*\))*\.?\s*:', re.IGNORECASE)
+
+
+def segmentar_publicacoes(texto_norm: str) -> List[Span]:
+    """
+    Divide o texto normalizado da página em blocos de publicação, em uma
+    passada. Cada publicação do DJERJ abre com o número CNJ do processo e lista
+    os advogados ("ADV:") antes da próxima; por isso um número CNJ só abre bloco
+    novo se o bloco atual já passou por um marcador de advogado (ou se é o
+    primeiro número da página). Números citados no corpo da publicação (apensos,
+    processo de origem) não quebram o bloco.
+
+    Retorna spans ``(inicio, fim)`` contíguos que cobrem o texto inteiro; o trecho
+    antes do primeiro número (cabeçalho, fim da publicação da página anterior)
+    é o primeiro bloco.
+    """
+    if not texto_norm:
+        return []
+
+    marcadores = [m.start() for m in MARCADOR_ADV_PATTERN.finditer(texto_norm)]
+    inicios = [0]
+    proximo_marcador = 0
+    primeiro_numero = True
+    for match in PROCESSO_CNJ_PATTERN.finditer(texto_norm):
+        inicio = match.start()
+        # Houve "ADV:" entre o início do bloco atual e este número?
+        while proximo_marcador < len(marcadores) and marcadores[proximo_marcador] < inicios[-1]:
+            proximo_marcador += 1
+        teve_advogado = proximo_marcador < len(marcadores) and marcadores[proximo_marcador] < inicio
+        if teve_advogado or primeiro_numero:
+            if inicio > inicios[-1]:
+                inicios.append(inicio)
+            primeiro_numero = False
+
+    fins = inicios[1:] + [len(texto_norm)]
+    return list(zip(inicios, fins))
@@ -13,10 +13,10 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 from pdfminer.high_level import extract_text
-from io import BytesIO
 
 from app import create_app, db
 from app.models import Advogado, Publicacao, DiarioOficial
+from app.scrapers.djerj.download import baixar_pdf_streaming
 
 DJERJ_BASE = "https://www3.tjrj.jus.br/consultadje/"
 TIMEOUT = 30
@@ -60,15 +60,18 @@ def _get_pdf_url(driver, data):
 
 
 def _baixar_pdf(pdf_url):
-    """Baixa o PDF e retorna o conteúdo em bytes"""
-    resp = requests.get(pdf_url, timeout=60)
-    resp.raise_for_status()
-    return resp.content
+    """Baixa o PDF em streaming para CACHE_DIR e retorna o caminho do arquivo"""
+    cache_dir = os.getenv("CACHE_DIR", "/tmp")
+    destino = os.path.join(cache_dir, os.path.basename(pdf_url.split("?")[0]) or "diario.pdf")
+    with requests.Session() as session:
+        if not baixar_pdf_streaming(session, pdf_url, destino, timeout=60):
+            raise RuntimeError(f"Download inválido: {pdf_url}")
+    return destino
 
 
-def _extrair_texto_pdf(pdf_bytes):
-    """Extrai texto do PDF usando pdfminer"""
-    return extract_text(BytesIO(pdf_bytes))
+def _extrair_texto_pdf(caminho_pdf):
+    """Extrai texto do PDF usando pdfminer (lendo do disco, sem o PDF inteiro em memória)"""
+    return extract_text(caminho_pdf)
 
 
 def _salvar_diario(data, pdf_url):
@@ -118,8 +121,8 @@ def executar_scraper_otimizado():
                 return
 
             logging.info(f"📄 PDF encontrado: {pdf_url}")
-            pdf_bytes = _baixar_pdf(pdf_url)
-            texto = _extrair_texto_pdf(pdf_bytes)
+            caminho_pdf = _baixar_pdf(pdf_url)
+            texto = _extrair_texto_pdf(caminho_pdf)
 
             # busca em chunks
             total_publicacoes = 0
@@ -1,10 +1,16 @@
 # Permite imports mais limpos
-from .text_utils import normalizar_texto, criar_regex_oab, criar_regex_nome_flexivel
+from .text_utils import normalizar_texto, normalizar_com_offsets, criar_regex_oab, criar_regex_nome_flexivel
 from .advogado_utils import buscar_mencoes_advogado
+from .matcher import MatcherAdvogados, carregar_matcher
+from .indice_tokens import IndiceTokensRaros
 
 __all__ = [
     'normalizar_texto',
+    'normalizar_com_offsets',
     'criar_regex_oab', 
     'criar_regex_nome_flexivel',
-    'buscar_mencoes_advogado'
+    'buscar_mencoes_advogado',
+    'MatcherAdvogados',
+    'carregar_matcher',
+    'IndiceTokensRaros'
 ]
@@ -8,10 +8,11 @@ def buscar_mencoes_advogado(texto_norm: str, advogado: Advogado) -> List[re.Matc
     """Busca todas as menções válidas do advogado no texto normalizado."""
     resultados = []
     
-    nome_pattern = criar_regex_nome_flexivel(advogado.nome_completo)
+    # As funções devolvem regex compiladas: a composição usa o texto do padrão
+    nome_pattern = criar_regex_nome_flexivel(advogado.nome_completo).pattern
     
     if advogado.numero_oab:
-        oab_pattern = criar_regex_oab(advogado.numero_oab)
+        oab_pattern = criar_regex_oab(advogado.numero_oab).pattern
         padrao_completo = f"({nome_pattern})" + r".{0,80}?" + f"({oab_pattern})"
         
         for match in re.finditer(padrao_completo, texto_norm, re.IGNORECASE):
@@ -0,0 +1,173 @@
+# app/scrapers/utils/aho_corasick.py
+
+from collections import defaultdict, deque
+from typing import Dict, Hashable, Iterator, List, Sequence, Set, Tuple
+
+# Bits reservados para o id do token na chave de transição (nó << BITS | token)
+_BITS_TOKEN = 24
+_MASCARA_TOKEN = (1 << _BITS_TOKEN) - 1
+
+
+class AutomatoAhoCorasick:
+    """
+    Automato Aho-Corasick sobre sequências de TOKENS (palavras normalizadas).
+
+    Cada padrão é uma tupla de tokens associada a um ou mais valores. Depois de
+    ``construir()``, ``buscar()`` percorre o texto tokenizado uma única vez e
+    devolve todas as ocorrências de todos os padrões, com custo linear no
+    tamanho do texto, independente da quantidade de padrões.
+
+    Com ``permitir_prefixo_colado=True`` o primeiro token do padrão também casa
+    como sufixo de uma palavra maior (ex.: "ADVOGADOJOAO DA SILVA"), imitando o
+    ``\\w*`` de ``criar_regex_nome_flexivel``.
+    """
+
+    def __init__(self, permitir_prefixo_colado: bool = True):
+        self.permitir_prefixo_colado = permitir_prefixo_colado
+        self.vocabulario: Dict[str, int] = {}
+        # Transições em um único dict de inteiros: bem mais compacto que um dict por nó
+        self._transicoes: Dict[int, int] = {}
+        self._profundidade: List[int] = [0]
+        self._falha: List[int] = [0]
+        self._link_saida: List[int] = [0]
+        self._valores: Dict[int, List[Hashable]] = {}
+        self._primeiros: Set[str] = set()
+        self._tamanho_min_primeiro = 0
+        self._construido = False
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._valores.values())
+
+    def _id_token(self, token: str) -> int:
+        id_token = self.vocabulario.get(token)
+        if id_token is None:
+            id_token = len(self.vocabulario) + 1
+            if id_token > _MASCARA_TOKEN:
+                raise OverflowError("Vocabulário excede o limite do automato")
+            self.vocabulario[token] = id_token
+        return id_token
+
+    def adicionar(self, tokens: Sequence[str], valor: Hashable) -> None:
+        """Registra um padrão (tupla de tokens) associado a ``valor``."""
+        if not tokens:
+            return
+        no = 0
+        for token in tokens:
+            chave = (no << _BITS_TOKEN) | self._id_token(token)
+            proximo = self._transicoes.get(chave)
+            if proximo is None:
+                proximo = len(self._profundidade)
+                self._transicoes[chave] = proximo
+                self._profundidade.append(self._profundidade[no] + 1)
+                self._falha.append(0)
+                self._link_saida.append(0)
+            no = proximo
+        self._valores.setdefault(no, []).append(valor)
+        self._primeiros.add(tokens[0])
+        self._construido = False
+
+    def remover(self, tokens: Sequence[str], valor: Hashable) -> None:
+        """Remove ``valor`` do padrão. Os nós do trie ficam (sem custo de reconstrução)."""
+        no = 0
+        for token in tokens:
+            id_token = self.vocabulario.get(token)
+            if id_token is None:
+                return
+            no = self._transicoes.get((no << _BITS_TOKEN) | id_token)
+            if no is None:
+                return
+        valores = self._valores.get(no)
+        if valores and valor in valores:
+            valores.remove(valor)
+            if not valores:
+                del self._valores[no]
+            self._construido = False
+
+    def construir(self) -> None:
+        """Calcula os links de falha (BFS). Deve ser chamado após adicionar padrões."""
+        filhos: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        for chave, filho in self._transicoes.items():
+            filhos[chave >> _BITS_TOKEN].append((chave & _MASCARA_TOKEN, filho))
+
+        fila = deque()
+        for _, filho in filhos.get(0, ()):
+            self._falha[filho] = 0
+            self._link_saida[filho] = 0
+            fila.append(filho)
+
+        while fila:
+            no = fila.popleft()
+            for id_token, filho in filhos.get(no, ()):
+                f = self._falha[no]
+                while True:
+                    destino = self._transicoes.get((f << _BITS_TOKEN) | id_token)
+                    if destino is not None and destino != filho:
+                        break
+                    if f == 0:
+                        destino = 0
+                        break
+                    f = self._falha[f]
+                self._falha[filho] = destino
+                self._link_saida[filho] = destino if destino in self._valores else self._link_saida[destino]
+                fila.append(filho)
+
+        self._tamanho_min_primeiro = min((len(t) for t in self._primeiros), default=0)
+        self._construido = True
+
+    def _valores_colados(self, tokens: Sequence[str], ids: Sequence[int], i: int) -> Iterator[Tuple[int, int, Hashable]]:
+        """Padrões cujo primeiro token é sufixo próprio de ``tokens[i]``."""
+        palavra = tokens[i]
+        for k in range(1, len(palavra) - self._tamanho_min_primeiro + 1):
+            sufixo = palavra[k:]
+            if sufixo not in self._primeiros:
+                continue
+            no = self._transicoes.get(self.vocabulario[sufixo])
+            j = i
+            while no is not None:
+                for valor in self._valores.get(no, ()):
+                    yield i, j, valor
+                j += 1
+                if j >= len(ids) or not ids[j]:
+                    break
+                no = self._transicoes.get((no << _BITS_TOKEN) | ids[j])
+
+    def buscar(self, tokens: Sequence[str]) -> Iterator[Tuple[int, int, Hashable]]:
+        """
+        Varre a sequência de tokens do texto e gera ``(indice_inicio, indice_fim, valor)``
+        para cada ocorrência, onde os índices são posições (inclusivas) em ``tokens``.
+        """
+        if not self._construido:
+            self.construir()
+
+        vocabulario = self.vocabulario
+        transicoes = self._transicoes
+        falha = self._falha
+        link_saida = self._link_saida
+        valores = self._valores
+        profundidade = self._profundidade
+        primeiros_colados = self.permitir_prefixo_colado and self._primeiros
+
+        ids = [vocabulario.get(t, 0) for t in tokens]
+        no = 0
+        for i, id_token in enumerate(ids):
+            if primeiros_colados and len(tokens[i]) > self._tamanho_min_primeiro:
+                yield from self._valores_colados(tokens, ids, i)
+
+            if not id_token:
+                no = 0
+                continue
+            while True:
+                destino = transicoes.get((no << _BITS_TOKEN) | id_token)
+                if destino is not None:
+                    no = destino
+                    break
+                if no == 0:
+                    break
+                no = falha[no]
+
+            saida = no if no in valores else link_saida[no]
+            while saida:
+                inicio = i - profundidade[saida] + 1
+                for valor in valores[saida]:
+                    yield inicio, i, valor
+                saida = link_saida[saida]
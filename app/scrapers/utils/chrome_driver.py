@@ -1,13 +1,45 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
+from contextlib import contextmanager
+from functools import wraps
 import tempfile
+import threading
+import json
+import re
+import atexit
 import shutil
 import logging
+import queue
+import time
 import os
+from urllib.parse import urlsplit
+
+import psutil
 
 logger = logging.getLogger(__name__)
 
+# ===================== POOL DE CHROME AQUECIDO (POR PROCESSO WORKER) =====================
+CHROME_POOL_TAMANHO = int(os.getenv("CHROME_POOL_TAMANHO", "1"))
+# Recicla a instância depois de N páginas carregadas ou acima de X MB (Chrome + filhos)
+CHROME_MAX_PAGINAS = int(os.getenv("CHROME_MAX_PAGINAS", "200"))
+CHROME_MAX_RSS_MB = int(os.getenv("CHROME_MAX_RSS_MB", "1024"))
+CHROME_ESPERA_EMPRESTIMO = int(os.getenv("CHROME_ESPERA_EMPRESTIMO", "300"))
+# Modo rede: bloqueia imagens, fontes, CSS e analytics via CDP e registra os eventos de rede
+CHROME_BLOQUEAR_RECURSOS = os.getenv("CHROME_BLOQUEAR_RECURSOS", "1") != "0"
+URLS_BLOQUEADAS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.css", "*.mp4", "*.webm", "*.mp3",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*hotjar.com*", "*facebook.net*", "*clarity.ms*",
+]
+EVENTOS_REQUISICAO = ("Network.requestWillBeSent", "Network.responseReceived")
+USER_AGENT_CHROME = os.getenv(
+    "CHROME_USER_AGENT",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+)
+
 def get_chromedriver_path():
     """Retorna o caminho correto do chromedriver"""
     possible_paths = [
@@ -36,6 +68,13 @@ def create_chrome_driver():
     options.add_argument('--disable-software-rasterizer')
     options.add_argument('--window-size=1920,1080')
     options.add_argument('--remote-debugging-port=0')
+    options.add_argument('--disable-extensions')
+    options.add_argument('--disable-setuid-sandbox')
+    options.add_argument(f'--user-agent={USER_AGENT_CHROME}')
+    options.add_experimental_option('excludeSwitches', ['enable-automation'])
+    options.add_experimental_option('useAutomationExtension', False)
+    if CHROME_BLOQUEAR_RECURSOS:
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
     
     # ✅ DIRETÓRIO TEMPORÁRIO ÚNICO
     user_data_dir = tempfile.mkdtemp(prefix='chrome-profile-')
@@ -48,6 +87,8 @@ def create_chrome_driver():
     try:
         driver = webdriver.Chrome(service=service, options=options)
         driver._temp_dir = user_data_dir  # Para cleanup posterior
+        if CHROME_BLOQUEAR_RECURSOS:
+            ativar_modo_rede(driver)
         logger.info(f"🚀 ChromeDriver iniciado | Temp dir: {user_data_dir}")
         return driver
     except Exception as e:
@@ -55,6 +96,56 @@ def create_chrome_driver():
         shutil.rmtree(user_data_dir, ignore_errors=True)
         raise
 
+def ativar_modo_rede(driver) -> None:
+    """Bloqueia (CDP Network.setBlockedURLs) os recursos que os scrapers nunca usam."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": URLS_BLOQUEADAS})
+        driver._modo_rede = True
+    except Exception as e:
+        logger.warning(f"⚠️ CDP indisponível, recursos não serão bloqueados: {e}")
+        driver._modo_rede = False
+
+def descartar_eventos_rede(driver) -> None:
+    """Esvazia o log de performance (eventos de navegações anteriores)."""
+    if getattr(driver, "_modo_rede", False):
+        try:
+            driver.get_log("performance")
+        except Exception:
+            pass
+
+def urls_na_rede(driver, padrao: re.Pattern) -> list:
+    """URLs requisitadas pelo navegador (em qualquer frame) que casam com ``padrao``, na ordem."""
+    if not getattr(driver, "_modo_rede", False):
+        return []
+    urls = []
+    try:
+        entradas = driver.get_log("performance")
+    except Exception as e:
+        logger.debug(f"Log de performance indisponível: {e}")
+        return []
+    for entrada in entradas:
+        try:
+            mensagem = json.loads(entrada["message"])["message"]
+        except (KeyError, TypeError, ValueError):
+            continue
+        if mensagem.get("method") not in EVENTOS_REQUISICAO:
+            continue
+        params = mensagem.get("params", {})
+        url = (params.get("request") or params.get("response") or {}).get("url", "")
+        if padrao.search(url) and url not in urls:
+            urls.append(url)
+    return urls
+
+def aguardar_url_na_rede(driver, padrao: re.Pattern, timeout: float = 15, intervalo: float = 0.25) -> list:
+    """Espera até alguma requisição casar com ``padrao`` (no lugar de sleep + regex no page_source)."""
+    limite = time.monotonic() + timeout
+    while True:
+        urls = urls_na_rede(driver, padrao)
+        if urls or not getattr(driver, "_modo_rede", False) or time.monotonic() >= limite:
+            return urls
+        time.sleep(intervalo)
+
 def cleanup_chrome_driver(driver):
     """Fecha driver e limpa diretório temporário"""
     if not driver:
@@ -73,3 +164,206 @@ def cleanup_chrome_driver(driver):
                 logger.debug(f"🧹 Diretório limpo: {driver._temp_dir}")
             except Exception as e:
                 logger.warning(f"⚠️ Erro ao limpar diretório: {e}")
+
+
+def rss_chrome_mb(driver) -> float:
+    """RSS do chromedriver e de todos os processos do Chrome abaixo dele."""
+    try:
+        processo = psutil.Process(driver.service.process.pid)
+        processos = [processo] + processo.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return 0.0
+    total = 0
+    for p in processos:
+        try:
+            total += p.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / (1024 * 1024)
+
+
+def _origem(url: str) -> str:
+    partes = urlsplit(url or "")
+    return f"{partes.scheme}://{partes.netloc}" if partes.scheme in ("http", "https") and partes.netloc else ""
+
+
+def _contar_paginas(driver) -> None:
+    """
+    Conta as navegações do driver (``get``) para reciclá-lo após CHROME_MAX_PAGINAS
+    e guarda as origens visitadas, cujo storage é apagado na devolução ao pool.
+    """
+    get_original = driver.get
+
+    @wraps(get_original)
+    def get(url):
+        driver._paginas_carregadas += 1
+        origem = _origem(url)
+        if origem:
+            driver._origens_visitadas.add(origem)
+        return get_original(url)
+
+    driver._paginas_carregadas = 0
+    driver._origens_visitadas = set()
+    driver._get_original = get_original
+    driver.get = get
+
+
+class PoolChrome:
+    """
+    Mantém até ``tamanho`` Chromes headless abertos e os empresta aos scrapers
+    (DJERJ e DJEN). Cada empréstimo recebe um navegador saudável e sem estado
+    (cookies, storage, abas e frames da tarefa anterior são limpos na devolução);
+    instâncias que passam de ``max_paginas`` ou ``max_rss_mb`` são recicladas.
+    O custo de subir o Chrome fica só no aquecimento do worker.
+    """
+
+    def __init__(self, tamanho: int = CHROME_POOL_TAMANHO, max_paginas: int = CHROME_MAX_PAGINAS,
+                 max_rss_mb: int = CHROME_MAX_RSS_MB):
+        self.tamanho = max(1, tamanho)
+        self.max_paginas = max_paginas
+        self.max_rss_mb = max_rss_mb
+        self.pid = os.getpid()
+        self._ociosos: queue.LifoQueue = queue.LifoQueue()
+        self._abertos = 0
+        self._trava = threading.Lock()
+
+    def garantir_tamanho(self, tamanho: int) -> None:
+        """Aumenta o limite do pool (ex.: um Chrome por caderno em paralelo). Os extras só abrem no empréstimo."""
+        with self._trava:
+            self.tamanho = max(self.tamanho, tamanho)
+
+    def _criar(self):
+        driver = create_chrome_driver()
+        _contar_paginas(driver)
+        return driver
+
+    def _descartar(self, driver) -> None:
+        cleanup_chrome_driver(driver)
+        with self._trava:
+            self._abertos -= 1
+
+    def aquecer(self) -> None:
+        """Abre os Chromes que faltam para completar o pool."""
+        while True:
+            with self._trava:
+                if self._abertos >= self.tamanho:
+                    return
+                self._abertos += 1
+            try:
+                self._ociosos.put(self._criar())
+            except Exception as e:
+                with self._trava:
+                    self._abertos -= 1
+                logger.warning(f"⚠️ Não foi possível aquecer o Chrome: {e}")
+                return
+
+    @staticmethod
+    def _saudavel(driver) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def emprestar(self, timeout: float = CHROME_ESPERA_EMPRESTIMO):
+        """Driver ocioso e saudável; abre um novo se o pool não está cheio, senão espera."""
+        limite = time.monotonic() + timeout
+        while True:
+            try:
+                driver = self._ociosos.get_nowait()
+            except queue.Empty:
+                driver = None
+                with self._trava:
+                    pode_abrir = self._abertos < self.tamanho
+                    if pode_abrir:
+                        self._abertos += 1
+                if pode_abrir:
+                    try:
+                        return self._criar()
+                    except Exception:
+                        with self._trava:
+                            self._abertos -= 1
+                        raise
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    raise TimeoutError(f"Nenhum Chrome livre no pool após {timeout}s")
+                try:
+                    driver = self._ociosos.get(timeout=restante)
+                except queue.Empty:
+                    continue
+
+            if self._saudavel(driver):
+                return driver
+            logger.warning("⚠️ Chrome do pool não responde. Substituindo...")
+            self._descartar(driver)
+
+    def _resetar(self, driver) -> None:
+        """Volta o navegador ao estado de recém-aberto (sem sair do processo)."""
+        driver.switch_to.default_content()
+        janelas = driver.window_handles
+        for janela in janelas[1:]:
+            driver.switch_to.window(janela)
+            driver.close()
+        driver.switch_to.window(janelas[0])
+        driver.implicitly_wait(0)
+        # delete_all_cookies/localStorage.clear() só alcançam a origem atual: via CDP
+        # limpa os cookies de todos os sites e o storage de cada origem visitada
+        # (DJEN e DJERJ dividem o mesmo Chrome). Se o CDP falhar, ``devolver`` descarta o driver.
+        origens = set(getattr(driver, "_origens_visitadas", set()))
+        origens.add(_origem(driver.current_url))
+        driver._get_original("about:blank")  # não conta como página da tarefa
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        for origem in filter(None, origens):
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origem, "storageTypes": "all"})
+        driver._origens_visitadas = set()
+        descartar_eventos_rede(driver)
+
+    def devolver(self, driver) -> None:
+        """Limpa o estado e devolve ao pool, ou recicla a instância se passou dos limites."""
+        if driver is None:
+            return
+        if os.getpid() != self.pid:
+            cleanup_chrome_driver(driver)
+            return
+        paginas = getattr(driver, "_paginas_carregadas", 0)
+        rss_mb = rss_chrome_mb(driver)
+        if paginas >= self.max_paginas or rss_mb >= self.max_rss_mb:
+            logger.info(f"♻️ Reciclando Chrome ({paginas} páginas, {rss_mb:.0f}MB)")
+            self._descartar(driver)
+            return
+        try:
+            self._resetar(driver)
+        except Exception as e:
+            logger.warning(f"⚠️ Falha ao limpar o Chrome, descartando: {e}")
+            self._descartar(driver)
+            return
+        self._ociosos.put(driver)
+
+    @contextmanager
+    def driver(self):
+        driver = self.emprestar()
+        try:
+            yield driver
+        finally:
+            self.devolver(driver)
+
+    def fechar(self) -> None:
+        while True:
+            try:
+                driver = self._ociosos.get_nowait()
+            except queue.Empty:
+                return
+            self._descartar(driver)
+
+
+_pool_chrome = None
+_trava_pool = threading.Lock()
+
+
+def obter_pool_chrome() -> PoolChrome:
+    """Pool do processo atual (um por worker; um filho criado por fork não herda o do pai)."""
+    global _pool_chrome
+    with _trava_pool:
+        if _pool_chrome is None or _pool_chrome.pid != os.getpid():
+            _pool_chrome = PoolChrome()
+            atexit.register(_pool_chrome.fechar)
+        return _pool_chrome
@@ -0,0 +1,118 @@
+# app/scrapers/utils/indice_tokens.py
+# ÍNDICE INVERTIDO POR TOKEN RARO: PRÉ-FILTRO ANTES DA VERIFICAÇÃO POR REGEX
+
+import os
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .matcher import Span, tokenizar
+from .text_utils import normalizar_texto
+
+
+# Conectivos de nomes em português: aparecem em qualquer página e não discriminam ninguém
+CONECTIVOS = frozenset({"DE", "DA", "DO", "DAS", "DOS", "E", "D"})
+# Acima de tantos advogados com o mesmo token, a chave passa a ser um par de tokens vizinhos
+FREQUENCIA_MAXIMA_TOKEN = int(os.getenv("INDICE_FREQUENCIA_MAXIMA", "25"))
+
+Chave = Union[str, Tuple[str, str]]
+
+
+def escolher_token_raro(tokens: Sequence[str], frequencia: Counter) -> str:
+    """
+    Escolhe o token menos frequente do nome (desempate pelo mais longo), sem
+    conectivos ("DE", "DOS"...).
+
+    O primeiro token pode aparecer colado a outra palavra ("ADVOGADOJOAO"), caso
+    que a regex aceita mas que não gera o token isolado na página; por isso ele
+    só é usado quando o nome não tem alternativa. O último token (em geral o
+    sobrenome, o mais raro) entra: quando ele é prefixo de uma palavra maior na
+    página ("SILVAS"), a regex casaria por acidente, não por menção.
+    """
+    for elegiveis in (tokens[1:], tokens):
+        elegiveis = [t for t in elegiveis if t not in CONECTIVOS]
+        if elegiveis:
+            return min(elegiveis, key=lambda t: (frequencia[t], -len(t)))
+    return min(tokens, key=lambda t: (frequencia[t], -len(t)))
+
+
+def pares_vizinhos(tokens: Sequence[str]) -> List[Tuple[str, str]]:
+    return list(zip(tokens, tokens[1:]))
+
+
+def escolher_chave(tokens: Sequence[str], frequencia: Counter, frequencia_pares: Counter,
+                   frequencia_maxima: int = FREQUENCIA_MAXIMA_TOKEN) -> Chave:
+    """
+    Token raro do nome; se nem ele é raro o bastante (``frequencia_maxima``),
+    o par de tokens vizinhos mais raro (sem o primeiro token, que pode vir colado).
+    A regex exige os tokens do nome em sequência, então o par aparece na página.
+    """
+    token = escolher_token_raro(tokens, frequencia)
+    if frequencia[token] <= frequencia_maxima:
+        return token
+    pares = [par for par in pares_vizinhos(tokens[1:]) if not set(par) <= CONECTIVOS]
+    if not pares:
+        return token
+    par = min(pares, key=lambda p: (frequencia_pares[p], -len(p[0]) - len(p[1])))
+    return par if frequencia_pares[par] < frequencia[token] else token
+
+
+class IndiceTokensRaros:
+    """
+    Índice ``token raro -> advogados`` sobre a lista de advogados.
+
+    A página é tokenizada uma vez e só os advogados cujo token raro aparece
+    nela viram candidatos; a verificação cara (regex de nome/OAB) roda apenas
+    para esse pequeno conjunto em vez de para a lista inteira.
+    """
+
+    def __init__(self, advogados: Iterable, verificar: Optional[Callable] = None):
+        self.verificar = verificar
+        advogados = list(advogados)
+
+        tokens_por_posicao: List[Tuple[int, object, List[str]]] = []
+        frequencia: Counter = Counter()
+        frequencia_pares: Counter = Counter()
+        for posicao, advogado in enumerate(advogados):
+            tokens = tokenizar(normalizar_texto(advogado.nome_completo or ""))
+            if not tokens:
+                continue
+            tokens_por_posicao.append((posicao, advogado, tokens))
+            frequencia.update(set(tokens))
+            frequencia_pares.update(set(pares_vizinhos(tokens[1:])))
+
+        self.indice: Dict[Chave, List[Tuple[int, object]]] = defaultdict(list)
+        for posicao, advogado, tokens in tokens_por_posicao:
+            self.indice[escolher_chave(tokens, frequencia, frequencia_pares)].append((posicao, advogado))
+        self.indice = dict(self.indice)
+        self.usa_pares = any(isinstance(chave, tuple) for chave in self.indice)
+        self.total_advogados = len(tokens_por_posicao)
+
+    def candidatos(self, texto_norm: str) -> List:
+        """Advogados cuja chave (token raro ou par de tokens) aparece no texto, na ordem da lista original."""
+        tokens = tokenizar(texto_norm)
+        chaves = set(tokens)
+        if self.usa_pares:
+            chaves.update(pares_vizinhos(tokens))
+        encontrados = []
+        for chave in chaves:
+            encontrados.extend(self.indice.get(chave, ()))
+        encontrados.sort(key=lambda item: item[0])
+        return [advogado for _, advogado in encontrados]
+
+    def buscar(self, texto_norm: str) -> List[Tuple[int, Span]]:
+        """
+        Mesmo contrato de ``MatcherAdvogados.buscar``: verifica cada candidato com
+        ``verificar(texto_norm, advogado)``, que devolve os spans das menções
+        (ex.: ``buscar_mencoes_advogado`` do scraper DJERJ).
+        """
+        if not texto_norm:
+            return []
+        if self.verificar is None:
+            raise ValueError("IndiceTokensRaros.buscar requer uma função de verificação")
+
+        resultados = []
+        for advogado in self.candidatos(texto_norm):
+            for span in self.verificar(texto_norm, advogado):
+                resultados.append((advogado.id, tuple(span)))
+        resultados.sort(key=lambda r: (r[1], r[0]))
+        return resultados
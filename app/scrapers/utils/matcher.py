@@ -0,0 +1,332 @@
+# app/scrapers/utils/matcher.py
+# MATCHER MULTI-PADRÃO: TODOS OS ADVOGADOS EM UM ÚNICO AUTOMATO
+
+import gc
+import os
+import re
+import zlib
+import pickle
+import hashlib
+import logging
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .aho_corasick import AutomatoAhoCorasick
+from .text_utils import normalizar_texto, normalizar_numero_oab, extrair_numeros_oab
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r'\w+')
+JANELA_NOME_OAB = 150  # mesma distância máxima usada em buscar_mencoes_advogado
+
+# Cache em disco do matcher compilado (CACHE_DIR/matcher, só do usuário da app)
+DIRETORIO_CACHE_MATCHER = "matcher"
+ARQUIVO_CACHE_MATCHER = "matcher_advogados.pkl"
+VERSAO_FORMATO_CACHE = 1  # incrementar quando a estrutura do matcher mudar
+LIMITE_ATUALIZACAO_INCREMENTAL = 0.2  # acima de 20% de mudanças, recompila do zero
+
+NOME = 0
+OAB = 1  # tipos de evento em parear_nome_oab
+
+Span = Tuple[int, int]
+
+
+def tokenizar(texto_norm: str) -> List[str]:
+    return TOKEN_PATTERN.findall(texto_norm)
+
+
+def sem_sobreposicao(spans: List[Span]) -> List[Span]:
+    """Mantém apenas spans não sobrepostos (mesma semântica do ``finditer``)."""
+    resultado = []
+    fim_anterior = -1
+    for inicio, fim in sorted(spans):
+        if inicio >= fim_anterior:
+            resultado.append((inicio, fim))
+            fim_anterior = fim
+    return resultado
+
+
+def assinatura_advogado(advogado) -> int:
+    """Assinatura estável (entre processos) do que o matcher usa de cada advogado."""
+    return zlib.crc32(f"{advogado.nome_completo or ''}\x1f{advogado.numero_oab or ''}".encode("utf-8"))
+
+
+def versao_lista_advogados(assinaturas: Dict[int, int]) -> str:
+    """Hash SHA-256 do conteúdo da tabela advogado (id + nome + OAB)."""
+    h = hashlib.sha256()
+    for advogado_id in sorted(assinaturas):
+        h.update(f"{advogado_id}:{assinaturas[advogado_id]};".encode("ascii"))
+    return h.hexdigest()
+
+
+def parear_nome_oab(nomes: List[Span], oabs: List[Span], janela: int = JANELA_NOME_OAB) -> List[Span]:
+    """
+    Pareia ocorrências de nome e de OAB nas duas ordens (nome → OAB e OAB → nome),
+    com até ``janela`` caracteres entre o fim do primeiro e o início do segundo.
+
+    Reproduz o ``finditer`` de ``(NOME.{0,150}?OAB|OAB.{0,150}?NOME)``: varre da
+    esquerda para a direita, escolhe o parceiro mais próximo (quantificador
+    preguiçoso) e não devolve menções sobrepostas. Custo O((n + m) log m).
+    """
+    if not nomes or not oabs:
+        return []
+
+    nomes = sorted(nomes)
+    oabs = sorted(oabs)
+    inicios_nome = [inicio for inicio, _ in nomes]
+    inicios_oab = [inicio for inicio, _ in oabs]
+
+    # Em empate de início, a alternativa nome → OAB vem primeiro, como na regex
+    eventos = sorted([(ini, NOME, fim) for ini, fim in nomes] + [(ini, OAB, fim) for ini, fim in oabs])
+
+    resultado = []
+    posicao = 0
+    for inicio, tipo, fim in eventos:
+        if inicio < posicao:
+            continue
+        if tipo == NOME:
+            parceiros, inicios_parceiros = oabs, inicios_oab
+        else:
+            parceiros, inicios_parceiros = nomes, inicios_nome
+        k = bisect_left(inicios_parceiros, fim)
+        if k < len(parceiros) and inicios_parceiros[k] - fim <= janela:
+            fim_mencao = parceiros[k][1]
+            resultado.append((inicio, fim_mencao))
+            posicao = fim_mencao
+    return resultado
+
+
+class MatcherAdvogados:
+    """
+    Compila o nome normalizado de todos os advogados em um único automato
+    Aho-Corasick e resolve os números de OAB encontrados na página por um mapa
+    ``numero_oab -> advogados``. Cada página é varrida uma vez, e o custo por
+    página deixa de crescer com o tamanho da lista de advogados.
+    """
+
+    def __init__(self, advogados: Iterable, janela_oab: int = JANELA_NOME_OAB):
+        self.janela_oab = janela_oab
+        self.automato = AutomatoAhoCorasick(permitir_prefixo_colado=True)
+        self._nomes: Dict[int, str] = {}
+        # Vários advogados podem compartilhar o mesmo número (ou cadastro genérico)
+        self.advogados_por_oab: Dict[str, List[int]] = {}
+        self._oab_por_advogado: Dict[int, str] = {}
+        self.assinaturas: Dict[int, int] = {}
+
+        for advogado in advogados:
+            self._adicionar_advogado(advogado)
+        self.automato.construir()
+        self.versao = versao_lista_advogados(self.assinaturas)
+
+    @property
+    def total_advogados(self) -> int:
+        return len(self._nomes)
+
+    def _adicionar_advogado(self, advogado) -> None:
+        self.assinaturas[advogado.id] = assinatura_advogado(advogado)
+        nome_norm = normalizar_texto(advogado.nome_completo or "")
+        tokens_nome = tokenizar(nome_norm)
+        if not tokens_nome:
+            return
+        self.automato.adicionar(tokens_nome, advogado.id)
+        self._nomes[advogado.id] = nome_norm
+
+        numero = normalizar_numero_oab(advogado.numero_oab or "")
+        if numero:
+            self.advogados_por_oab.setdefault(numero, []).append(advogado.id)
+            self._oab_por_advogado[advogado.id] = numero
+
+    def _remover_advogado(self, advogado_id: int) -> None:
+        self.assinaturas.pop(advogado_id, None)
+        nome_norm = self._nomes.pop(advogado_id, None)
+        if nome_norm:
+            self.automato.remover(tokenizar(nome_norm), advogado_id)
+
+        numero = self._oab_por_advogado.pop(advogado_id, None)
+        if numero:
+            ids = self.advogados_por_oab.get(numero, [])
+            if advogado_id in ids:
+                ids.remove(advogado_id)
+            if not ids:
+                self.advogados_por_oab.pop(numero, None)
+
+    def atualizar(self, advogados: Iterable) -> Tuple[int, int]:
+        """
+        Aplica apenas a diferença em relação à lista compilada (advogados novos,
+        removidos ou alterados) e recalcula os links de falha.
+        Retorna ``(adicionados, removidos)``.
+        """
+        atuais = {advogado.id: advogado for advogado in advogados}
+        removidos = [
+            advogado_id for advogado_id, assinatura in self.assinaturas.items()
+            if advogado_id not in atuais or assinatura_advogado(atuais[advogado_id]) != assinatura
+        ]
+        for advogado_id in removidos:
+            self._remover_advogado(advogado_id)
+
+        adicionados = [advogado for advogado_id, advogado in atuais.items() if advogado_id not in self.assinaturas]
+        for advogado in adicionados:
+            self._adicionar_advogado(advogado)
+
+        if adicionados or removidos:
+            self.automato.construir()
+            self.versao = versao_lista_advogados(self.assinaturas)
+        return len(adicionados), len(removidos)
+
+    def buscar_oabs(self, texto_norm: str) -> Dict[str, List[Span]]:
+        """
+        Extrai os números de OAB da página em uma passada e mantém só os que
+        pertencem a algum advogado: ``numero -> spans``.
+        """
+        hits: Dict[str, List[Span]] = defaultdict(list)
+        for numero, span, _ in extrair_numeros_oab(texto_norm):
+            if numero in self.advogados_por_oab:
+                hits[numero].append(span)
+        return hits
+
+    def advogados_citados_por_oab(self, texto_norm: str) -> Dict[int, List[Span]]:
+        """Resolve os números encontrados na página para ``advogado_id -> spans``."""
+        citados: Dict[int, List[Span]] = defaultdict(list)
+        for numero, spans in self.buscar_oabs(texto_norm).items():
+            for advogado_id in self.advogados_por_oab[numero]:
+                citados[advogado_id].extend(spans)
+        return citados
+
+    def buscar(self, texto_norm: str) -> List[Tuple[int, Span]]:
+        """
+        Retorna ``(advogado_id, (inicio, fim))`` para cada menção válida no texto
+        normalizado, ordenado por posição. Advogados com OAB exigem nome e OAB a
+        até ``janela_oab`` caracteres; os demais casam apenas pelo nome.
+        """
+        if not texto_norm:
+            return []
+
+        matches = list(TOKEN_PATTERN.finditer(texto_norm))
+        tokens = [m.group() for m in matches]
+
+        hits_nome: Dict[int, List[Span]] = defaultdict(list)
+        for i_ini, i_fim, advogado_id in self.automato.buscar(tokens):
+            inicio, fim = matches[i_ini].start(), matches[i_fim].end()
+            # O automato ignora o que separa os tokens: confere o trecho exato do nome,
+            # aceitando texto colado antes dele (o \w* de criar_regex_nome_flexivel)
+            nome = self._nomes[advogado_id]
+            if fim - len(nome) < inicio or texto_norm[fim - len(nome):fim] != nome:
+                continue
+            hits_nome[advogado_id].append((inicio, fim))
+
+        hits_oab = self.buscar_oabs(texto_norm) if hits_nome else {}
+
+        resultados = []
+        for advogado_id, nomes in hits_nome.items():
+            numero = self._oab_por_advogado.get(advogado_id)
+            if numero:
+                spans = parear_nome_oab(nomes, hits_oab.get(numero, []), self.janela_oab)
+            else:
+                spans = sem_sobreposicao(nomes)
+            resultados.extend((advogado_id, span) for span in spans)
+
+        resultados.sort(key=lambda r: (r[1], r[0]))
+        return resultados
+
+
+# ===================== CACHE PERSISTENTE DO MATCHER =====================
+_matcher_processo: Optional[MatcherAdvogados] = None  # reaproveitado entre tasks do mesmo worker
+
+
+def caminho_cache_matcher(cache_dir: Optional[str] = None) -> str:
+    """Caminho do cache, num diretório 0700 dentro de ``CACHE_DIR`` (que por padrão é o /tmp compartilhado)."""
+    cache_dir = cache_dir or os.getenv("CACHE_DIR", "/tmp")
+    diretorio = os.path.join(cache_dir, DIRETORIO_CACHE_MATCHER)
+    os.makedirs(diretorio, mode=0o700, exist_ok=True)
+    return os.path.join(diretorio, ARQUIVO_CACHE_MATCHER)
+
+
+def _cache_confiavel(caminho: str, arquivo) -> bool:
+    """
+    ``pickle.load`` executa código: só lê o cache se ele e o seu diretório são
+    do usuário da app e ninguém mais pode escrever neles.
+    """
+    for estado in (os.stat(os.path.dirname(caminho)), os.fstat(arquivo.fileno())):
+        if estado.st_uid != os.getuid() or estado.st_mode & 0o022:
+            return False
+    return True
+
+
+def _ler_cache_matcher(caminho: str) -> Optional[MatcherAdvogados]:
+    gc_ativo = gc.isenabled()
+    try:
+        with open(caminho, "rb") as f:
+            if not _cache_confiavel(caminho, f):
+                logger.warning(f"⚠️ Cache do matcher com dono ou permissões inseguros ({caminho}). Ignorando.")
+                return None
+            # Sem GC durante o load: centenas de milhares de objetos novos disparariam
+            # várias coletas inúteis (o load cai de ~0,8s para ~0,15s com 100k advogados)
+            gc.disable()
+            conteudo = pickle.load(f)
+        if conteudo.get("formato") != VERSAO_FORMATO_CACHE:
+            logger.info("Cache do matcher em formato antigo. Ignorando.")
+            return None
+        return conteudo["matcher"]
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"⚠️ Cache do matcher ilegível ({caminho}): {e}")
+        return None
+    finally:
+        if gc_ativo:
+            gc.enable()
+
+
+def _salvar_cache_matcher(caminho: str, matcher: MatcherAdvogados) -> None:
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        with os.fdopen(os.open(temporario, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+            pickle.dump({"formato": VERSAO_FORMATO_CACHE, "versao": matcher.versao, "matcher": matcher},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporario, caminho)  # troca atômica: outros workers nunca leem arquivo pela metade
+    except Exception as e:
+        logger.warning(f"⚠️ Não foi possível salvar o cache do matcher: {e}")
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+def carregar_matcher(advogados: Iterable, cache_dir: Optional[str] = None) -> MatcherAdvogados:
+    """
+    Devolve o matcher da lista de advogados, recompilando o mínimo possível:
+
+    1. mesmo processo e mesma versão da tabela → objeto em memória;
+    2. cache em ``CACHE_DIR`` com a mesma versão → carregado do disco;
+    3. cache de uma versão próxima → atualizado só com os advogados novos/removidos;
+    4. caso contrário → compilado do zero.
+    """
+    global _matcher_processo
+    advogados = list(advogados)
+    versao = versao_lista_advogados({advogado.id: assinatura_advogado(advogado) for advogado in advogados})
+
+    if _matcher_processo is not None and _matcher_processo.versao == versao:
+        return _matcher_processo
+
+    caminho = caminho_cache_matcher(cache_dir)
+    matcher = _ler_cache_matcher(caminho)
+
+    if matcher is not None and matcher.versao == versao:
+        logger.info(f"♻️ Matcher carregado do cache ({matcher.total_advogados} advogados)")
+    elif matcher is not None and _diferenca_pequena(matcher, advogados):
+        adicionados, removidos = matcher.atualizar(advogados)
+        logger.info(f"♻️ Matcher atualizado do cache: +{adicionados} / -{removidos} advogados")
+        _salvar_cache_matcher(caminho, matcher)
+    else:
+        matcher = MatcherAdvogados(advogados)
+        logger.info(f"🔧 Matcher compilado do zero ({matcher.total_advogados} advogados)")
+        _salvar_cache_matcher(caminho, matcher)
+
+    _matcher_processo = matcher
+    return matcher
+
+
+def _diferenca_pequena(matcher: MatcherAdvogados, advogados: List) -> bool:
+    atuais = {advogado.id: assinatura_advogado(advogado) for advogado in advogados}
+    diferentes = sum(1 for advogado_id, assinatura in atuais.items() if matcher.assinaturas.get(advogado_id) != assinatura)
+    diferentes += sum(1 for advogado_id in matcher.assinaturas if advogado_id not in atuais)
+    return diferentes <= LIMITE_ATUALIZACAO_INCREMENTAL * max(len(atuais), 1)
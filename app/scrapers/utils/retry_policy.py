@@ -0,0 +1,206 @@
+# app/scrapers/utils/retry_policy.py
+# POLÍTICA ÚNICA DE RETENTATIVA: BACKOFF EXPONENCIAL COM JITTER, PRAZO POR ENDPOINT E RETRY-AFTER
+
+import os
+import time
+import random
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import wraps
+from typing import Callable, Dict, Iterator, Optional, Tuple, Type
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Status HTTP que valem nova tentativa (demais 4xx são erro do pedido, não do servidor)
+STATUS_RETENTAVEIS = frozenset({408, 425, 429, 500, 502, 503, 504})
+# Para POST não idempotente (ex.: envio de WhatsApp): só status em que o servidor
+# garantidamente não processou o pedido
+STATUS_RETENTAVEIS_NAO_IDEMPOTENTE = frozenset({429, 503})
+
+JITTER_TOTAL = "total"   # espera em [0, teto]: espalha mais, mas pode sair ~0s
+JITTER_IGUAL = "igual"   # espera em [teto/2, teto], nunca abaixo de ``base``
+
+# endpoint -> (tentativas, base_s, maximo_s, prazo_s, jitter). Sobrescrevível por env:
+# RETRY_<ENDPOINT>_TENTATIVAS / _BASE / _MAXIMO / _PRAZO (ex.: RETRY_UZAPI_PRAZO=60)
+POLITICAS_PADRAO: Dict[str, Tuple[int, float, float, float, str]] = {
+    "padrao": (3, 1.0, 30.0, 120.0, JITTER_TOTAL),
+    "djerj_chrome": (3, 2.0, 20.0, 180.0, JITTER_TOTAL),
+    "djerj_download": (5, 1.0, 30.0, 600.0, JITTER_TOTAL),
+    "djen_elemento": (2, 0.5, 5.0, 15.0, JITTER_TOTAL),
+    "uzapi": (3, 1.0, 15.0, 60.0, JITTER_TOTAL),
+    # Tarefas Celery: re-enfileirar na hora (ex.: worker sem memória) não adianta
+    "tarefa_scraping": (3, 300.0, 1800.0, 3 * 3600.0, JITTER_IGUAL),
+    "tarefa_whatsapp": (3, 60.0, 600.0, 3600.0, JITTER_IGUAL),
+}
+
+
+class PoliticaRetry:
+    """
+    Quantas tentativas, quanto esperar entre elas e até quando insistir.
+    A espera é sorteada abaixo de ``base * 2^n`` (limitada a ``maximo``), para
+    que workers que falharam juntos não voltem juntos: em ``[0, teto]`` ("full
+    jitter") ou, com ``JITTER_IGUAL``, em ``[teto/2, teto]`` e nunca menos que
+    ``base``. ``prazo`` é o orçamento total em segundos desde a primeira tentativa.
+    """
+
+    def __init__(self, nome: str, tentativas: int, base: float, maximo: float, prazo: float,
+                 jitter: str = JITTER_TOTAL):
+        self.nome = nome
+        self.tentativas_max = max(1, tentativas)
+        self.base = base
+        self.maximo = maximo
+        self.prazo = prazo
+        self.jitter = jitter
+
+    def __repr__(self):
+        return (f"PoliticaRetry({self.nome!r}, tentativas={self.tentativas_max}, base={self.base}, "
+                f"maximo={self.maximo}, prazo={self.prazo}, jitter={self.jitter!r})")
+
+    def com(self, **campos) -> "PoliticaRetry":
+        """Cópia com alguns campos trocados (ex.: ``politica.com(tentativas=2)``)."""
+        valores = {"tentativas": self.tentativas_max, "base": self.base, "maximo": self.maximo,
+                   "prazo": self.prazo, "jitter": self.jitter}
+        valores.update(campos)
+        return PoliticaRetry(self.nome, **valores)
+
+    def espera(self, tentativa: int, retry_after: Optional[float] = None) -> float:
+        """Segundos até a tentativa ``tentativa + 1`` (``tentativa`` conta a partir de 0)."""
+        teto = min(self.maximo, self.base * (2 ** tentativa))
+        if self.jitter == JITTER_IGUAL:
+            espera = max(min(self.base, self.maximo), random.uniform(teto / 2, teto))
+        else:
+            espera = random.uniform(0, teto)
+        if retry_after is not None:
+            # O servidor disse quando voltar: nunca antes disso
+            espera = max(espera, retry_after)
+        return espera
+
+    def tentativas(self, espera_extra: Optional[Callable[[], Optional[float]]] = None) -> Iterator[int]:
+        """
+        Gera os números das tentativas (0, 1, ...), dormindo com backoff antes de
+        cada uma a partir da segunda. Para quando acabam as tentativas ou quando a
+        próxima espera estouraria o prazo. ``espera_extra`` devolve o Retry-After
+        da última resposta, se houver.
+        """
+        inicio = time.monotonic()
+        for tentativa in range(self.tentativas_max):
+            if tentativa:
+                espera = self.espera(tentativa - 1, espera_extra() if espera_extra else None)
+                if not self._cabe_no_prazo(inicio, espera):
+                    logger.warning(f"⏳ [{self.nome}] Prazo de {self.prazo:g}s esgotado após {tentativa} tentativa(s)")
+                    return
+                time.sleep(espera)
+            yield tentativa
+
+    def _cabe_no_prazo(self, inicio: float, espera: float) -> bool:
+        return not self.prazo or time.monotonic() - inicio + espera <= self.prazo
+
+
+def _ler_env(endpoint: str, campo: str, padrao):
+    valor = os.getenv(f"RETRY_{endpoint.upper()}_{campo}")
+    if valor is None:
+        return padrao
+    try:
+        return type(padrao)(valor)
+    except ValueError:
+        logger.warning(f"⚠️ RETRY_{endpoint.upper()}_{campo} inválido ({valor!r}); usando {padrao}")
+        return padrao
+
+
+def politica_retry(endpoint: str) -> PoliticaRetry:
+    """Política do endpoint (padrões de ``POLITICAS_PADRAO`` + env)."""
+    tentativas, base, maximo, prazo, jitter = POLITICAS_PADRAO.get(endpoint, POLITICAS_PADRAO["padrao"])
+    return PoliticaRetry(
+        endpoint,
+        tentativas=_ler_env(endpoint, "TENTATIVAS", tentativas),
+        base=_ler_env(endpoint, "BASE", base),
+        maximo=_ler_env(endpoint, "MAXIMO", maximo),
+        prazo=_ler_env(endpoint, "PRAZO", prazo),
+        jitter=jitter,
+    )
+
+
+def ler_retry_after(valor: Optional[str]) -> Optional[float]:
+    """Cabeçalho Retry-After em segundos: aceita "120" ou data HTTP. None se ausente/inválido."""
+    if not valor:
+        return None
+    valor = valor.strip()
+    if valor.isdigit():
+        return float(valor)
+    try:
+        quando = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    if quando.tzinfo is None:
+        quando = quando.replace(tzinfo=timezone.utc)
+    return max(0.0, (quando - datetime.now(timezone.utc)).total_seconds())
+
+
+def retry_after_resposta(response) -> Optional[float]:
+    if response is None:
+        return None
+    return ler_retry_after(response.headers.get("Retry-After"))
+
+
+def com_retry(endpoint: str, excecoes: Tuple[Type[BaseException], ...] = (Exception,)):
+    """Decorator: repete a função nas ``excecoes`` seguindo a política do endpoint."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            politica = politica_retry(endpoint)
+            ultimo_erro = None
+            for tentativa in politica.tentativas():
+                try:
+                    return func(*args, **kwargs)
+                except excecoes as e:
+                    ultimo_erro = e
+                    logger.warning(f"⚠️ [{endpoint}] Tentativa {tentativa + 1}/{politica.tentativas_max} falhou: {e}")
+            logger.error(f"❌ [{endpoint}] Falha após as tentativas: {ultimo_erro}")
+            raise ultimo_erro
+        return wrapper
+    return decorator
+
+
+def requisitar_com_retry(enviar: Callable, endpoint: str, *args, idempotente: bool = True, **kwargs):
+    """
+    Chama ``enviar(*args, **kwargs)`` (ex.: ``requests.post``) repetindo em erro
+    de conexão/timeout e nos ``STATUS_RETENTAVEIS``, respeitando o Retry-After.
+    Devolve a última resposta (o chamador confere o status) ou relança o erro
+    de rede se nenhuma tentativa respondeu.
+
+    ``idempotente=False`` (POST que envia mensagem): um ReadTimeout ou um 5xx
+    pode chegar depois de o servidor aceitar o pedido, e repetir duplicaria o
+    envio. Aí só repete se a conexão nem abriu (ConnectTimeout/ConnectionError)
+    ou em 429/503.
+    """
+    politica = politica_retry(endpoint)
+    # ConnectTimeout herda de ConnectionError; ReadTimeout só de Timeout
+    erros_retentaveis = (requests.Timeout, requests.ConnectionError) if idempotente else (requests.ConnectionError,)
+    status_retentaveis = STATUS_RETENTAVEIS if idempotente else STATUS_RETENTAVEIS_NAO_IDEMPOTENTE
+    resposta = None
+    ultimo_erro = None
+    for tentativa in politica.tentativas(lambda: retry_after_resposta(resposta)):
+        try:
+            resposta = enviar(*args, **kwargs)
+        except erros_retentaveis as e:
+            resposta, ultimo_erro = None, e
+            logger.warning(f"🔌 [{endpoint}] {e.__class__.__name__} ({tentativa + 1}/{politica.tentativas_max})")
+            continue
+        if resposta.status_code not in status_retentaveis:
+            return resposta
+        logger.warning(f"⚠️ [{endpoint}] HTTP {resposta.status_code} ({tentativa + 1}/{politica.tentativas_max})")
+    if resposta is None and ultimo_erro is not None:
+        raise ultimo_erro
+    return resposta
+
+
+def countdown_celery(endpoint: str, tentativas_feitas: int, exc: Optional[BaseException] = None) -> float:
+    """
+    ``countdown`` para ``self.retry``: backoff com jitter (as políticas de tarefa
+    usam ``JITTER_IGUAL``, com piso em ``base``), ou o Retry-After da resposta que falhou.
+    """
+    resposta = getattr(exc, "response", None)
+    return politica_retry(endpoint).espera(tentativas_feitas, retry_after_resposta(resposta))
@@ -2,16 +2,212 @@
 
 import re
 import unicodedata
-from typing import Pattern
+from array import array
+from bisect import bisect_right
+from typing import List, Pattern, Tuple
+
+def _normalizar_caractere(caractere: str) -> str:
+    """Forma normalizada de um único caractere: maiúsculo, sem acento, ASCII."""
+    valor = unicodedata.normalize('NFKD', caractere.upper()).encode('ASCII', 'ignore').decode('ASCII')
+    return ''.join(' ' if c.isspace() else c for c in valor)
+
+# Tabela de tradução (str.translate) caractere -> forma normalizada. A faixa latina
+# é pré-computada; outros caracteres entram na primeira vez que aparecem.
+TABELA_NORMALIZACAO = {}
+# Caracteres que somem ou viram mais de um (ex.: acento combinante, "ß", "ﬁ"):
+# são os únicos que desalinham o texto traduzido do original
+_CARACTERES_IRREGULARES = set()
+_irregulares_pattern = None
+
+def _registrar_caracteres(caracteres) -> None:
+    global _irregulares_pattern
+    for caractere in caracteres:
+        valor = _normalizar_caractere(caractere)
+        TABELA_NORMALIZACAO[ord(caractere)] = valor
+        if len(valor) != 1:
+            _CARACTERES_IRREGULARES.add(caractere)
+            _irregulares_pattern = None
+
+def _padrao_irregulares() -> Pattern:
+    global _irregulares_pattern
+    if _irregulares_pattern is None:
+        classe = ''.join(re.escape(c) for c in sorted(_CARACTERES_IRREGULARES))
+        _irregulares_pattern = re.compile(f'[{classe}]')
+    return _irregulares_pattern
+
+def _traduzir(texto: str) -> str:
+    traduzido = texto.translate(TABELA_NORMALIZACAO)
+    if not traduzido.isascii():
+        # Só sobra não-ASCII se havia caractere fora da tabela: registra e refaz
+        _registrar_caracteres({c for c in set(traduzido) if not c.isascii()})
+        traduzido = texto.translate(TABELA_NORMALIZACAO)
+    return traduzido
+
+# ASCII, Latin-1, Latin Extended A/B, marcas combinantes, pontuação geral e ligaduras (ﬁ, ﬂ)
+for _inicio, _fim in ((0x0000, 0x0250), (0x0300, 0x0370), (0x2000, 0x2070), (0xFB00, 0xFB07)):
+    _registrar_caracteres(chr(codigo) for codigo in range(_inicio, _fim))
+# Mesma tabela para texto Latin-1 sem caracteres irregulares, via bytes.translate
+# (tabela de 256 posições, bem mais rápida que str.translate com dict)
+_TABELA_LATIN1 = bytes(ord(TABELA_NORMALIZACAO[codigo]) if len(TABELA_NORMALIZACAO[codigo]) == 1 else 32
+                       for codigo in range(256))
+_ESPACOS_REPETIDOS_PATTERN = re.compile(r' {2,}')
 
 def normalizar_texto(texto: str) -> str:
     """Normalização robusta: acentos, espaços e case."""
     if not texto:
         return ""
-    texto = texto.upper()
-    texto = unicodedata.normalize('NFKD', texto).encode('ASCII', 'ignore').decode('ASCII')
-    texto = re.sub(r'\s+', ' ', texto)
-    return texto.strip()
+    # split()/join no lugar de re.sub(r'\s+') + strip(): mesmo resultado, ~2x mais rápido
+    texto = unicodedata.normalize('NFKD', texto.upper()).encode('ASCII', 'ignore').decode('ASCII')
+    return ' '.join(texto.split())
+
+class MapaOffsets:
+    """
+    Posição no texto ORIGINAL de cada caractere do texto normalizado, guardada
+    por trechos alinhados: ``mapa[i] = origens[k] + (i - inicios[k])``, com ``k``
+    o último trecho que começa em ``inicios[k] <= i``. Trecho novo só onde o
+    alinhamento quebra (bloco de espaços colapsado, caractere que some ou vira
+    vários), então montar o mapa custa O(trechos), não O(caracteres).
+    """
+
+    __slots__ = ('inicios', 'origens', 'tamanho')
+
+    def __init__(self, inicios: array, origens: array, tamanho: int):
+        self.inicios = inicios
+        self.origens = origens
+        self.tamanho = tamanho
+
+    def __len__(self) -> int:
+        return self.tamanho
+
+    def __getitem__(self, indice: int) -> int:
+        if indice < 0:
+            indice += self.tamanho
+        if not 0 <= indice < self.tamanho:
+            raise IndexError('índice fora do texto normalizado')
+        k = bisect_right(self.inicios, indice) - 1
+        return self.origens[k] + indice - self.inicios[k]
+
+    def recortar(self, inicio: int) -> 'MapaOffsets':
+        """Mapa de ``normalizado[inicio:]`` sobre ``original[self[inicio]:]``."""
+        if inicio >= self.tamanho:
+            return MapaOffsets(array('I'), array('I'), 0)
+        base = self[inicio]
+        k = bisect_right(self.inicios, inicio) - 1
+        inicios, origens = array('I', [0]), array('I', [0])
+        for ini, origem in zip(self.inicios[k + 1:], self.origens[k + 1:]):
+            inicios.append(ini - inicio)
+            origens.append(origem - base)
+        return MapaOffsets(inicios, origens, self.tamanho - inicio)
+
+def _anexar_trecho(inicios: array, origens: array, inicio: int, origem: int) -> None:
+    if inicios and inicios[-1] == inicio:
+        origens[-1] = origem  # trecho anterior ficou vazio (caractere que some)
+    else:
+        inicios.append(inicio)
+        origens.append(origem)
+
+def _trechos_traducao(texto: str) -> Tuple[array, array]:
+    """Trechos (início no texto traduzido, início no original), quebrando só nos caracteres irregulares."""
+    inicios, origens = array('I', [0]), array('I', [0])
+    deslocamento = 0  # len(traduzido) - len(original) até aqui
+    for match in _padrao_irregulares().finditer(texto):
+        posicao = match.start()
+        tamanho = len(TABELA_NORMALIZACAO[ord(match.group())])
+        # Todos os caracteres gerados (ex.: "SS" de "ß") apontam para o original
+        for k in range(tamanho):
+            _anexar_trecho(inicios, origens, posicao + deslocamento + k, posicao)
+        deslocamento += tamanho - 1
+        _anexar_trecho(inicios, origens, posicao + 1 + deslocamento, posicao + 1)
+    return inicios, origens
+
+def normalizar_com_offsets(texto: str) -> Tuple[str, MapaOffsets]:
+    """
+    Normaliza como ``normalizar_texto`` (uma passada de translate) e devolve também
+    ``offsets``, um ``MapaOffsets`` em que ``offsets[i]`` é a posição no texto
+    ORIGINAL do caractere ``i`` do texto normalizado. Permite recortar contextos
+    (e no futuro destacar trechos) no texto extraído do PDF sem normalizar duas vezes.
+    """
+    inicios, origens = array('I'), array('I')
+    if not texto:
+        return "", MapaOffsets(inicios, origens, 0)
+
+    traduzido = None
+    if not _padrao_irregulares().search(texto):
+        try:
+            traduzido = texto.encode('latin-1').translate(_TABELA_LATIN1).decode('ascii')
+        except UnicodeEncodeError:
+            pass  # fora do Latin-1 (ex.: travessão, aspas curvas): tabela completa
+    regular = traduzido is not None
+    if not regular:
+        traduzido = _traduzir(texto)
+        regular = len(traduzido) == len(texto) and not _padrao_irregulares().search(texto)
+
+    # Colapso dos espaços: só os blocos de 2+ (e as bordas) quebram o alinhamento;
+    # o espaço que sobra aponta para o início do bloco original
+    inicio = len(traduzido) - len(traduzido.lstrip(' '))
+    fim = len(traduzido.rstrip(' '))
+    colapso_inicios, colapso_origens = array('I'), array('I')
+    tamanho, posicao = 0, inicio
+    for match in _ESPACOS_REPETIDOS_PATTERN.finditer(traduzido, inicio, fim):
+        colapso_inicios.append(tamanho)
+        colapso_origens.append(posicao)
+        tamanho += match.start() + 1 - posicao
+        posicao = match.end()
+    if fim > posicao:
+        colapso_inicios.append(tamanho)
+        colapso_origens.append(posicao)
+        tamanho += fim - posicao
+    normalizado = ' '.join(traduzido.split())
+
+    if regular:
+        # Caso comum: tradução 1:1, a posição no traduzido já é a do original
+        return normalizado, MapaOffsets(colapso_inicios, colapso_origens, tamanho)
+
+    # Compõe colapso (normalizado -> traduzido) com tradução (traduzido -> original)
+    traducao_inicios, traducao_origens = _trechos_traducao(texto)
+    fins = colapso_inicios[1:].tolist() + [tamanho]
+    for ini, fim_trecho, posicao in zip(colapso_inicios, fins, colapso_origens):
+        k = bisect_right(traducao_inicios, posicao) - 1
+        while ini < fim_trecho:
+            _anexar_trecho(inicios, origens, ini, traducao_origens[k] + posicao - traducao_inicios[k])
+            proximo = traducao_inicios[k + 1] if k + 1 < len(traducao_inicios) else posicao + fim_trecho - ini
+            passo = min(fim_trecho - ini, proximo - posicao)
+            ini, posicao, k = ini + passo, posicao + passo, k + 1
+    return normalizado, MapaOffsets(inicios, origens, tamanho)
+
+def juntar_normalizados(texto_a: str, norm_a: str, offsets_a: MapaOffsets,
+                        texto_b: str, norm_b: str, offsets_b: MapaOffsets) -> Tuple[str, str, MapaOffsets]:
+    """
+    ``texto_a + "\\n" + texto_b`` com seu normalizado e offsets, montados a partir
+    das duas partes já normalizadas (mesmo resultado de ``normalizar_com_offsets``
+    no texto junto, sem normalizar nada de novo).
+    """
+    texto = f"{texto_a}\n{texto_b}"
+    deslocamento = len(texto_a) + 1
+    inicios, origens = array('I', offsets_a.inicios), array('I', offsets_a.origens)
+    base = len(norm_a)
+    if norm_a and norm_b:
+        # O espaço da junção aponta para o início do bloco de espaços após a parte A
+        juncao = len(texto_a)
+        for posicao in range(offsets_a[base - 1] + 1, len(texto_a)):
+            if TABELA_NORMALIZACAO.get(ord(texto_a[posicao]), '')[:1] == ' ':
+                juncao = posicao
+                break
+        _anexar_trecho(inicios, origens, base, juncao)
+        base += 1
+    for ini, origem in zip(offsets_b.inicios, offsets_b.origens):
+        _anexar_trecho(inicios, origens, ini + base, origem + deslocamento)
+    normalizado = f"{norm_a} {norm_b}" if norm_a and norm_b else norm_a or norm_b
+    return texto, normalizado, MapaOffsets(inicios, origens, base + len(offsets_b))
+
+def mapear_span(offsets: MapaOffsets, inicio: int, fim: int) -> Tuple[int, int]:
+    """Converte um span do texto normalizado para o span correspondente no original."""
+    if not offsets:
+        return 0, 0
+    if fim <= inicio:
+        posicao = offsets[inicio] if inicio < len(offsets) else offsets[-1] + 1
+        return posicao, posicao
+    return offsets[inicio], offsets[min(fim, len(offsets)) - 1] + 1
 
 def criar_regex_oab(numero_oab: str) -> Pattern:
     """
@@ -67,3 +263,38 @@ def criar_regex_nome_flexivel(nome_completo: str) -> Pattern:
             regex_partes.append(r'[\s]?' + re.escape(parte))
     
     return re.compile(r'\s+'.join(regex_partes), re.IGNORECASE)
+
+
+_OAB_NUMERO = r'(?:\d{1,3}(?:\.\d{3})+|\d+)'
+
+# Número de OAB/RJ em texto JÁ NORMALIZADO, em uma única passada pela página.
+# Cobre as variações de criar_regex_oab: "OAB/RJ-123456", "OAB/RJ123456",
+# "OAB/RJ No 123456" (º vira "o" e ° some na normalização), "OAB/RJ SOB O NO 123456",
+# números com ponto ("12.345", "98.885") e, como fallback, o número solto.
+OAB_RJ_NUMERO_PATTERN = re.compile(
+    r'(?:OAB\s*[\/\\\-]?\s*RJ[\/\\\-\.\s:]*(?:(?:SOB\s+O\s+)?N(?:O|\.O)?[\/\\\-\.\s:]*)?'
+    r'(?P<com_marcador>' + _OAB_NUMERO + r')'
+    r'|(?<![\w.])(?P<solto>' + _OAB_NUMERO + r'))'
+    r'(?![\w]|\.\d)',
+    re.IGNORECASE
+)
+
+def normalizar_numero_oab(numero_oab: str) -> str:
+    """Chave canônica do número da OAB: apenas dígitos, sem zeros à esquerda."""
+    if not numero_oab:
+        return ""
+    return re.sub(r'[^\d]', '', numero_oab).lstrip('0')
+
+def extrair_numeros_oab(texto_norm: str) -> List[Tuple[str, Tuple[int, int], bool]]:
+    """
+    Extrai todos os números de OAB/RJ do texto normalizado em O(tamanho da página).
+    Retorna ``(numero_canonico, span_do_numero, com_marcador)``; ``com_marcador``
+    indica que o número veio precedido de "OAB/RJ" (sinal mais preciso).
+    """
+    numeros = []
+    for match in OAB_RJ_NUMERO_PATTERN.finditer(texto_norm):
+        grupo = 'com_marcador' if match.group('com_marcador') else 'solto'
+        numero = normalizar_numero_oab(match.group(grupo))
+        if numero:
+            numeros.append((numero, match.span(grupo), grupo == 'com_marcador'))
+    return numeros
@@ -9,6 +9,8 @@ from datetime import datetime, date, timedelta
 import psutil
 import traceback
 
+from app.scrapers.utils.retry_policy import countdown_celery
+
 logger = logging.getLogger(__name__)
 
 @lru_cache(maxsize=1)
@@ -22,7 +24,6 @@ def get_flask_app():
     name='app.tasks.tarefa_buscar_publicacoes',
     bind=True,
     max_retries=3,
-    default_retry_delay=300,
     time_limit=3600,
     soft_time_limit=3300
 )
@@ -38,7 +39,7 @@ def tarefa_buscar_publicacoes(self):
             memoria = psutil.virtual_memory()
             if memoria.percent > 80:
                 logger.warning(f"⚠️ Memória alta ({memoria.percent}%), adiando task...")
-                raise self.retry(countdown=300)
+                raise self.retry(countdown=countdown_celery("tarefa_scraping", self.request.retries))
             
             from app.scrapers.djen.djen_client import DJENClient
             client = DJENClient()
@@ -70,12 +71,13 @@ def tarefa_buscar_publicacoes(self):
             return resultado
             
     except MemoryError as e:
-        logger.warning(f"🛑 Memória insuficiente: {e}, retry em 5min")
-        raise self.retry(exc=e, countdown=300)
+        countdown = countdown_celery("tarefa_scraping", self.request.retries)
+        logger.warning(f"🛑 Memória insuficiente: {e}, retry em {countdown:.0f}s")
+        raise self.retry(exc=e, countdown=countdown)
     except Exception as e:
         logger.error(f"❌ Erro na tarefa de scraping: {e}")
         logger.error(f"📋 Stack trace: {traceback.format_exc()}")
-        raise self.retry(exc=e, countdown=300)
+        raise self.retry(exc=e, countdown=countdown_celery("tarefa_scraping", self.request.retries))
     finally:
         if 'client' in locals():
             try:
@@ -167,8 +169,7 @@ def verificar_novas_publicacoes():
 @celery.task(
     name='app.tasks.enviar_whatsapp_uzapi',
     bind=True,
-    max_retries=3,
-    default_retry_delay=60
+    max_retries=3
 )
 def enviar_whatsapp_uzapi(self, numero, mensagem, media_url=None):
     """Enviar mensagem via UZAPI WhatsApp"""
@@ -210,7 +211,8 @@ def enviar_whatsapp_uzapi(self, numero, mensagem, media_url=None):
         
     except Exception as e:
         logger.error(f"❌ Falha ao enviar WhatsApp para {numero}: {e}")
-        self.retry(exc=e)
+        # Backoff com jitter; se a UZAPI mandou Retry-After (429/503), espera o que ela pediu
+        self.retry(exc=e, countdown=countdown_celery("tarefa_whatsapp", self.request.retries, e))
 
 # ✅ TASK: Fallback para caso o scraping das 18h falhe
 @celery.task(name='app.tasks.tentar_novamente_se_falhar')
@@ -221,6 +223,16 @@ def tentar_novamente_se_falhar():
     try:
         with app.app_context():
             from app.models import Publicacao
+            from app.scrapers.djerj.execucao import execucoes_pendentes
+            from app.scrapers.djerj.scraper_completo_djerj import TZ_SP, executar_scraper_completo
+            
+            # ✅ Cadernos do DJERJ que pararam no meio retomam na primeira etapa incompleta
+            pendentes = execucoes_pendentes(datetime.now(TZ_SP).date())
+            if pendentes:
+                etapas = ", ".join(f"{e.caderno}: {e.etapa or 'início'}" for e in pendentes)
+                logger.warning(f"⚠️ {len(pendentes)} caderno(s) do DJERJ incompletos ({etapas}), retomando...")
+                # Só os cadernos pendentes: os concluídos nem passam pelo matcher de novo
+                executar_scraper_completo(sorted({e.caderno for e in pendentes}))
             
             # Verificar se não há publicações de hoje
             publicacoes_hoje = Publicacao.query.filter(
@@ -237,13 +249,15 @@ def tentar_novamente_se_falhar():
                 return {
                     'status': 'fallback_executed',
                     'publicacoes_encontradas': publicacoes_hoje,
+                    'cadernos_djerj_retomados': len(pendentes),
                     'resultado_fallback': resultado.result
                 }
             else:
                 logger.info(f"✅ Já existem {publicacoes_hoje} publicações hoje, fallback não necessário")
                 return {
                     'status': 'fallback_not_needed', 
-                    'publicacoes_encontradas': publicacoes_hoje
+                    'publicacoes_encontradas': publicacoes_hoje,
+                    'cadernos_djerj_retomados': len(pendentes)
                 }
             
     except Exception as e:
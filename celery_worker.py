@@ -1,6 +1,11 @@
 # celery_worker.py - Ponto de entrada principal do Celery
 import os
+import fcntl
+import shutil
+import tempfile
+import threading
 from celery import Celery
+from celery.signals import celeryd_after_setup, worker_process_init, worker_process_shutdown, worker_shutdown
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -28,6 +33,59 @@ celery.conf.update(
     task_reject_on_worker_lost=True,
 )
 
+# ✅ Pool de Chrome aquecido só nos workers que consomem filas de scraping
+# (CHROME_POOL_FILAS, padrão "scraping"; CHROME_POOL_AQUECER=0 desliga), e em um
+# único filho do prefork: cada Chrome ocioso custa ~300MB. Nos demais filhos (e
+# workers) o Chrome só sobe se alguma tarefa pedir um driver (empréstimo abre sob demanda).
+FILAS_COM_CHROME = {f.strip() for f in os.getenv("CHROME_POOL_FILAS", "scraping").split(",") if f.strip()}
+_aquecer_chrome = False
+_diretorio_trava_chrome = None
+_trava_chrome = None
+
+@celeryd_after_setup.connect
+def verificar_filas_chrome(sender, instance, **kwargs):
+    """Roda no processo principal, antes do fork: os filhos herdam a decisão."""
+    global _aquecer_chrome, _diretorio_trava_chrome
+    filas = set(instance.app.amqp.queues.consume_from)
+    _aquecer_chrome = os.getenv("CHROME_POOL_AQUECER", "1") != "0" and bool(filas & FILAS_COM_CHROME)
+    if _aquecer_chrome:
+        # Diretório próprio (0700) deste worker para a trava do filho que aquece
+        _diretorio_trava_chrome = tempfile.mkdtemp(prefix="recorte_chrome_")
+
+def _reservar_aquecimento() -> bool:
+    """
+    Só o filho que pegar a trava aquece. A trava fica com ele até morrer
+    (worker_max_tasks_per_child): aí o próximo filho criado a pega.
+    """
+    global _trava_chrome
+    fd = os.open(os.path.join(_diretorio_trava_chrome, "aquecido.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    _trava_chrome = fd
+    return True
+
+@worker_process_init.connect
+def aquecer_pool_chrome(**kwargs):
+    if not _aquecer_chrome or not _reservar_aquecimento():
+        return
+    from app.scrapers.utils.chrome_driver import obter_pool_chrome
+    # Em thread: o worker_process_init tem que terminar antes do
+    # worker_proc_alive_timeout (~4s), e um Chrome frio pode passar disso
+    threading.Thread(target=obter_pool_chrome().aquecer, name="aquecer-chrome", daemon=True).start()
+
+@worker_process_shutdown.connect
+def fechar_pool_chrome(**kwargs):
+    from app.scrapers.utils.chrome_driver import obter_pool_chrome
+    obter_pool_chrome().fechar()
+
+@worker_shutdown.connect
+def remover_trava_chrome(**kwargs):
+    if _diretorio_trava_chrome:
+        shutil.rmtree(_diretorio_trava_chrome, ignore_errors=True)
+
 # ✅ Auto-discover para tasks em outros módulos
 celery.autodiscover_tasks(['app'], force=True)
 
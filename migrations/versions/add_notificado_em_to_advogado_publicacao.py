@@ -0,0 +1,10 @@
+# migrations/versions/add_notificado_em_to_advogado_publicacao.py
+from alembic import op
+import sqlalchemy as sa
+
+def upgrade():
+    # Envio por advogado: a retomada da notificação não reenvia a quem já recebeu
+    op.add_column('advogado_publicacao', sa.Column('notificado_em', sa.DateTime(), nullable=True))
+
+def downgrade():
+    op.drop_column('advogado_publicacao', 'notificado_em')
@@ -0,0 +1,30 @@
+# migrations/versions/create_execucao_caderno.py
+from alembic import op
+import sqlalchemy as sa
+
+def upgrade():
+    # Estado por etapa de cada (data, caderno) do DJERJ
+    op.create_table(
+        'execucao_caderno',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('data_publicacao', sa.Date(), nullable=False),
+        sa.Column('caderno', sa.String(255), nullable=False),
+        sa.Column('etapa', sa.String(30), nullable=True),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pendente'),
+        sa.Column('url_pdf', sa.Text(), nullable=True),
+        sa.Column('arquivo_pdf', sa.Text(), nullable=True),
+        sa.Column('diario_id', sa.Integer(), sa.ForeignKey('diario_oficial.id'), nullable=True),
+        sa.Column('total_mencoes', sa.Integer(), nullable=True),
+        sa.Column('mensagens_enviadas', sa.Integer(), nullable=True),
+        sa.Column('tentativas', sa.Integer(), nullable=True),
+        sa.Column('tempos', sa.Text(), nullable=True),
+        sa.Column('erro', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.UniqueConstraint('data_publicacao', 'caderno', name='uq_execucao_caderno_data_caderno'),
+    )
+    op.create_index('ix_execucao_caderno_data_publicacao', 'execucao_caderno', ['data_publicacao'])
+
+def downgrade():
+    op.drop_index('ix_execucao_caderno_data_publicacao', table_name='execucao_caderno')
+    op.drop_table('execucao_caderno')
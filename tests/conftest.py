@@ -0,0 +1,34 @@
+# tests/conftest.py
+
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class _ArquivosSemLog(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor_local():
+    """
+    ``iniciar(handler=None, diretorio=None) -> url_base``: sobe um servidor HTTP
+    local numa thread, servindo ``diretorio`` (arquivos estáticos) ou com o
+    ``handler`` dado. Derrubado no fim do teste.
+    """
+    servidores = []
+
+    def iniciar(handler=None, diretorio=None):
+        handler = handler or partial(_ArquivosSemLog, directory=str(diretorio))
+        servidor = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        servidores.append(servidor)
+        return f"http://127.0.0.1:{servidor.server_port}/"
+
+    yield iniciar
+    for servidor in servidores:
+        servidor.shutdown()
+        servidor.server_close()
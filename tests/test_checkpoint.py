@@ -0,0 +1,57 @@
+# tests/test_checkpoint.py
+
+from datetime import date
+
+import pytest
+
+from app.scrapers.djerj.checkpoint import (
+    caminho_checkpoint, carregar_checkpoint, remover_checkpoint, salvar_checkpoint,
+)
+
+DT = date(2025, 1, 2)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_salva_e_retoma():
+    mencoes = [[1, 3, "Maria das Graças Souza OAB/RJ 123456"], [2, 7, "João Pedro Alves"]]
+
+    salvar_checkpoint(DT, "v", "sha-1", 50, mencoes)
+    estado = carregar_checkpoint(DT, "V", "sha-1")
+
+    assert estado["ultima_pagina"] == 50
+    assert estado["mencoes"] == mencoes
+
+
+def test_checkpoint_de_outro_pdf_e_descartado():
+    salvar_checkpoint(DT, "V", "sha-antigo", 50, [])
+
+    assert carregar_checkpoint(DT, "V", "sha-republicado") is None
+
+
+def test_checkpoint_ilegivel_e_ignorado():
+    with open(caminho_checkpoint(DT, "V"), "w", encoding="utf-8") as f:
+        f.write('{"versao": 1, "pdf_sha')  # tarefa morta no meio da escrita (sem o tmp + rename)
+
+    assert carregar_checkpoint(DT, "V", "sha-1") is None
+
+
+def test_gravacao_atomica_nao_deixa_temporario(cache_dir):
+    salvar_checkpoint(DT, "V", "sha-1", 10, [])
+    salvar_checkpoint(DT, "V", "sha-1", 20, [])
+
+    assert [p.name for p in cache_dir.iterdir()] == ["checkpoint_20250102_V.json"]
+    assert carregar_checkpoint(DT, "V", "sha-1")["ultima_pagina"] == 20
+
+
+def test_remover_e_idempotente():
+    salvar_checkpoint(DT, "V", "sha-1", 10, [])
+
+    remover_checkpoint(DT, "V")
+    remover_checkpoint(DT, "V")
+
+    assert carregar_checkpoint(DT, "V", "sha-1") is None
@@ -0,0 +1,108 @@
+# tests/test_download.py
+
+import re
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+import requests
+
+from app.scrapers.djerj import download
+from app.scrapers.djerj.download import baixar_pdf_streaming, validar_pdf
+
+PDF = b"%PDF-1.4\n" + b"0123456789" * 20000 + b"\nstartxref\n9\n%%EOF\n"
+
+
+def servidor_pdf(dados=PDF, cortar_em=None, aceita_range=True, etag='"v1"'):
+    """
+    Handler que serve ``dados`` com suporte a ``Range``. Com ``cortar_em``, a
+    primeira resposta fecha a conexão depois desses bytes (queda no meio do download).
+    """
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        ranges = []
+
+        def do_GET(self):
+            faixa = self.headers.get("Range")
+            Handler.ranges.append(faixa)
+            inicio = int(re.match(r"bytes=(\d+)-", faixa).group(1)) if faixa and aceita_range else 0
+            corpo = dados[inicio:]
+            self.send_response(206 if inicio else 200)
+            if inicio:
+                self.send_header("Content-Range", f"bytes {inicio}-{len(dados) - 1}/{len(dados)}")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            if cortar_em and len(Handler.ranges) == 1:
+                self.wfile.write(corpo[:cortar_em])
+                self.wfile.flush()
+                self.close_connection = True
+                return
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+@pytest.fixture(autouse=True)
+def sem_espera(monkeypatch):
+    monkeypatch.setenv("RETRY_DJERJ_DOWNLOAD_BASE", "0")
+    # Blocos pequenos: a queda acontece com parte do arquivo já gravada
+    monkeypatch.setattr(download, "TAMANHO_BLOCO_DOWNLOAD", 4096)
+
+
+def test_retoma_com_range_depois_de_queda(servidor_local, tmp_path):
+    handler = servidor_pdf(cortar_em=100_000)
+    url = servidor_local(handler) + "diario.pdf"
+    destino = tmp_path / "diario.pdf"
+
+    tamanho = baixar_pdf_streaming(requests.Session(), url, str(destino))
+
+    assert tamanho == len(PDF)
+    assert destino.read_bytes() == PDF
+    assert handler.ranges[0] is None
+    retomada = int(re.match(r"bytes=(\d+)-", handler.ranges[1]).group(1))
+    assert 0 < retomada <= 100_000
+    assert not (tmp_path / "diario.pdf.part").exists()
+    assert not (tmp_path / "diario.pdf.part.json").exists()
+
+
+def test_parcial_sobrevive_entre_chamadas(servidor_local, tmp_path):
+    handler = servidor_pdf(cortar_em=100_000)
+    url = servidor_local(handler) + "diario.pdf"
+    destino = tmp_path / "diario.pdf"
+
+    assert baixar_pdf_streaming(requests.Session(), url, str(destino), tentativas=1) is None
+    assert (tmp_path / "diario.pdf.part").exists()
+
+    assert baixar_pdf_streaming(requests.Session(), url, str(destino)) == len(PDF)
+    assert handler.ranges[1].startswith("bytes=")
+    assert destino.read_bytes() == PDF
+
+
+def test_servidor_que_ignora_range_reescreve_do_inicio(servidor_local, tmp_path):
+    handler = servidor_pdf(cortar_em=100_000, aceita_range=False)
+    url = servidor_local(handler) + "diario.pdf"
+    destino = tmp_path / "diario.pdf"
+
+    assert baixar_pdf_streaming(requests.Session(), url, str(destino)) == len(PDF)
+    assert destino.read_bytes() == PDF
+
+
+def test_pdf_truncado_e_descartado(servidor_local, tmp_path):
+    url = servidor_local(servidor_pdf(dados=PDF[:-30])) + "diario.pdf"
+    destino = tmp_path / "diario.pdf"
+
+    assert baixar_pdf_streaming(requests.Session(), url, str(destino)) is None
+    assert not destino.exists()
+    assert not (tmp_path / "diario.pdf.part").exists()
+
+
+def test_validar_pdf(tmp_path):
+    caminho = tmp_path / "a.pdf"
+    caminho.write_bytes(PDF)
+    assert validar_pdf(str(caminho))
+
+    caminho.write_bytes(b"<html>erro</html>" + PDF[9:])
+    assert not validar_pdf(str(caminho))
@@ -0,0 +1,41 @@
+# tests/test_extracao.py
+
+import pytest
+
+from app.scrapers.djerj import extracao
+from app.scrapers.djerj.extracao import BACKEND_LAYOUT, extrair_texto_pagina, texto_parece_quebrado
+
+# Como o pdfminer sem LAParams entrega a página: texto limpo, mas numa linha só
+TEXTO_SEM_LINHAS = "Intime-se a parte autora. Adv(s).: Dr(a). Maria das Graças Souza - OAB/RJ nº 123.456 " * 10
+TEXTO_COLADO = "intime-se a parte autora no prazo legalAdv(s).: Dr(a). Maria Souza - OAB/RJ nº 10.094intime-se " * 10
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    """Backends falsos: o de layout devolve uma marca para saber quando houve fallback."""
+    def usar(texto):
+        monkeypatch.setitem(extracao.BACKENDS, "pdfminer", lambda documento, page_num: texto)
+        monkeypatch.setitem(extracao.BACKENDS, "pypdf2", lambda documento, page_num: texto)
+        monkeypatch.setitem(extracao.BACKENDS, BACKEND_LAYOUT, lambda documento, page_num: "layout")
+    return usar
+
+
+def test_texto_sem_linhas_so_e_quebrado_quando_se_checam_linhas():
+    assert texto_parece_quebrado(TEXTO_SEM_LINHAS)
+    assert not texto_parece_quebrado(TEXTO_SEM_LINHAS, checar_linhas=False)
+    assert texto_parece_quebrado(TEXTO_COLADO, checar_linhas=False)
+    assert texto_parece_quebrado("curto", checar_linhas=False)
+
+
+def test_pdfminer_sem_layout_pode_ser_usado(backends):
+    backends(TEXTO_SEM_LINHAS)
+
+    assert extrair_texto_pagina(None, 1, "pdfminer") == (TEXTO_SEM_LINHAS, "pdfminer")
+    # pypdf2 emite quebras de linha: a mesma linha única indica layout perdido
+    assert extrair_texto_pagina(None, 1, "pypdf2") == ("layout", BACKEND_LAYOUT)
+
+
+def test_pdfminer_sem_layout_com_linhas_coladas_volta_ao_layout(backends):
+    backends(TEXTO_COLADO)
+
+    assert extrair_texto_pagina(None, 1, "pdfminer") == ("layout", BACKEND_LAYOUT)
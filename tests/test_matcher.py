@@ -0,0 +1,106 @@
+# tests/test_matcher.py
+
+import os
+import stat
+
+import pytest
+
+from app.models import Advogado
+from app.scrapers.djerj.scraper_completo_djerj import buscar_mencoes_advogado
+from app.scrapers.utils import matcher as modulo_matcher
+from app.scrapers.utils.matcher import (
+    MatcherAdvogados, _ler_cache_matcher, caminho_cache_matcher, carregar_matcher, parear_nome_oab,
+)
+from app.scrapers.utils.text_utils import normalizar_texto
+
+ADVOGADOS = [
+    Advogado(id=1, nome_completo="Maria das Graças Souza", numero_oab="123456"),
+    Advogado(id=2, nome_completo="João Pedro Alves", numero_oab=None),
+    Advogado(id=3, nome_completo="Ana Lima", numero_oab="12345"),
+    Advogado(id=4, nome_completo="Pedro Alves", numero_oab="98765"),
+]
+
+# Textos em que o matcher e a regex por advogado devem achar exatamente o mesmo
+TEXTOS_EQUIVALENTES = [
+    "Adv(s).: Dr(a). Maria das Graças Souza - OAB/RJ 123456. Intime-se.",
+    "OAB/RJ-123456 MARIA DAS GRACAS SOUZA, para ciência",
+    "João Pedro Alves e Pedro Alves OAB/RJ 98765 requerem vista",
+    "DraAna Lima OAB/RJ 12345",  # nome colado ao texto anterior (\w* da regex original)
+    "Ana Lima, sem OAB por perto. " + "x " * 100 + "OAB/RJ 12345",
+    "Maria das Graças Souza OAB/RJ 123456 e de novo Maria das Graças Souza OAB/RJ 123456",
+    "Nenhum advogado citado nesta página",
+]
+
+
+def _por_regex(texto_norm):
+    return {(advogado.id, span) for advogado in ADVOGADOS for span in buscar_mencoes_advogado(texto_norm, advogado)}
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return MatcherAdvogados(ADVOGADOS)
+
+
+@pytest.mark.parametrize("texto", TEXTOS_EQUIVALENTES)
+def test_mesmas_mencoes_que_a_regex_por_advogado(matcher, texto):
+    texto_norm = normalizar_texto(texto)
+
+    assert set(matcher.buscar(texto_norm)) == _por_regex(texto_norm)
+
+
+def test_oab_com_ponto(matcher):
+    texto_norm = normalizar_texto("Maria das Graças Souza - OAB/RJ nº 123.456")
+
+    assert [advogado_id for advogado_id, _ in matcher.buscar(texto_norm)] == [1]
+
+
+def test_numero_da_oab_so_casa_inteiro(matcher):
+    # 12345 (Ana Lima) é prefixo de 123456: a regex sem fronteira aceitava
+    texto_norm = normalizar_texto("Ana Lima OAB/RJ 123456")
+
+    assert matcher.buscar(texto_norm) == []
+    assert _por_regex(texto_norm) == {(3, (0, len(texto_norm) - 1))}
+
+
+def test_nome_sem_oab_por_perto_nao_conta(matcher):
+    texto_norm = normalizar_texto("Pedro Alves compareceu. " + "texto " * 40 + "OAB/RJ 98765")
+
+    assert matcher.buscar(texto_norm) == []
+
+
+def test_atualizar_aplica_so_a_diferenca():
+    matcher = MatcherAdvogados(ADVOGADOS)
+    novos = ADVOGADOS[1:] + [Advogado(id=5, nome_completo="Carla Dias", numero_oab="55555")]
+
+    assert matcher.atualizar(novos) == (1, 1)
+    texto_norm = normalizar_texto("Carla Dias OAB/RJ 55.555")
+    assert matcher.buscar(texto_norm) == [(5, (0, len(texto_norm)))]
+    assert matcher.buscar(normalizar_texto("Maria das Graças Souza OAB/RJ 123456")) == []
+
+
+def test_parear_escolhe_o_parceiro_mais_proximo_sem_sobrepor():
+    nomes = [(0, 10), (40, 50)]
+    oabs = [(20, 26), (60, 66)]
+
+    assert parear_nome_oab(nomes, oabs, janela=150) == [(0, 26), (40, 66)]
+    assert parear_nome_oab(nomes, oabs, janela=5) == []
+
+
+@pytest.fixture
+def cache_matcher(tmp_path, monkeypatch):
+    """Cache do matcher gravado do zero em ``tmp_path`` (sem o matcher em memória do processo)."""
+    monkeypatch.setattr(modulo_matcher, "_matcher_processo", None)
+    carregar_matcher(ADVOGADOS, str(tmp_path))
+    return caminho_cache_matcher(str(tmp_path))
+
+
+def test_cache_fica_em_diretorio_so_do_usuario(cache_matcher):
+    assert stat.S_IMODE(os.stat(os.path.dirname(cache_matcher)).st_mode) == 0o700
+    assert stat.S_IMODE(os.stat(cache_matcher).st_mode) & 0o077 == 0
+    assert _ler_cache_matcher(cache_matcher).total_advogados == len(ADVOGADOS)
+
+
+def test_cache_gravavel_por_outros_nao_e_carregado(cache_matcher):
+    os.chmod(cache_matcher, 0o666)
+
+    assert _ler_cache_matcher(cache_matcher) is None
@@ -0,0 +1,72 @@
+# tests/test_notificacao.py
+
+from datetime import date
+
+import pytest
+
+from app import create_app, db
+from app.models import Advogado, AdvogadoPublicacao, DiarioOficial, ExecucaoCaderno
+from app.scrapers.djerj import scraper_completo_djerj as scraper
+
+DT = date(2025, 1, 2)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.delenv("SQLALCHEMY_DATABASE_URI", raising=False)
+    # Arquivo (não :memory:): as threads de envio abrem conexões próprias
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'recorte.db'}")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def whatsapp(monkeypatch):
+    """``enviar_whatsapp_single`` falso: registra os números e falha para os de ``falhar``."""
+    enviados = []
+
+    def enviar(numero, mensagem):
+        enviados.append(numero)
+        return numero not in enviar.falhar
+
+    enviar.falhar = set()
+    monkeypatch.setattr(scraper, "enviar_whatsapp_single", enviar)
+    monkeypatch.setattr(scraper.time, "sleep", lambda segundos: None)
+    return enviados, enviar.falhar
+
+
+def _execucao_persistida():
+    advogados = [Advogado(nome_completo=f"Advogado {i}", whatsapp=f"2199999000{i}") for i in range(3)]
+    diario = DiarioOficial(data_publicacao=DT, caderno="V")
+    db.session.add_all(advogados + [diario])
+    db.session.flush()
+    for advogado in advogados:
+        db.session.add(AdvogadoPublicacao(advogado_id=advogado.id, diario_id=diario.id, data_publicacao=DT,
+                                          pagina=1, contexto="...", link="http://x/1"))
+    execucao = ExecucaoCaderno(data_publicacao=DT, caderno="V", etapa="persistido", status="em_andamento",
+                               diario_id=diario.id, total_mencoes=3)
+    db.session.add(execucao)
+    db.session.commit()
+    return execucao
+
+
+def test_retomada_nao_reenvia_a_quem_ja_recebeu(app, whatsapp):
+    enviados, falhar = whatsapp
+    execucao = _execucao_persistida()
+    falhar.add("21999990002")
+
+    assert scraper._executar_etapas(execucao, DT, "V", [], None, app) == (3, 2)
+    assert sorted(enviados) == ["21999990000", "21999990001", "21999990002"]
+
+    # Tarefa morta antes de registrar "notificado": a retentativa só envia ao que falhou
+    execucao.etapa = "persistido"
+    db.session.commit()
+    enviados.clear()
+    falhar.clear()
+
+    assert scraper._executar_etapas(execucao, DT, "V", [], None, app) == (3, 3)
+    assert enviados == ["21999990002"]
+    assert scraper.advogados_notificados(execucao.diario_id) == {adv.id for adv in Advogado.query.all()}
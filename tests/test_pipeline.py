@@ -0,0 +1,53 @@
+# tests/test_pipeline.py
+
+import pytest
+
+from app.models import Advogado
+from app.scrapers.djerj.pipeline import casar_paginas
+from app.scrapers.utils.matcher import MatcherAdvogados
+
+ADVOGADOS = [
+    Advogado(id=1, nome_completo="Maria das Graças Souza", numero_oab="123456"),
+    Advogado(id=2, nome_completo="Ana Lima", numero_oab="12345"),
+]
+PREAMBULO = "Intime-se a parte autora para se manifestar sobre o laudo pericial no prazo legal. "
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return MatcherAdvogados(ADVOGADOS)
+
+
+def _mencoes(paginas, matcher, processos=1, janela=60):
+    # Cauda curta: a OAB antes do nome fica fora dela, e a página seguinte pareia o nome com a OAB de depois
+    return [(advogado_id, pagina) for _, hits in casar_paginas(enumerate(paginas, 1), matcher, processos, janela)
+            for advogado_id, _, pagina in hits]
+
+
+@pytest.mark.parametrize("processos", [1, 2])
+def test_nome_com_oab_dos_dois_lados_da_virada_conta_uma_vez(matcher, processos):
+    paginas = [
+        PREAMBULO + "OAB/RJ 123456, representando a parte ré, Dra. Maria das Graças Souza",
+        "OAB/RJ 123456. " + PREAMBULO,
+    ]
+
+    assert _mencoes(paginas, matcher, processos) == [(1, 1)]
+
+
+@pytest.mark.parametrize("processos", [1, 2])
+def test_mencao_quebrada_na_virada_fica_na_pagina_anterior(matcher, processos):
+    paginas = [
+        PREAMBULO + "Adv(s).: Dr(a). Maria das Graças Souza",
+        "- OAB/RJ 123456. " + PREAMBULO,
+    ]
+
+    assert _mencoes(paginas, matcher, processos) == [(1, 1)]
+
+
+def test_outro_advogado_na_virada_nao_e_descartado(matcher):
+    paginas = [
+        PREAMBULO + "OAB/RJ 123456, representando a parte ré, Dra. Maria das Graças Souza e Ana Lima",
+        "OAB/RJ 12345. " + PREAMBULO,
+    ]
+
+    assert _mencoes(paginas, matcher) == [(1, 1), (2, 1)]
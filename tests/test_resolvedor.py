@@ -0,0 +1,48 @@
+# tests/test_resolvedor.py
+
+from datetime import date
+from pathlib import Path
+
+import requests
+
+from app.scrapers.djerj.resolvedor import extrair_candidatos_pdf, extrair_iframes_pdf, resolver_urls_pdf
+
+FIXTURES = Path(__file__).parent / "fixtures" / "djerj"
+PDF_FIXTURE = "temp/DJERJ_V_20250102_8f3a2c.pdf"
+
+
+def test_resolve_url_do_pdf_pelo_html_gravado(servidor_local):
+    base = servidor_local(diretorio=FIXTURES) + "consultadje/"
+
+    candidatos = resolver_urls_pdf(requests.Session(), date(2025, 1, 2), "V", base=base)
+
+    # openPDF, <embed> e <a> citam o mesmo arquivo: um candidato só, com o pdf.aspx de Referer
+    assert candidatos == [(f"{base}{PDF_FIXTURE}", f"{base}pdf.aspx?dtPub=02/01/2025&caderno=V&pagina=-1")]
+
+
+def test_ignora_iframes_que_nao_sao_do_pdf():
+    html_consulta = (FIXTURES / "consultadje" / "consultaDJE.aspx").read_text(encoding="utf-8")
+
+    iframes = extrair_iframes_pdf(html_consulta, "https://www3.tjrj.jus.br/consultadje/consultaDJE.aspx")
+
+    assert iframes == ["https://www3.tjrj.jus.br/consultadje/pdf.aspx?dtPub=02/01/2025&caderno=V&pagina=-1"]
+
+
+def test_candidatos_sem_repeticao():
+    html_pdf = (FIXTURES / "consultadje" / "pdf.aspx").read_text(encoding="utf-8")
+
+    assert extrair_candidatos_pdf(html_pdf) == [PDF_FIXTURE]
+
+
+def test_sem_iframe_devolve_vazio_para_cair_no_chrome(servidor_local, tmp_path):
+    (tmp_path / "consultadje").mkdir()
+    (tmp_path / "consultadje" / "consultaDJE.aspx").write_text("<html><body><div id='app'></div></body></html>")
+    base = servidor_local(diretorio=tmp_path) + "consultadje/"
+
+    assert resolver_urls_pdf(requests.Session(), date(2025, 1, 2), "V", base=base) == []
+
+
+def test_consulta_fora_do_ar_devolve_vazio(servidor_local, tmp_path):
+    base = servidor_local(diretorio=tmp_path) + "consultadje/"  # 404
+
+    assert resolver_urls_pdf(requests.Session(), date(2025, 1, 2), "V", base=base) == []
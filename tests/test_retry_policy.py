@@ -0,0 +1,116 @@
+# tests/test_retry_policy.py
+
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import requests
+
+from app.scrapers.utils.retry_policy import (
+    JITTER_IGUAL, PoliticaRetry, countdown_celery, ler_retry_after, politica_retry, requisitar_com_retry,
+)
+
+
+class Resposta:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def enviar_sequencia(*eventos):
+    """``enviar`` falso: devolve/lança cada evento em ordem e conta as chamadas."""
+    chamadas = []
+
+    def enviar(*args, **kwargs):
+        evento = eventos[len(chamadas)]
+        chamadas.append(evento)
+        if isinstance(evento, BaseException):
+            raise evento
+        return evento
+
+    enviar.chamadas = chamadas
+    return enviar
+
+
+@pytest.fixture(autouse=True)
+def sem_espera(monkeypatch):
+    monkeypatch.setenv("RETRY_UZAPI_BASE", "0")
+    monkeypatch.setenv("RETRY_PADRAO_BASE", "0")
+
+
+def test_full_jitter_fica_abaixo_do_teto():
+    politica = PoliticaRetry("t", tentativas=5, base=2.0, maximo=20.0, prazo=0)
+
+    for tentativa in range(6):
+        teto = min(20.0, 2.0 * 2 ** tentativa)
+        assert all(0 <= politica.espera(tentativa) <= teto for _ in range(200))
+
+
+def test_jitter_igual_nunca_abaixo_da_base():
+    politica = PoliticaRetry("t", tentativas=3, base=300.0, maximo=1800.0, prazo=0, jitter=JITTER_IGUAL)
+
+    for tentativa in range(5):
+        teto = min(1800.0, 300.0 * 2 ** tentativa)
+        esperas = [politica.espera(tentativa) for _ in range(200)]
+        assert all(max(300.0, teto / 2) <= espera <= teto for espera in esperas)
+
+
+def test_countdown_da_tarefa_tem_piso():
+    assert all(countdown_celery("tarefa_scraping", 0) >= 300.0 for _ in range(200))
+
+
+def test_retry_after_tem_precedencia():
+    politica = PoliticaRetry("t", tentativas=3, base=1.0, maximo=2.0, prazo=0)
+
+    assert politica.espera(0, retry_after=30.0) == 30.0
+
+
+def test_ler_retry_after():
+    assert ler_retry_after("120") == 120.0
+    assert ler_retry_after(None) is None
+    assert ler_retry_after("amanhã") is None
+    daqui_a_um_minuto = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+    assert 55 <= ler_retry_after(daqui_a_um_minuto) <= 60
+
+
+def test_env_sobrescreve_a_politica(monkeypatch):
+    monkeypatch.setenv("RETRY_UZAPI_TENTATIVAS", "7")
+
+    assert politica_retry("uzapi").tentativas_max == 7
+
+
+def test_idempotente_repete_timeout_e_5xx():
+    enviar = enviar_sequencia(requests.ReadTimeout(), Resposta(502), Resposta(200))
+
+    assert requisitar_com_retry(enviar, "padrao").status_code == 200
+    assert len(enviar.chamadas) == 3
+
+
+def test_nao_idempotente_nao_repete_read_timeout():
+    enviar = enviar_sequencia(requests.ReadTimeout(), Resposta(200))
+
+    with pytest.raises(requests.ReadTimeout):
+        requisitar_com_retry(enviar, "uzapi", idempotente=False)
+    assert len(enviar.chamadas) == 1
+
+
+def test_nao_idempotente_nao_repete_502():
+    enviar = enviar_sequencia(Resposta(502), Resposta(200))
+
+    assert requisitar_com_retry(enviar, "uzapi", idempotente=False).status_code == 502
+    assert len(enviar.chamadas) == 1
+
+
+def test_nao_idempotente_repete_se_a_conexao_nem_abriu_e_em_503():
+    enviar = enviar_sequencia(requests.ConnectTimeout(), Resposta(503), Resposta(200))
+
+    assert requisitar_com_retry(enviar, "uzapi", idempotente=False).status_code == 200
+    assert len(enviar.chamadas) == 3
+
+
+def test_relanca_erro_de_rede_depois_das_tentativas():
+    enviar = enviar_sequencia(*[requests.ConnectionError("recusada")] * 3)
+
+    with pytest.raises(requests.ConnectionError):
+        requisitar_com_retry(enviar, "padrao")
+    assert len(enviar.chamadas) == 3